@@ -1,5 +1,15 @@
 
 import re
+import os
+import sys
+
+try:
+    from utils.runtime_profile import get_runtime_profile
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from utils.runtime_profile import get_runtime_profile
+
+CANDIDATE_LABELS = ["Agriculture & Farming", "Financial Trading & Taxes", "Irrelevant Noise"]
 
 class RelevanceGate:
     """
@@ -8,35 +18,48 @@ class RelevanceGate:
     Specifically targets polysemous words like 'Farm', 'Yield', 'Sowing'.
     """
     
-    def __init__(self, sensitivity=0.7):
+    def __init__(self, sensitivity=0.7, load_model=True, remote=None):
         self.sensitivity = sensitivity
         self.model_loaded = False
         self.classifier = None
+        # Optional AgriAIDaemonClient: scores come from the shared inference daemon instead
+        self.remote = remote
         
+        if remote is not None:
+            self.model_loaded = True
+            print("      🛰️ [GATE] Using Relevance Model from the inference daemon.")
+        elif load_model:
+            self._load_model()
+            
+        # Fallback Keywords (Only for ambiguous Agri context)
+        self.agri_keywords = {
+            "crop", "farm", "harvest", "soil", "agriculture", "fertilizer", "yield", "pest", 
+            "livestock", "irrigation", "tractor", "agtech", "rural", "kisan", "mandi", 
+            "paddy", "wheat", "stardew", "gaming" 
+        }
+
+    def _load_model(self):
         print("      🧠 [GATE] Loading Enterprise Relevance Model (DistilBART-MNLI)...")
         # Enterprise-Grade: Zero-Shot Classification for Semantic Understanding
         try:
             import torch
             from transformers import pipeline
             
-            # Auto-detect Device
-            device = 0 if torch.cuda.is_available() else -1
-            device_name = "GPU (CUDA)" if device == 0 else "CPU"
+            # Device / threads / bf16 / warmup from the shared runtime profile (AGRI_DEVICE etc.)
+            profile = get_runtime_profile()
+            profile.apply_threads()
+            extra = {"torch_dtype": torch.bfloat16} if profile.bf16 else {}
             
             # Using a distilled MNLI model for fast, accurate zero-shot classification
-            self.classifier = pipeline("zero-shot-classification", model="valhalla/distilbart-mnli-12-1", device=device)
+            self.classifier = pipeline(
+                "zero-shot-classification", model="valhalla/distilbart-mnli-12-1", device=profile.pipeline_device, **extra
+            )
             self.model_loaded = True
-            print(f"      ✅ [GATE] Enterprise Model Loaded Successfully on {device_name}.")
+            print(f"      ✅ [GATE] Enterprise Model Loaded Successfully on {profile.device_name}.")
+            profile.warmup(lambda texts: self.classifier(texts, CANDIDATE_LABELS), "relevance gate")
         except Exception as e:
             print(f"      ⚠️ [GATE] Model Load Failed ({e}). Using Heuristics.")
             self.model_loaded = False
-            
-        # Fallback Keywords (Only for ambiguous Agri context)
-        self.agri_keywords = {
-            "crop", "farm", "harvest", "soil", "agriculture", "fertilizer", "yield", "pest", 
-            "livestock", "irrigation", "tractor", "agtech", "rural", "kisan", "mandi", 
-            "paddy", "wheat", "stardew", "gaming" 
-        }
         
     def get_semantic_score(self, text):
         """
@@ -45,25 +68,45 @@ class RelevanceGate:
         if not self.model_loaded:
             return 0.5 # Fallback
             
-        candidate_labels = ["Agriculture & Farming", "Financial Trading & Taxes", "Irrelevant Noise"]
+        if self.remote is not None:
+            return self.get_semantic_scores([text])[0]
         try:
-            result = self.classifier(text, candidate_labels)
-            # result['scores'] corresponds to result['labels'] order
-            # Find score for "Agriculture & Farming"
-            agri_idx = result['labels'].index("Agriculture & Farming")
-            agri_score = result['scores'][agri_idx]
-            
-            # Check for Financial override
-            fin_idx = result['labels'].index("Financial Trading & Taxes")
-            fin_score = result['scores'][fin_idx]
-            
-            # If Model thinks it's Financial > Agri, penalize heavily
-            if fin_score > agri_score:
-                return 0.1
-                
-            return agri_score
+            return self._score(self.classifier(text, CANDIDATE_LABELS))
         except:
             return 0.5
+
+    def get_semantic_scores(self, texts, batch_size=16):
+        """ Batched get_semantic_score() (one zero-shot pass over the whole list). """
+        if not texts or not self.model_loaded:
+            return [0.5] * len(texts)
+        if self.remote is not None:
+            try:
+                return self.remote.relevance_scores(texts)
+            except Exception:
+                return [0.5] * len(texts)
+        try:
+            results = self.classifier(list(texts), CANDIDATE_LABELS, batch_size=batch_size)
+            if isinstance(results, dict): # single-item lists come back unwrapped
+                results = [results]
+            return [self._score(r) for r in results]
+        except:
+            return [self.get_semantic_score(t) for t in texts]
+
+    def _score(self, result):
+        # result['scores'] corresponds to result['labels'] order
+        # Find score for "Agriculture & Farming"
+        agri_idx = result['labels'].index("Agriculture & Farming")
+        agri_score = result['scores'][agri_idx]
+        
+        # Check for Financial override
+        fin_idx = result['labels'].index("Financial Trading & Taxes")
+        fin_score = result['scores'][fin_idx]
+        
+        # If Model thinks it's Financial > Agri, penalize heavily
+        if fin_score > agri_score:
+            return 0.1
+            
+        return agri_score
         
     def active_learning_loop(self, text_samples):
         """
@@ -1,8 +1,8 @@
+import io
 import os
 import sys
 import argparse
 import random
-import requests
 import pymongo
 import pandas as pd
 import numpy as np
@@ -11,7 +11,7 @@ import xml.etree.ElementTree as ET
 import re
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from pymongo import UpdateOne
+from pymongo import UpdateOne, DeleteOne
 from sklearn.linear_model import LinearRegression
 
 # Add script dir to path
@@ -19,11 +19,16 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import Utils
 try:
-    from utils.ai_client import AgriAIClient
     from utils.agri_keywords import ALL_KEYWORDS
     from utils.logger import PipelineLogger
     from utils.world_bank import WorldBankClient
-    from social_media_pipeline import run_social_pipeline
+    from utils.http_client import get_http_client, http_get
+    from utils.http_fixtures import get_fixture_transport, run_seed
+    from utils.bulk_writer import BulkWriter
+    from social_media_pipeline import (
+        run_social_pipeline, run_backfill, start_inference, BACKFILL_SOURCES, ARCHIVE_PARSERS,
+        POSTS as social_posts, AI as social_ai,
+    )
 except ImportError:
     print("❌ Error: Could not import utils. Make sure 'scripts/utils' exists.")
     sys.exit(1)
@@ -43,13 +48,22 @@ if not MONGO_URI:
 print(f"🔌 Connecting to MongoDB...")
 client = pymongo.MongoClient(MONGO_URI)
 db = client.get_database('agri_trend_dashboard')
-ai_client = AgriAIClient()
+ai_client = social_ai # one client (and worker pool if AGRI_INFERENCE_WORKERS is set) for both pipelines
 wb_client = WorldBankClient()
 
 # ==========================================
 # 1. DATA FETCHING (LOCALIZATION & MARKETS)
 # ==========================================
 
+def ticker_history(ticker, period):
+    """ yf.Ticker(ticker).history(period), recorded/replayed with the HTTP fixtures (yfinance has its own HTTP stack). """
+    return get_fixture_transport().call(
+        "yahoo_finance", f"{ticker}?period={period}",
+        lambda: yf.Ticker(ticker).history(period=period),
+        dumps=lambda hist: hist.to_json(orient="split", date_format="iso"),
+        loads=lambda text: pd.read_json(io.StringIO(text), orient="split"),
+    )
+
 def fetch_exchange_rates():
     """ Fetch real-time exchange rates against USD """
     print("   💱 Fetching Exchange Rates...")
@@ -59,7 +73,7 @@ def fetch_exchange_rates():
     
     for currency, ticker in tickers.items():
         try:
-            data = yf.Ticker(ticker).history(period="1d")
+            data = ticker_history(ticker, "1d")
             if not data.empty:
                 rates[currency] = round(data['Close'].iloc[-1], 2)
             else:
@@ -97,7 +111,7 @@ def fetch_live_commodities():
     for name, ticker in tickers.items():
         try:
             # Fetch last 5 days to ensure we get a closing price even on weekends
-            hist = yf.Ticker(ticker).history(period="5d")
+            hist = ticker_history(ticker, "5d")
             if not hist.empty:
                 current = hist['Close'].iloc[-1]
                 prev = hist['Close'].iloc[-2] if len(hist) > 1 else current
@@ -241,7 +255,7 @@ def fetch_weather_data(lat, lon):
     url = f"http://api.weatherapi.com/v1/current.json?key={api_key}&q={lat},{lon}"
     
     try:
-        resp = requests.get(url, timeout=5)
+        resp = http_get(url, timeout=5)
         if resp.status_code == 200:
             data = resp.json()
             temp_c = data['current']['temp_c']
@@ -317,6 +331,8 @@ def fetch_all():
     logger = PipelineLogger()
     run_id = logger.start_run("Data Fetch Pipeline")
     print("🚀 Starting Data Fetch Pipeline (Localized)...")
+    if run_seed() is not None:
+        random.seed(run_seed()) # repeatable runs (fixtures / AGRI_RANDOM_SEED)
 
     try:
         # A. Market Data
@@ -340,35 +356,92 @@ def fetch_all():
 
         # C. Social Data (Delegated to separate pipeline)
         total_posts = run_social_pipeline()
+        social_ai.flush_stats(logger, "social_ai")
+        get_http_client().flush_stats(logger, "social_http")
+        logger.record_metrics("social_writes", social_posts.stats())
+        if get_fixture_transport().mode:
+            logger.record_metrics("http_fixtures", get_fixture_transport().stats())
 
         logger.finish_run("SUCCESS", {"posts_new": total_posts, "countries_updated": cnt_updated})
     except Exception as e:
         logger.finish_run("FAILED", {"error": str(e)})
 
+def run_backfill_job(args):
+    logger = PipelineLogger()
+    logger.start_run("Historical Backfill")
+    try:
+        keywords = sorted(set(ALL_KEYWORDS))[:args.keywords] if args.keywords else None
+        total_posts = run_backfill(
+            sources=args.sources, start_year=args.from_year, end_year=args.to_year,
+            keywords=keywords, workers=args.workers, reset=args.reset,
+        )
+        social_ai.flush_stats(logger, "social_ai")
+        get_http_client().flush_stats(logger, "social_http")
+        logger.finish_run("SUCCESS", {"posts_new": total_posts})
+    except Exception as e:
+        logger.finish_run("FAILED", {"error": str(e)})
+
+def run_replay_job(args):
+    logger = PipelineLogger()
+    logger.start_run("Social Replay")
+    try:
+        since = datetime.strptime(args.since, "%Y-%m-%d").timestamp() if args.since else None
+        until = (datetime.strptime(args.until, "%Y-%m-%d") + timedelta(days=1)).timestamp() if args.until else None
+        total_posts = run_social_pipeline(replay=True, replay_sources=args.sources, replay_since=since, replay_until=until)
+        social_ai.flush_stats(logger, "social_ai")
+        logger.finish_run("SUCCESS", {"posts_reprocessed": total_posts})
+    except Exception as e:
+        logger.finish_run("FAILED", {"error": str(e)})
+
+# Enrichment updates/deletes, flushed as unordered batches while the next batch is analyzed
+enrich_writer = BulkWriter(db['posts'], name="enriched posts")
+
+# Posts per analyze_batch() call (scaled so every inference worker gets a full chunk)
+ENRICH_BATCH_SIZE = 64 * max(1, getattr(ai_client, 'workers', 1))
+
+def enrich_batch(docs):
+    """ Analyzes a batch of un-enriched posts in one model pass and writes the outcome back. """
+    # AI Inference (batched)
+    analyses = ai_client.analyze_batch([doc.get('content', '') for doc in docs])
+
+    count = 0
+    for doc, analysis in zip(docs, analyses):
+        if analysis and analysis['is_relevant']:
+            enrich_writer.add(UpdateOne({"_id": doc["_id"]}, {"$set": {"analysis": analysis}}))
+            count += 1
+        else:
+            # Remove irrelevant to keep DB clean
+            enrich_writer.add(DeleteOne({"_id": doc["_id"]}))
+    return count
+
 def enrich_data():
     logger = PipelineLogger()
     logger.start_run("Data Enrichment")
     print("🚀 Starting Data Enrichment...")
+    start_inference()
     
     try:
         # Fetch un-enriched posts
-        cursor = db['posts'].find({"analysis": {"$exists": False}})
+        cursor = db['posts'].find({"analysis": {"$exists": False}}, {"content": 1})
         count = 0
         
+        batch = []
         for doc in cursor:
-            # AI Inference
-            analysis = ai_client.analyze(doc.get('content', ''))
-            
-            if analysis and analysis['is_relevant']:
-                db['posts'].update_one({"_id": doc["_id"]}, {"$set": {"analysis": analysis}})
-                count += 1
-            else:
-                # Remove irrelevant to keep DB clean
-                db['posts'].delete_one({"_id": doc["_id"]})
+            batch.append(doc)
+            if len(batch) >= ENRICH_BATCH_SIZE:
+                count += enrich_batch(batch)
+                batch = []
+        if batch:
+            count += enrich_batch(batch)
+        enrich_writer.close()
+        writes = enrich_writer.stats()
+        logger.record_metrics("enrich_writes", writes)
                 
         print(f"   ✅ Enriched {count} records.")
-        logger.finish_run("SUCCESS", {"enriched_count": count})
+        ai_client.flush_stats(logger)
+        logger.finish_run("SUCCESS", {"enriched_count": count, "write_failures": writes["counters"].get("failed", 0)})
     except Exception as e:
+        enrich_writer.close() # whatever was queued still gets written
         logger.finish_run("FAILED", {"error": str(e)})
 
 def forecast_trends():
@@ -425,6 +498,17 @@ def main():
     subparsers.add_parser('fetch', help='Fetch data from all sources')
     subparsers.add_parser('process', help='Enrich data with AI & Forecast')
     subparsers.add_parser('info', help='Show database statistics')
+    backfill = subparsers.add_parser('backfill', help='Resumable historical backfill of the news/proxy miners')
+    backfill.add_argument('--sources', nargs='+', choices=sorted(BACKFILL_SOURCES), help='Sources to backfill (default: all)')
+    backfill.add_argument('--from-year', type=int, help='Newest year window (default: last year)')
+    backfill.add_argument('--to-year', type=int, default=2005, help='Oldest year window')
+    backfill.add_argument('--keywords', type=int, help='Only the first N keywords (alphabetical)')
+    backfill.add_argument('--workers', type=int, help='Concurrent windows (default: AGRI_BACKFILL_WORKERS or 16)')
+    backfill.add_argument('--reset', action='store_true', help='Forget completed windows and start over')
+    replay = subparsers.add_parser('replay', help='Re-analyze archived social responses offline')
+    replay.add_argument('--sources', nargs='+', choices=sorted(ARCHIVE_PARSERS), help='Sources to replay (default: all)')
+    replay.add_argument('--since', help='Only responses fetched on or after this date (YYYY-MM-DD)')
+    replay.add_argument('--until', help='Only responses fetched on or before this date (YYYY-MM-DD)')
     
     args = parser.parse_args()
     
@@ -432,6 +516,8 @@ def main():
     elif args.command == 'process': 
         enrich_data()
         forecast_trends()
+    elif args.command == 'backfill': run_backfill_job(args)
+    elif args.command == 'replay': run_replay_job(args)
     elif args.command == 'info':
         print("📊 DB Stats:")
         for name in db.list_collection_names():
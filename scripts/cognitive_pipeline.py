@@ -13,6 +13,8 @@ try:
     from advanced_analytics.drift_monitor import DriftDetector
     from advanced_analytics.relevance_gate import RelevanceGate
     from advanced_analytics.graph_engine import GraphEngine
+    from utils.inference_daemon import connect_daemon
+    from utils.http_fixtures import run_seed
 except ImportError:
     import sys
     import os
@@ -23,6 +25,8 @@ except ImportError:
     from advanced_analytics.drift_monitor import DriftDetector
     from advanced_analytics.relevance_gate import RelevanceGate
     from advanced_analytics.graph_engine import GraphEngine
+    from utils.inference_daemon import connect_daemon
+    from utils.http_fixtures import run_seed
 
 class CognitivePipeline:
     """
@@ -35,7 +39,7 @@ class CognitivePipeline:
         self.nlp = NLPEngine()
         self.forecaster = ForecastingEngine()
         self.drift_detector = DriftDetector(sensitivity=0.01)
-        self.relevance_gate = RelevanceGate()
+        self.relevance_gate = RelevanceGate(remote=connect_daemon()) # shared DistilBART-MNLI if the daemon is up
         self.graph_engine = GraphEngine()
         
         # Flink-style State
@@ -46,25 +50,16 @@ class CognitivePipeline:
     def _real_data_stream(self):
         """ Fetches REAL data from Social Media Pipeline """
         try:
-            from social_media_pipeline import fetch_reddit, fetch_google_news, fetch_youtube_videos, fetch_mastodon, fetch_hacker_news, fetch_medium, fetch_lemmy, fetch_social_proxy, fetch_web_scrape
+            from social_media_pipeline import run_social_pipeline
         except ImportError:
             # Fallback path if running from subdir
             sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-            from social_media_pipeline import fetch_reddit, fetch_google_news, fetch_youtube_videos, fetch_mastodon, fetch_hacker_news, fetch_medium, fetch_lemmy, fetch_social_proxy, fetch_web_scrape
+            from social_media_pipeline import run_social_pipeline
 
         print("   📡 Fetching fresh data batches from Social Sources...")
         
-        # Batch Fetch
-        all_items = []
-        all_items.extend(fetch_reddit(dry_run=True))
-        all_items.extend(fetch_google_news(dry_run=True))
-        all_items.extend(fetch_youtube_videos(dry_run=True))
-        all_items.extend(fetch_mastodon(dry_run=True))
-        all_items.extend(fetch_hacker_news(dry_run=True))
-        all_items.extend(fetch_medium(dry_run=True))
-        all_items.extend(fetch_lemmy(dry_run=True))
-        all_items.extend(fetch_social_proxy(dry_run=True))
-        all_items.extend(fetch_web_scrape(dry_run=True))
+        # Batch Fetch (all sources concurrently)
+        all_items = run_social_pipeline(dry_run=True)
         
         random.shuffle(all_items) # Simulate interleaved stream
         
@@ -80,6 +75,8 @@ class CognitivePipeline:
     def process_stream(self, max_events=100):
         """ Main Processing Loop (Consumer) """
         print("📡 Connecting to Cognitive Data Stream...")
+        if run_seed() is not None:
+            random.seed(run_seed()) # repeatable runs (fixtures / AGRI_RANDOM_SEED)
         
         # Connect to DB for Storage
         import pymongo
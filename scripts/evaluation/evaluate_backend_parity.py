@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import argparse
+
+# Add script dir to path (Parent directory 'scripts/')
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+
+from utils.ai_client import AgriAIClient
+from evaluation.evaluate_comprehensive import TEST_DATA
+from test_sentiment_accuracy import TEST_CASES as ACCURACY_CASES
+from test_sentiment_batch_34 import TEST_CASES as BATCH_34_CASES
+
+# Minimum raw-label agreement with the PyTorch model before a backend is trusted
+MIN_AGREEMENT = {"onnx": 1.0, "onnx-int8": 0.95}
+
+
+def run_backend(backend, texts):
+    """ Returns (raw model predictions, final analyze() labels, seconds) for one backend. """
+    ai = AgriAIClient(use_cache=False, backend=backend)
+
+    # Warm up outside the timed region (model load + first allocation)
+    ai._predict_sentiment(texts[:2])
+
+    t0 = time.perf_counter()
+    raw = ai._predict_sentiment(texts)
+    elapsed = time.perf_counter() - t0
+
+    final = []
+    for res in ai.analyze_batch(texts):
+        final.append(res.get('sentiment_class', 'Irrelevant') if res and res.get('is_relevant') else 'Irrelevant')
+    return ai.backend, raw, final, elapsed
+
+
+def evaluate_backend_parity(backends):
+    print("🔬 RUNNING INFERENCE BACKEND PARITY CHECK...")
+    texts = [text for text, _ in TEST_DATA + ACCURACY_CASES + BATCH_34_CASES]
+    print(f"   🧪 {len(texts)} samples from the existing evaluation sets\n")
+
+    _, ref_raw, ref_final, ref_time = run_backend("torch", texts)
+    print(f"   ⏱️ torch: {round(ref_time * 1000, 1)} ms")
+
+    all_ok = True
+    for backend in backends:
+        actual_backend, raw, final, elapsed = run_backend(backend, texts)
+        if actual_backend != backend:
+            print(f"❌ [{backend}] Backend could not be loaded (fell back to {actual_backend}).")
+            all_ok = False
+            continue
+
+        label_matches = sum(1 for a, b in zip(ref_raw, raw) if a and b and a[0] == b[0])
+        final_matches = sum(1 for a, b in zip(ref_final, final) if a == b)
+        max_delta = max(abs(a[1] - b[1]) for a, b in zip(ref_raw, raw) if a and b)
+        agreement = label_matches / len(texts)
+
+        print("=" * 60)
+        print(f"📊 {backend} vs torch")
+        print("=" * 60)
+        print(f"Raw Label Agreement:    {label_matches}/{len(texts)} ({agreement * 100:.2f}%)")
+        print(f"Final Label Agreement:  {final_matches}/{len(texts)} ({final_matches / len(texts) * 100:.2f}%)")
+        print(f"Max Score Delta:        {max_delta:.4f}")
+        print(f"Latency:                {round(elapsed * 1000, 1)} ms ({ref_time / elapsed:.2f}x torch)")
+
+        for text, a, b in zip(texts, ref_raw, raw):
+            if a and b and a[0] != b[0]:
+                print(f"   ⚠️ [{a[0]} -> {b[0]}] '{text[:60]}...'")
+
+        if agreement >= MIN_AGREEMENT.get(backend, 1.0):
+            print("Verdict: ✅ Parity OK.")
+        else:
+            print(f"Verdict: ❌ Below required agreement ({MIN_AGREEMENT.get(backend, 1.0) * 100:.0f}%).")
+            all_ok = False
+
+    return all_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ONNX backends against the PyTorch sentiment model")
+    parser.add_argument('--backends', nargs='+', default=["onnx", "onnx-int8"])
+    args = parser.parse_args()
+    sys.exit(0 if evaluate_backend_parity(args.backends) else 1)
@@ -16,41 +16,44 @@ from sklearn.metrics import (
 # Add script dir to path
 # Add script dir to path (Parent directory 'scripts/')
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
-from utils.ai_client import AgriAIClient
+from utils.ai_client import create_ai_client
+
+# 21-Sample Synthetic Test Data (Same consistency)
+TEST_DATA = [
+    # Positive
+    ("Rice production in Punjab has reached record highs this season due to good rains.", "Positive"),
+    ("Farmers are happy with the new MSP prices announced for wheat.", "Positive"),
+    ("New irrigation technology has boosted soybean yields by 20%.", "Positive"),
+    ("Export ban lift is a great opportunity for Indian onion farmers.", "Positive"),
+    ("Excellent weather conditions forecast for the harvest in Madhya Pradesh.", "Positive"),
+    ("Government subsidies on fertilizer have significantly reduced costs.", "Positive"),
+    ("Bumper crop expected for cotton this year.", "Positive"),
+    ("Tech adoption in farming is profitable.", "Positive"),
+
+    # Negative
+    ("Locust attack destroys hectares of bajra fields in Rajasthan.", "Negative"),
+    ("Heavy rains caused massive flooding, damaging the paddy crops.", "Negative"),
+    ("Farmers protest against low market prices for tomatoes.", "Negative"),
+    ("Drought conditions are threatening the upcoming sowing season.", "Negative"),
+    ("Pest infestation is widespread in the sugarcane belt.", "Negative"),
+    ("Fertilizer shortage is causing anxiety among small farmers.", "Negative"),
+    ("Wheat prices crashed today at the local mandi.", "Negative"),
+    ("Poor monsoon will lead to lower yields.", "Negative"),
+
+    # Neutral
+    ("The government released the agricultural census data today.", "Neutral"),
+    ("Wheat is sown in the Rabi season.", "Neutral"),
+    ("The conference on sustainable farming starts tomorrow.", "Neutral"),
+    ("Prices of vegetables vary by region.", "Neutral"),
+    ("The Ministry of Agriculture is located in New Delhi.", "Neutral"),
+]
+
 
 def evaluate_comprehensive():
     print("🔬 RUNNING COMPREHENSIVE MODEL EVALUATION...")
-    ai = AgriAIClient()
+    ai = create_ai_client() # Uses the inference daemon if one is running
     
-    # 21-Sample Synthetic Test Data (Same consistency)
-    test_data = [
-        # Positive
-        ("Rice production in Punjab has reached record highs this season due to good rains.", "Positive"),
-        ("Farmers are happy with the new MSP prices announced for wheat.", "Positive"),
-        ("New irrigation technology has boosted soybean yields by 20%.", "Positive"),
-        ("Export ban lift is a great opportunity for Indian onion farmers.", "Positive"),
-        ("Excellent weather conditions forecast for the harvest in Madhya Pradesh.", "Positive"),
-        ("Government subsidies on fertilizer have significantly reduced costs.", "Positive"),
-        ("Bumper crop expected for cotton this year.", "Positive"),
-        ("Tech adoption in farming is profitable.", "Positive"),
-
-        # Negative
-        ("Locust attack destroys hectares of bajra fields in Rajasthan.", "Negative"),
-        ("Heavy rains caused massive flooding, damaging the paddy crops.", "Negative"),
-        ("Farmers protest against low market prices for tomatoes.", "Negative"),
-        ("Drought conditions are threatening the upcoming sowing season.", "Negative"),
-        ("Pest infestation is widespread in the sugarcane belt.", "Negative"),
-        ("Fertilizer shortage is causing anxiety among small farmers.", "Negative"),
-        ("Wheat prices crashed today at the local mandi.", "Negative"),
-        ("Poor monsoon will lead to lower yields.", "Negative"),
-
-        # Neutral
-        ("The government released the agricultural census data today.", "Neutral"),
-        ("Wheat is sown in the Rabi season.", "Neutral"),
-        ("The conference on sustainable farming starts tomorrow.", "Neutral"),
-        ("Prices of vegetables vary by region.", "Neutral"),
-        ("The Ministry of Agriculture is located in New Delhi.", "Neutral"),
-    ]
+    test_data = TEST_DATA
 
     y_true = []
     y_pred = []
@@ -9,12 +9,13 @@ sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
 from advanced_analytics.relevance_gate import RelevanceGate
 from advanced_analytics.nlp_engine import NLPEngine
+from utils.inference_daemon import connect_daemon
 
 def run_evaluation():
     print("🧪 Starting Model Evaluation (Accuracy & F1 Score)...")
     
     # 1. Initialize Models
-    gate = RelevanceGate()
+    gate = RelevanceGate(remote=connect_daemon())
     nlp = NLPEngine()
     
     # 2. Golden Dataset (Ground Truth)
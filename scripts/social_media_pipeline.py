@@ -1,15 +1,18 @@
 import os
 import sys
-import requests
 import pymongo
-import xml.etree.ElementTree as ET
 import re
 import hashlib
+import json
 from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
 from dotenv import load_dotenv
-from pymongo import UpdateOne
 import random
 import time
+import queue
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Add script dir to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -31,9 +34,19 @@ db = client.get_database('agri_trend_dashboard')
 # ENTERPRISE GATEKEEPER & KEYWORDS
 # ==========================================
 try:
-    from utils.ai_client import AgriAIClient
+    from utils.ai_client import create_ai_client
+    from utils.http_client import http_get, get_http_client
+    from utils.response_archive import ResponseArchive
+    from utils.cursor_store import CursorStore
+    from utils.backfill_store import BackfillStore
+    from utils.date_windows import DateWindow, WindowTree
+    from utils.http_fixtures import fixture_mode, run_seed, get_fixture_transport
+    from utils.seen_set import SeenSet
+    from utils.near_dup import NearDupIndex
+    from utils.bulk_writer import BulkWriter
+    from utils.feed_parser import iter_rss_items, strip_html, DC_CREATOR
     print("🧠 [INIT] Initializing AgriAIClient for Real-Time Analysis...")
-    AI = AgriAIClient()
+    AI = create_ai_client()
 except ImportError:
     print("⚠️ [INIT] AgriAIClient NOT FOUND. Aborting.")
     sys.exit(1)
@@ -60,37 +73,368 @@ except ImportError:
 # DATA FETCHING
 # ==========================================
 
+# Concurrent fetch tasks per source (pages, years, tags...). Requests per host stay
+# bounded by the shared HTTP client (AGRI_HOST_CONCURRENCY / AGRI_HOST_LIMITS).
+FETCH_WORKERS = int(os.getenv("AGRI_FETCH_WORKERS", "8"))
+
+# Newest ingested item per (source, query): incremental runs stop paging there
+CURSORS = CursorStore(db['fetch_cursors'])
+
+# Google News RSS returns at most this many items per search (AGRI_FEED_CAP); windows that
+# hit it are split year -> half -> quarter -> month, and the split tree is kept in Mongo
+FEED_CAP = int(os.getenv("AGRI_FEED_CAP", "100"))
+WINDOWS = WindowTree(db['feed_windows'])
+
+# Per-window completion state of historical backfills (run_backfill)
+BACKFILL = BackfillStore(db['backfill_tasks'])
+
+# Everything already saved or rejected (AGRI_SEEN_SET=0 disables, AGRI_SEEN_FP_RATE sets the error rate)
+if os.getenv("AGRI_SEEN_SET", "1") != "0":
+    _analysis_version = getattr(AI, "analysis_version", None)
+    SEEN = SeenSet(version=_analysis_version() if _analysis_version else None)
+else:
+    SEEN = None
+
+# Syndicated copies of one story under different URLs (AGRI_NEAR_DUP): "tag" saves copies with
+# the representative's analysis and a dup_cluster_id, "drop" skips them, "0" disables detection
+NEAR_DUP_MODE = os.getenv("AGRI_NEAR_DUP", "tag").lower()
+NEAR_DUPS = NearDupIndex() if NEAR_DUP_MODE != "0" else None
+
+# Response-cache TTLs (seconds) for the RSS feeds; closed historical year windows are never refetched
+FEED_TTLS = {"google_news": 6 * 3600, "social_proxy": 6 * 3600, "medium": 3600}
+HISTORICAL_TTL = float("inf")
+
+def feed_ttl(source, year=None):
+    """ Cache TTL for a feed request (a year window ending before last year is final). """
+    if year is not None and year < datetime.now().year - 1:
+        return HISTORICAL_TTL
+    return FEED_TTLS[source]
+
+def source_random(name):
+    """
+    Random generator for a fetcher's query sampling. Seeded per source when a run seed is
+    set (AGRI_RANDOM_SEED, or HTTP fixtures), so concurrent fetchers pick the same queries every run.
+    """
+    seed = run_seed()
+    return random.Random(f"{seed}:{name}") if seed is not None else random
+
+def start_inference():
+    """
+    Starts the inference worker pool (AGRI_INFERENCE_WORKERS) before a run creates its thread
+    pools. Importing this module stays cheap: no model is loaded for commands that never analyze.
+    """
+    if hasattr(AI, "start"):
+        AI.start()
+
 def display_source_header(source_name):
     print(f"   🔹 Fetching {source_name}...")
 
+def _base36(value):
+    """ Reddit ids are base36 and grow over time, so they compare as integers. """
+    try:
+        return int(value, 36) if value else None
+    except (TypeError, ValueError):
+        return None
+
+def run_concurrently(fn, items, max_workers=None):
+    """
+    Calls fn(item) for every item on a thread pool; results come back in item order.
+    While one task waits on the network, the others analyze and persist what they got.
+    """
+    items = list(items)
+    workers = min(max_workers or FETCH_WORKERS, len(items))
+    if workers <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fn, items))
+
+def analyze_candidates(candidates, on_reject=None, dry_run=False):
+    """
+    Runs batched AI analysis over (text, doc) candidates from one page/response.
+    Returns the relevant docs (with 'analysis' attached), in fetch order.
+    Items in the seen-set (saved or rejected by an earlier run) are dropped before analysis.
+    Near-duplicates of an already analyzed text reuse its analysis and get a dup_cluster_id.
+    """
+    if SEEN is not None and not dry_run:
+        candidates = [(text, doc) for text, doc in candidates if doc["reddit_id"] not in SEEN]
+    if not candidates: return []
+
+    # One representative per cluster goes to the model
+    clusters = {}
+    for text, doc in candidates:
+        if NEAR_DUPS is not None:
+            clusters[id(doc)] = NEAR_DUPS.assign(doc["reddit_id"], text)
+    pending = [(text, doc) for text, doc in candidates if clusters.get(id(doc), doc["reddit_id"]) == doc["reddit_id"]]
+    analyses = {}
+    for (text, doc), analysis in zip(pending, AI.analyze_batch([text for text, _ in pending]) if pending else []):
+        analyses[id(doc)] = analysis
+        if NEAR_DUPS is not None and analysis: NEAR_DUPS.set_analysis(doc["reddit_id"], analysis)
+
+    # Copies whose representative is still pending elsewhere (or failed) are analyzed themselves
+    copies = [(text, doc) for text, doc in candidates if id(doc) not in analyses]
+    unresolved = []
+    for text, doc in copies:
+        analysis = NEAR_DUPS.analysis(clusters[id(doc)])
+        if analysis is None:
+            unresolved.append((text, doc))
+        else:
+            analyses[id(doc)] = dict(analysis)
+            doc["dup_cluster_id"] = clusters[id(doc)]
+    for (text, doc), analysis in zip(unresolved, AI.analyze_batch([text for text, _ in unresolved]) if unresolved else []):
+        analyses[id(doc)] = analysis
+
+    accepted = []
+    rejected = []
+    for text, doc in candidates:
+        analysis = analyses.get(id(doc))
+        if not analysis or not analysis['is_relevant']:
+            if on_reject: on_reject(doc, analysis)
+            if analysis: rejected.append(doc["reddit_id"]) # failed analyses get another chance
+            continue
+        if NEAR_DUP_MODE == "drop" and "dup_cluster_id" in doc:
+            rejected.append(doc["reddit_id"])
+            continue
+        doc["analysis"] = analysis
+        accepted.append(doc)
+
+    # Rejections (and dropped copies) are final; accepted docs are marked once saved (mark_seen)
+    if SEEN is not None and not dry_run:
+        SEEN.add_many(rejected)
+    return accepted
+
+def mark_seen(doc_ids):
+    """ Records saved docs in the seen-set. """
+    if SEEN is not None:
+        SEEN.add_many(doc_ids)
+
+# ==========================================
+# INGEST PIPELINE (fetch -> analyze -> write)
+# ==========================================
+
+# Every post is upserted by reddit_id (each source prefixes its own ids: news_, yt_, proxy_...)
+POSTS = BulkWriter(db['posts'], name="posts")
+
+class IngestTicket:
+    """
+    One submitted page/response. wait() blocks until its docs were analyzed and
+    (live runs) written; then accepted / saved / ok describe the outcome.
+    """
+
+    def __init__(self, candidates, dry_run, on_reject):
+        self.candidates = candidates
+        self.dry_run = dry_run
+        self.on_reject = on_reject
+        self.accepted = []
+        self.saved = 0
+        self.ok = True
+        self._unwritten = 0
+        self._saved_ids = []
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def finish(self, ok=True):
+        self.ok = self.ok and ok
+        self._done.set()
+
+    def write(self, writer):
+        """ Hands the accepted docs to the writer; the ticket finishes once all of them are written. """
+        self._unwritten = len(self.accepted)
+        for doc in self.accepted:
+            writer.upsert(doc, key="reddit_id", on_done=lambda ok, doc_id=doc["reddit_id"]: self._written(doc_id, ok))
+
+    def _written(self, doc_id, ok):
+        with self._lock:
+            if ok:
+                self.saved += 1
+                self._saved_ids.append(doc_id)
+            else:
+                self.ok = False
+            self._unwritten -= 1
+            if self._unwritten:
+                return
+        mark_seen(self._saved_ids)
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        return self
+
+
+class IngestPipeline:
+    """
+    Staged pipeline shared by all fetchers:
+      fetch threads --submit()--> [analysis queue] --> analysis worker(s) --> POSTS writer
+    The analysis worker merges queued submissions into one AI.analyze_batch call (up to
+    analysis_batch texts); accepted docs go to the shared BulkWriter, which coalesces them
+    into unordered bulk_write calls (see utils/bulk_writer.py).
+    The queue and the writer buffer are bounded, so a slow model or database makes
+    submit() block (backpressure). Threads start on first submit; close() drains
+    everything and stops them.
+    """
+
+    def __init__(self, writer=None, analysis_workers=None, analysis_batch=None, queue_size=None):
+        self.writer = writer or POSTS
+        self.analysis_workers = analysis_workers or int(os.getenv("AGRI_ANALYSIS_WORKERS", "1"))
+        self.analysis_batch = analysis_batch or int(os.getenv("AGRI_ANALYSIS_BATCH", "128"))
+        self.queue_size = queue_size or int(os.getenv("AGRI_INGEST_QUEUE", "32"))
+        self._threads = []
+        self._lock = threading.Lock()
+        self.counters = {"submitted": 0, "analysis_batches": 0}
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._analysis_queue = queue.Queue(maxsize=self.queue_size)
+            self._threads = [
+                threading.Thread(target=self._analysis_loop, name=f"ingest-analysis-{i}", daemon=True)
+                for i in range(self.analysis_workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def submit(self, candidates, dry_run=False, on_reject=None):
+        """ Queues (text, doc) candidates for analysis + upsert; returns an IngestTicket. """
+        ticket = IngestTicket(candidates, dry_run, on_reject)
+        if not candidates:
+            ticket.finish()
+            return ticket
+        self.start()
+        self._analysis_queue.put(ticket) # blocks while the analysis stage is saturated
+        with self._lock:
+            self.counters["submitted"] += 1
+        return ticket
+
+    def _analysis_loop(self):
+        while True:
+            ticket = self._analysis_queue.get()
+            if ticket is None:
+                return
+            # Merge whatever else is already waiting into the same model batch
+            batch = [ticket]
+            size = len(ticket.candidates)
+            stop = False
+            while size < self.analysis_batch:
+                try:
+                    more = self._analysis_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    stop = True
+                    break
+                batch.append(more)
+                size += len(more.candidates)
+            self._analyze(batch)
+            if stop:
+                return
+
+    def _analyze(self, batch):
+        with self._lock:
+            self.counters["analysis_batches"] += 1
+        # Live and dry-run tickets differ in seen-set handling, so they are analyzed apart
+        for dry_run in (False, True):
+            tickets = [t for t in batch if t.dry_run == dry_run]
+            if not tickets:
+                continue
+            owner = {id(doc): t for t in tickets for _, doc in t.candidates}
+            def on_reject(doc, analysis):
+                t = owner[id(doc)]
+                if t.on_reject: t.on_reject(doc, analysis)
+            try:
+                accepted = analyze_candidates(
+                    [c for t in tickets for c in t.candidates], on_reject=on_reject, dry_run=dry_run
+                )
+            except Exception as e:
+                print(f"      ⚠️ [Ingest] Analysis failed for {len(tickets)} submissions: {e}")
+                for t in tickets:
+                    t.finish(ok=False)
+                continue
+            for doc in accepted:
+                owner[id(doc)].accepted.append(doc)
+            for t in tickets:
+                if dry_run or not t.accepted:
+                    t.finish()
+                else:
+                    t.write(self.writer) # blocks while the writer buffer is full
+
+    def close(self):
+        """ Drains the analysis stage and the writer (every submitted ticket completes), then stops the threads. """
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._analysis_queue.put(None)
+        for thread in threads:
+            thread.join()
+        self.writer.close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+
+INGEST = IngestPipeline()
+atexit.register(INGEST.close)
+
+def collect(tickets):
+    """ Waits for tickets; returns (accepted docs, saved count, whether every write succeeded). """
+    docs, saved, ok = [], 0, True
+    for ticket in tickets:
+        ticket.wait()
+        docs.extend(ticket.accepted)
+        saved += ticket.saved
+        ok = ok and ticket.ok
+    return docs, saved, ok
+
+def reddit_candidate(item):
+    """ (text to analyze, post doc) for a Reddit search result. """
+    title = item.get('title', '')
+    content = item.get('selftext', '') or title
+    return f"{title} {content}", {
+        "reddit_id": f"rd_{item.get('id')}",
+        "title": title,
+        "content": content,
+        "url": f"https://reddit.com{item.get('permalink')}",
+        "author": item.get('author', 'Unknown'),
+        "timestamp": datetime.fromtimestamp(item.get('created_utc', 0)),
+        "subreddit": item.get('subreddit'),
+        "score": item.get('score', 0),
+        "num_comments": item.get('num_comments', 0),
+        "source": "reddit"
+    }
+
 def fetch_reddit(dry_run=False):
     display_source_header("Reddit (Deep Fetch)")
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
     
-    if not SEARCH_KEYWORDS: return 0
+    if not SEARCH_KEYWORDS: return [] if dry_run else 0
 
-    # Randomly select a subset to ensure variety per run
-    # (Since we loop 500 times, we can cover a lot)
-    selected_keywords = random.sample(SEARCH_KEYWORDS, min(len(SEARCH_KEYWORDS), 20))
-    chunks = [selected_keywords[i:i + 3] for i in range(0, len(selected_keywords), 3)]
-    
-    total_upserted = 0
-    MAX_LOOPS = 500 
-    
-    for chunk in chunks:
+    # Randomly select a subset of keyword chunks to ensure variety per run
+    # (Chunks are fixed across runs so every query keeps its own incremental cursor)
+    ordered_keywords = sorted(SEARCH_KEYWORDS)
+    all_chunks = [ordered_keywords[i:i + 3] for i in range(0, len(ordered_keywords), 3)]
+    chunks = source_random("reddit").sample(all_chunks, min(len(all_chunks), 7))
+
+    MAX_LOOPS = 500
+
+    def fetch_chunk(chunk):
+        tickets = []
         query = " OR ".join([f'"{k}"' for k in chunk])
         import urllib.parse
         encoded_query = urllib.parse.quote(query)
         after = None
-        
+
+        # [INCREMENTAL] Results are newest-first: stop at the newest post saved by the last run
+        stop_id = None if dry_run else _base36(CURSORS.get("reddit", query).get("newest_id"))
+        newest = None
+        complete = False
+
         for i in range(MAX_LOOPS):
-            page_posts = []
             try:
                 url = f"https://www.reddit.com/search.json?q={encoded_query}&sort=new&limit=100"
                 if after: url += f"&after={after}"
                 
                 print(f"      📡 Reddit Page {i+1} (Query: {chunk[0]}...)...")
-                resp = requests.get(url, headers=headers, timeout=10)
+                resp = http_get(url, headers=headers, timeout=10)
                 
                 if resp.status_code != 200:
                     print(f"      ⚠️ Reddit Block (Page {i+1}): {resp.status_code}")
@@ -99,135 +443,210 @@ def fetch_reddit(dry_run=False):
                 data = resp.json()
                 children = data.get('data', {}).get('children', [])
                 
-                if not children: break
-                    
+                if not children:
+                    complete = True
+                    break
+
+                candidates = []
+                caught_up = False
                 for child in children:
                     item = child['data']
-                    title = item.get('title', '')
-                    content = item.get('selftext', '') or title
-                    combined_text = f"{title} {content}"
-                    
-                    # [AI ANALYSIS]
-                    analysis = AI.analyze(combined_text)
-
-                    if not analysis or not analysis['is_relevant']:
-                        # [LOG WHY]
-                        if i < 2: 
-                             reason = analysis.get('reason') if analysis else "Low Score"
-                             print(f"      🗑️ [REJECTED] {title[:40]}... ({reason})")
-                        continue 
-                    
-                    print(f"      ✅ [ACCEPTED] {title[:50]}... ({analysis['sentiment_class']})")
-                    
-                    doc = {
-                        "reddit_id": f"rd_{item.get('id')}",
-                        "title": title,
-                        "content": content,
-                        "url": f"https://reddit.com{item.get('permalink')}",
-                        "author": item.get('author', 'Unknown'),
-                        "timestamp": datetime.fromtimestamp(item.get('created_utc', 0)),
-                        "subreddit": item.get('subreddit'),
-                        "score": item.get('score', 0),
-                        "num_comments": item.get('num_comments', 0),
-                        "source": "reddit",
-                        "analysis": analysis
-                    }
-                    page_posts.append(doc)
-                
-                # Upsert Immediately
-                if page_posts:
-                    ops = [UpdateOne({"reddit_id": p["reddit_id"]}, {"$set": p}, upsert=True) for p in page_posts]
-                    if not dry_run:
-                        try:
-                            # Re-verify DB connection if needed
-                            db['posts'].bulk_write(ops)
-                            total_upserted += len(ops)
-                            print(f"          💾 Saved {len(ops)} agri-posts.")
-                        except Exception as e:
-                             print(f"          ⚠️ Save Error: {e}")
+                    item_id = _base36(item.get('id'))
+                    if stop_id is not None and item_id is not None and item_id <= stop_id:
+                        caught_up = True
+                        break
+                    if item_id is not None and (newest is None or item_id > _base36(newest['id'])):
+                        newest = item
+                    candidates.append(reddit_candidate(item))
+
+                def log_reject(doc, analysis):
+                    # [LOG WHY]
+                    if i < 2: 
+                         reason = analysis.get('reason') if analysis else "Low Score"
+                         print(f"      🗑️ [REJECTED] {doc['title'][:40]}... ({reason})")
+
+                # [AI ANALYSIS + UPSERT] handed to the ingest pipeline; the next page is fetched meanwhile
+                tickets.append(INGEST.submit(candidates, dry_run=dry_run, on_reject=log_reject))
+
+                if caught_up:
+                    print(f"      ⏹️ Reddit caught up with last run (Query: {chunk[0]}..., Page {i+1}).")
+                    complete = True
+                    break
 
                 after = data.get('data', {}).get('after')
-                if not after: break
-                time.sleep(2) 
-                
+                if not after:
+                    complete = True
+                    break
+
             except Exception as e:
                 print(f"      ⚠️ Error in Reddit Loop: {e}")
                 break
-                
-    return total_upserted
+        else:
+            complete = True
+
+        chunk_docs, chunk_upserted, saved_ok = collect(tickets)
+        for doc in chunk_docs:
+            print(f"      ✅ [ACCEPTED] {doc['title'][:50]}... ({doc['analysis']['sentiment_class']})")
+
+        # Move the cursor only once everything newer than it was saved (an interrupted run leaves no gap)
+        if complete and saved_ok and newest is not None and not dry_run:
+            CURSORS.advance("reddit", query, newest_id=newest['id'], newest_fullname=newest.get('name'),
+                            newest_created_utc=newest.get('created_utc'))
+
+        return chunk_docs if dry_run else chunk_upserted
+
+    # Chunks page independently (the host limit keeps Reddit at one request at a time)
+    results = run_concurrently(fetch_chunk, chunks)
+    if dry_run: return [doc for docs in results for doc in docs]
+    return sum(results)
+
+# Platforms mined through Google News "site:" searches
+PROXY_PLATFORMS = [
+    {"name": "Facebook", "domain": "facebook.com"},
+    {"name": "Instagram", "domain": "instagram.com"}
+]
+
+def mine_windows(source, query, year, request, ingest, dry_run=False):
+    """
+    Searches a capped feed for `query` over `year`, splitting windows that come back full.
+    request(window) -> (url, response); ingest(response, window) -> IngestTicket.
+    Windows already known to be capped (WINDOWS) are skipped in favour of their children.
+    A window whose request fails is logged and skipped; the rest of the year still runs.
+    Returns ([(feed url, ticket)] for the leaf windows that had new content, [failed window errors]).
+    """
+    feeds = []
+    failed = []
+    pending = [DateWindow.year(year)]
+    while pending:
+        window = pending.pop(0)
+        children = window.children()
+        if children and WINDOWS.is_split(source, query, window):
+            pending[:0] = children
+            continue
+
+        try:
+            url, resp = request(window)
+            error = None if resp.status_code == 200 else f"HTTP {resp.status_code}"
+        except Exception as e:
+            error = str(e)
+        if error:
+            print(f"        ⚠️ {source} window {window.key} for '{query}' failed: {error}")
+            failed.append(f"{window.key}: {error}")
+            continue
+        if children and WINDOWS.enabled:
+            count = resp.content.count(b"<item>")
+            if count >= FEED_CAP:
+                WINDOWS.mark_split(source, query, window, count)
+                pending[:0] = children
+                continue
+        # [CACHE] Same feed body as a run that already analyzed and saved it
+        if resp.not_modified and not dry_run: continue
+        feeds.append((url, ingest(resp, window)))
+    return feeds, failed
+
+def proxy_candidates(content, plat, window):
+    """ (text, doc) pairs for the items of a platform "site:" search feed over `window`. """
+    year = window.start.year
+    candidates = []
+    for item in iter_rss_items(content):
+        title = item['title']
+        link = item['link']
+        clean_desc = strip_html(item.get('description'))
+        clean_title = title.split(' - ')[0]
+
+        text_check = f"{clean_title} {clean_desc}"
+        doc_id = hashlib.md5(link.encode()).hexdigest()
+        candidates.append((text_check, {
+            "reddit_id": f"proxy_{doc_id}",
+            "title": f"[{plat['name']} {year}] {clean_title}",
+            "content": clean_desc if clean_desc else f"Archived content from {year}",
+            "url": link,
+            "source": plat['name'].lower(),
+            "timestamp": datetime(year, 6, 15) if window.level == "year" else window.midpoint,
+            "author": "Public User"
+        }))
+    return candidates
+
+def fetch_proxy_window(plat, kw, year, dry_run=False):
+    """
+    "site:" searches for a platform / keyword over a year (split while the feed is capped).
+    Returns ([(feed url, IngestTicket)] for the windows that had new content, [failed window errors]).
+    """
+    def request(window):
+        query = f"site:{plat['domain']} {kw} after:{window.start} before:{window.end}"
+
+        # Log progress every request so user knows it's not stuck
+        label = year if window.level == "year" else window.key
+        print(f"        -> Scanning {plat['name']} ({label}) for '{kw}'...")
+
+        url = f"https://news.google.com/rss/search?q={query.replace(' ', '+')}&hl=en-IN&gl=IN&ceid=IN:en"
+        return url, http_get(url, timeout=10, cache_ttl=feed_ttl("social_proxy", year))
+
+    def ingest(resp, window):
+        return INGEST.submit(proxy_candidates(resp.content, plat, window), dry_run=dry_run)
+
+    return mine_windows(plat['name'].lower(), kw, year, request, ingest, dry_run=dry_run)
 
 def fetch_social_proxy(dry_run=False):
     display_source_header("Web Proxy (Deep Time Machine)")
-    platforms = [
-        {"name": "Facebook", "domain": "facebook.com"},
-        {"name": "Instagram", "domain": "instagram.com"}
-    ]
+    platforms = PROXY_PLATFORMS
     
     current_keywords = SEARCH_KEYWORDS[:]
-    random.shuffle(current_keywords)
+    source_random("social_proxy").shuffle(current_keywords)
     start_year = datetime.now().year
     end_year = 2005
     
-    total_fetched = 0
-    
-    for plat in platforms:
-        print(f"      🗓️  Mining History for {plat['name']} (2025-{end_year})...")
-        for year in range(start_year, end_year - 1, -1):
-            year_posts = []
-            after_date = f"{year}-01-01"
-            before_date = f"{year}-12-31"
+    def fetch_year(task):
+        plat, year = task
+        feeds = [] # (url, ticket)
+        for kw in current_keywords[:10]: 
+            try:
+                window_feeds, _ = fetch_proxy_window(plat, kw, year, dry_run=dry_run)
+                feeds.extend(window_feeds)
+            except Exception: continue
             
-            for kw in current_keywords[:10]: 
-                try:
-                    query = f"site:{plat['domain']} {kw} after:{after_date} before:{before_date}"
-                    
-                    # Log progress every request so user knows it's not stuck
-                    print(f"        -> Scanning {plat['name']} ({year}) for '{kw}'...")
+        year_posts, saved, _ = collect(ticket for _, ticket in feeds)
+        if dry_run: return year_posts
+        if saved:
+            print(f"          💾 Saved {saved} historical posts ({plat['name']} {year}).")
+        get_http_client().confirm(url for url, ticket in feeds if ticket.ok)
+        return saved
 
-                    url = f"https://news.google.com/rss/search?q={query.replace(' ', '+')}&hl=en-IN&gl=IN&ceid=IN:en"
-                    
-                    resp = requests.get(url, timeout=10)
-                    if resp.status_code == 200:
-                        root = ET.fromstring(resp.content)
-                        items = root.findall('.//item')
-                        
-                        for item in items:
-                            title = item.find('title').text
-                            link = item.find('link').text
-                            description = item.find('description').text if item.find('description') is not None else ""
-                            clean_desc = re.sub('<[^<]+?>', '', description)
-                            clean_title = title.split(' - ')[0]
-                            
-                            text_check = f"{clean_title} {clean_desc}"
-                            analysis = AI.analyze(text_check)
-
-                            if not analysis or not analysis['is_relevant']:
-                                continue
-                            
-                            doc_id = hashlib.md5(link.encode()).hexdigest()
-                            year_posts.append({
-                                "reddit_id": f"proxy_{doc_id}",
-                                "title": f"[{plat['name']} {year}] {clean_title}",
-                                "content": clean_desc if clean_desc else f"Archived content from {year}",
-                                "url": link,
-                                "source": plat['name'].lower(),
-                                "analysis": analysis,
-                                "timestamp": datetime(year, 6, 15), 
-                                "author": "Public User"
-                            })
-                    time.sleep(1.0) 
-                except Exception: continue
-                
-            if year_posts:
-                ops = [UpdateOne({"reddit_id": p["reddit_id"]}, {"$set": p}, upsert=True) for p in year_posts]
-                if not dry_run:
-                    try:
-                        db['posts'].bulk_write(ops)
-                        total_fetched += len(ops)
-                        print(f"          💾 Saved {len(ops)} historical posts ({year}).")
-                    except: pass
+    print(f"      🗓️  Mining History for {', '.join(p['name'] for p in platforms)} ({start_year}-{end_year})...")
+    tasks = [(plat, year) for plat in platforms for year in range(start_year, end_year - 1, -1)]
+    results = run_concurrently(fetch_year, tasks)
+    if dry_run: return [doc for docs in results for doc in docs]
+    return sum(results)
 
-    return total_fetched
+def web_scrape_candidates(content, fetched_at):
+    """ (text, doc) pairs for the articles of a Modern Farmer category page. """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'html.parser')
+    # Extract Articles (Specific to ModernFarmer site structure, robust query)
+    articles = soup.select('article')[:5] 
+    
+    candidates = []
+    for art in articles:
+        try:
+            title_elem = art.select_one('h2 a')
+            if not title_elem: continue
+            
+            title = title_elem.get_text(strip=True)
+            link = title_elem['href']
+            doc_id = hashlib.md5(link.encode()).hexdigest()
+            
+            candidates.append((title, {
+                "reddit_id": f"bs4_{doc_id}",
+                "title": f"[Web] {title}",
+                "content": "Scraped via BeautifulSoup from Modern Farmer",
+                "url": link,
+                "source": "modern_farmer",
+                "timestamp": fetched_at,
+                "author": "Modern Farmer"
+            }))
+        except: continue
+    return candidates
 
 def fetch_web_scrape(dry_run=False):
     """
@@ -236,57 +655,56 @@ def fetch_web_scrape(dry_run=False):
     Target: ModernFarmer / Agriculture.com
     """
     display_source_header("Web Scraper (BS4)")
-    from bs4 import BeautifulSoup
-    
-    posts = []
+    tickets = []
     # Target: Modern Farmer
     url = "https://modernfarmer.com/category/politics-and-policy/"
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
     
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = http_get(url, headers=headers, timeout=10)
         if resp.status_code == 200:
-            soup = BeautifulSoup(resp.content, 'html.parser')
-            # Extract Articles (Specific to ModernFarmer site structure, robust query)
-            articles = soup.select('article')[:5] 
-            
-            for art in articles:
-                try:
-                    title_elem = art.select_one('h2 a')
-                    if not title_elem: continue
-                    
-                    title = title_elem.get_text(strip=True)
-                    link = title_elem['href']
-                    
-                    # [AI ANALYSIS]
-                    analysis = AI.analyze(title)
-                    if not analysis or not analysis['is_relevant']:
-                         continue
-
-                    doc_id = hashlib.md5(link.encode()).hexdigest()
-                    
-                    posts.append({
-                        "reddit_id": f"bs4_{doc_id}",
-                        "title": f"[Web] {title}",
-                        "content": "Scraped via BeautifulSoup from Modern Farmer",
-                        "url": link,
-                        "source": "modern_farmer",
-                        "analysis": analysis,
-                        "timestamp": datetime.now(),
-                        "author": "Modern Farmer"
-                    })
-                except: continue
+            # [AI ANALYSIS + UPSERT]
+            tickets.append(INGEST.submit(web_scrape_candidates(resp.content, datetime.now()), dry_run=dry_run))
     except Exception: pass
 
-    # Upsert
-    ops = [UpdateOne({"reddit_id": p["reddit_id"]}, {"$set": p}, upsert=True) for p in posts]
-    if ops:
-        if dry_run: return [op._doc["$set"] for op in ops]
-        try:
-            db['posts'].bulk_write(ops)
-            print(f"      ✅ Upserted {len(ops)} Scraped Articles (BS4).")
-        except Exception: return 0
-    return [] if dry_run else 0
+    posts, saved, _ = collect(tickets)
+    if dry_run: return posts
+    if saved: print(f"      ✅ Upserted {saved} Scraped Articles (BS4).")
+    return saved
+
+def news_candidates(content, window):
+    """ (text, doc) pairs for all items of a Google News archive search over `window`. """
+    candidates = []
+    for item in iter_rss_items(content):
+        title = item['title']
+        link = item['link']
+
+        news_id = hashlib.md5(link.encode()).hexdigest()
+        candidates.append((title, {
+            "reddit_id": f"news_{news_id}",
+            "title": title,
+            "content": title,
+            "url": link,
+            "timestamp": datetime.combine(window.start, datetime.min.time()),
+            "source": "news",
+            "author": "Google News Archive"
+        }))
+    return candidates
+
+def fetch_news_window(query, year, dry_run=False):
+    """
+    Google News archive searches for a keyword over a year (split while the feed is capped),
+    ingesting every item of each leaf window: only those below the cap are complete.
+    Returns ([(feed url, IngestTicket)] for the windows that had new content, [failed window errors]).
+    """
+    def request(window):
+        url = f"https://news.google.com/rss/search?q={query.replace(' ', '+')}+after:{window.start}+before:{window.end}&hl=en-IN&gl=IN&ceid=IN:en"
+        return url, http_get(url, timeout=10, cache_ttl=feed_ttl("google_news", year))
+
+    def ingest(resp, window):
+        return INGEST.submit(news_candidates(resp.content, window), dry_run=dry_run)
+
+    return mine_windows("google_news", query, year, request, ingest, dry_run=dry_run)
 
 def fetch_google_news(dry_run=False):
     display_source_header("Google News (2005-2025)")
@@ -298,57 +716,47 @@ def fetch_google_news(dry_run=False):
     else:
          keywords = SEARCH_KEYWORDS[:20]
 
-    news_items = []
     start_year = datetime.now().year
     end_year = 2005
     
-    total_fetched = 0
-    
-    for year in range(start_year, end_year - 1, -1):
-        year_items = []
-        after_d = f"{year}-01-01"
-        before_d = f"{year}-12-31"
-        
+    def fetch_year(year):
+        feeds = [] # (url, ticket)
         print(f"      🗞️  Fetcing News Archives: {year}...")
         
         for query in keywords:
             try:
-                url = f"https://news.google.com/rss/search?q={query.replace(' ', '+')}+after:{after_d}+before:{before_d}&hl=en-IN&gl=IN&ceid=IN:en"
-                resp = requests.get(url, timeout=10)
-                if resp.status_code == 200:
-                    root = ET.fromstring(resp.content)
-                    
-                    for item in root.findall('.//item')[:10]: 
-                        title = item.find('title').text
-                        link = item.find('link').text
-                        
-                        analysis = AI.analyze(title)
-                        if not analysis or not analysis['is_relevant']:
-                             continue
-
-                        news_id = hashlib.md5(link.encode()).hexdigest()
-                        year_items.append({
-                            "reddit_id": f"news_{news_id}", 
-                            "title": title,
-                            "content": title,
-                            "url": link,
-                            "timestamp": datetime(year, 1, 1), 
-                            "source": "news",
-                            "analysis": analysis,
-                            "author": "Google News Archive"
-                        })
-                time.sleep(0.5)
+                window_feeds, _ = fetch_news_window(query, year, dry_run=dry_run)
+                feeds.extend(window_feeds)
             except Exception: pass
 
-        if year_items:
-            ops = [UpdateOne({"url": item["url"]}, {"$set": item}, upsert=True) for item in year_items]
-            try:
-                db['posts'].bulk_write(ops)
-                total_fetched += len(ops)
-                print(f"          💾 Saved {len(ops)} news items ({year}).")
-            except: pass
-    
-    return total_fetched
+        year_items, saved, _ = collect(ticket for _, ticket in feeds)
+        if dry_run: return year_items
+        if saved:
+            print(f"          💾 Saved {saved} news items ({year}).")
+        get_http_client().confirm(url for url, ticket in feeds if ticket.ok)
+        return saved
+
+    results = run_concurrently(fetch_year, range(start_year, end_year - 1, -1))
+    if dry_run: return [doc for docs in results for doc in docs]
+    return sum(results)
+
+def youtube_candidates(page, q, fetched_at):
+    """ (text, doc) pairs for the videos on a YouTube search results page for `q`. """
+    video_ids = re.findall(r'"videoId":"([a-zA-Z0-9_-]{11})"', page)
+    unique_ids = list(set(video_ids))[:20] 
+    candidates = []
+    for vid in unique_ids:
+        full_title = f"YouTube Video {vid} about {q}"
+        candidates.append((full_title, {
+            "reddit_id": f"yt_{vid}", 
+            "title": f"YouTube Video: {vid}",
+            "content": f"Video discussion on {q}",
+            "url": f"https://youtu.be/{vid}",
+            "source": "youtube",
+            "timestamp": fetched_at,
+            "author": "YouTube"
+        }))
+    return candidates
 
 def fetch_youtube_videos(dry_run=False):
     """ Fetches YouTube videos (Restored) """
@@ -356,50 +764,44 @@ def fetch_youtube_videos(dry_run=False):
     # Use Centralized Keywords
     queries = SEARCH_KEYWORDS[:10] if SEARCH_KEYWORDS else ["farming"]
     
-    videos = []
     headers = {"User-Agent": "Mozilla/5.0"}
     
-    for q in queries:
+    def fetch_query(q):
         try:
             url = f"https://www.youtube.com/results?search_query={q.replace(' ', '+')}&sp=CAI%253D" 
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = http_get(url, headers=headers, timeout=10)
             if resp.status_code == 200:
-                video_ids = re.findall(r'"videoId":"([a-zA-Z0-9_-]{11})"', resp.text)
-                unique_ids = list(set(video_ids))[:20] 
-                for vid in unique_ids:
-                    # [AI ANALYSIS]
-                    full_title = f"YouTube Video {vid} about {q}"
-                    analysis = AI.analyze(full_title)
-
-                    if not analysis or not analysis['is_relevant']:
-                        continue
-                        
-                    videos.append({
-                        "reddit_id": f"yt_{vid}", 
-                        "title": f"YouTube Video: {vid}",
-                        "content": f"Video discussion on {q}",
-                        "url": f"https://youtu.be/{vid}",
-                        "source": "youtube",
-                        "timestamp": datetime.now(),
-                        "analysis": analysis,
-                        "author": "YouTube"
-                    })
+                # [AI ANALYSIS + UPSERT]
+                return INGEST.submit(youtube_candidates(resp.text, q, datetime.now()), dry_run=dry_run)
         except Exception:
             pass
+        return None
+
+    tickets = [t for t in run_concurrently(fetch_query, queries) if t is not None]
+    videos, saved, ok = collect(tickets)
+    if dry_run: return videos
+    if not ok: print(f"      ⚠️ YouTube Write Error (some videos were not saved).")
+    if saved: print(f"      ✅ Upserted {saved} YouTube videos.")
+    return saved
 
-    ops = []
-    for v in videos:
-        ops.append(UpdateOne({"url": v["url"]}, {"$set": v}, upsert=True))
+def mastodon_candidates(statuses, fetched_at):
+    """ (text, doc) pairs for a page of Mastodon tag-timeline statuses. """
+    candidates = []
+    for status in statuses:
+        content_clean = strip_html(status['content'])
+        if not content_clean: continue
         
-    if ops:
-        if dry_run: return [op._doc["$set"] for op in ops]
-        try:
-            db['posts'].bulk_write(ops)
-            print(f"      ✅ Upserted {len(ops)} YouTube videos.")
-        except Exception as e:
-            print(f"      ⚠️ YouTube Write Error: {e}")
-            return 0
-    return [] if dry_run else len(ops)
+        doc_id = str(status['id'])
+        candidates.append((content_clean, {
+            "reddit_id": f"mstdn_{doc_id}",
+            "title": content_clean[:80] + "...",
+            "content": content_clean,
+            "url": status['url'],
+            "source": "mastodon",
+            "timestamp": fetched_at,
+            "author": status['account']['display_name'] or status['account']['username']
+        }))
+    return candidates
 
 def fetch_mastodon(dry_run=False):
     """ Fetches posts from Mastodon (Fediverse) via public Tag Timeline API """
@@ -407,221 +809,478 @@ def fetch_mastodon(dry_run=False):
     
     # Use HASHTAGS from Centralized File
     tags = HASHTAGS[:10] if HASHTAGS else ["farming"]
-    posts = []
     
     # Instance URL (mastodon.social is the largest general instance)
     base_url = "https://mastodon.social/api/v1/timelines/tag"
     
-    for tag in tags:
+    MAX_PAGES = 5 # only followed when a cursor exists (first run reads the latest page, as before)
+
+    def fetch_tag(tag):
+        tag_name = tag.replace('#','')
+        # [INCREMENTAL] since_id: only statuses newer than the last run's newest
+        since_id = None if dry_run else CURSORS.get("mastodon", tag_name).get("since_id")
+        candidates = []
+        newest = None
+        max_id = None
+        # Without a cursor the latest page is all we want; with one, only a walk that got back to it is complete
+        complete = not since_id
         try:
-            url = f"{base_url}/{tag.replace('#','')}?limit=40"
-            resp = requests.get(url, timeout=10)
-            
-            if resp.status_code == 200:
+            for _ in range(MAX_PAGES if since_id else 1):
+                url = f"{base_url}/{tag_name}?limit=40"
+                if since_id: url += f"&since_id={since_id}"
+                if max_id: url += f"&max_id={max_id}"
+                resp = http_get(url, timeout=10)
+                if resp.status_code != 200:
+                    complete = False
+                    break
+
                 data = resp.json()
-                for status in data:
-                    content_clean = re.sub('<[^<]+?>', '', status['content']) 
-                    if not content_clean: continue
-                    
-                    # [AI ANALYSIS]
-                    analysis = AI.analyze(content_clean)
-                    if not analysis or not analysis['is_relevant']:
-                        continue
-                    
-                    doc_id = str(status['id'])
-                    posts.append({
-                        "reddit_id": f"mstdn_{doc_id}",
-                        "title": content_clean[:80] + "...",
-                        "content": content_clean,
-                        "url": status['url'],
-                        "source": "mastodon",
-                        "timestamp": datetime.now(),
-                        "analysis": analysis,
-                        "author": status['account']['display_name'] or status['account']['username']
-                    })
+                if not data:
+                    complete = True
+                    break
+                candidates.extend(mastodon_candidates(data, datetime.now()))
+
+                page_ids = [int(status['id']) for status in data]
+                newest = max([newest or 0] + page_ids)
+                if len(data) < 40:
+                    complete = True
+                    break
+                max_id = min(page_ids) # next (older) page, still bounded by since_id
+
+            # [AI ANALYSIS]
+            return INGEST.submit(candidates, dry_run=dry_run), (tag_name, newest, complete)
         except Exception:
-            continue
-            
-    ops = [UpdateOne({"reddit_id": p["reddit_id"]}, {"$set": p}, upsert=True) for p in posts]
-    if ops:
-        if dry_run: return [op._doc["$set"] for op in ops]
-        try:
-            db['posts'].bulk_write(ops)
-            print(f"      ✅ Upserted {len(ops)} Mastodon posts.")
-        except Exception: return 0
-    return [] if dry_run else len(ops)
+            pass
+        return None, (tag_name, None, False)
+
+    results = run_concurrently(fetch_tag, tags)
+    posts, saved, _ = collect(ticket for ticket, _ in results if ticket is not None)
+    if dry_run: return posts
+    if saved: print(f"      ✅ Upserted {saved} Mastodon posts.")
+    # Statuses past MAX_PAGES were not read yet: those tags keep their cursor and the next run walks the gap again
+    for ticket, (tag_name, newest, complete) in results:
+        if newest and complete and ticket.ok: CURSORS.advance("mastodon", tag_name, since_id=str(newest))
+    return saved
+
+def hn_candidates(hits, fetched_at):
+    """ (text, doc) pairs for a page of Algolia Hacker News story hits. """
+    candidates = []
+    for hit in hits:
+        doc_id = str(hit.get('objectID'))
+        title = hit.get('title', '')
+        
+        candidates.append((title, {
+            "reddit_id": f"hn_{doc_id}",
+            "title": title,
+            "content": hit.get('url', 'No Content'),
+            "url": f"https://news.ycombinator.com/item?id={doc_id}",
+            "source": "hackernews",
+            "timestamp": fetched_at,
+            "author": hit.get('author', 'HN')
+        }))
+    return candidates
 
 def fetch_hacker_news(dry_run=False):
     """ Fetches AgTech discussions from Hacker News via Algolia """
     display_source_header("Hacker News (AgTech)")
     # Construct OR Query
     query = " OR ".join(SEARCH_KEYWORDS[:5]) if SEARCH_KEYWORDS else "agriculture"
-    posts = []
+    tickets = []
     
-    url = f"http://hn.algolia.com/api/v1/search?query={query}&tags=story&hitsPerPage=50"
+    # [INCREMENTAL] Only stories created after the newest one from the last run, read newest-first
+    since = None if dry_run else CURSORS.get("hackernews", query).get("created_at_i")
+    newest = None
+    HITS_PER_PAGE = 50
+    MAX_PAGES = 10 # only followed when a cursor exists (first run reads the latest page)
+    # Without a cursor the latest page is all we want; with one, only reading every newer story is complete
+    complete = not since
+
+    url = f"http://hn.algolia.com/api/v1/search_by_date?query={query}&tags=story&hitsPerPage={HITS_PER_PAGE}"
+    if since: url += f"&numericFilters=created_at_i>{since}"
     try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            hits = resp.json().get('hits', [])
-            for hit in hits:
-                doc_id = str(hit.get('objectID'))
-                title = hit.get('title', '')
-                
-                # [AI ANALYSIS]
-                analysis = AI.analyze(title)
-                if not analysis or not analysis['is_relevant']:
-                    continue
-                    
-                posts.append({
-                    "reddit_id": f"hn_{doc_id}",
-                    "title": title,
-                    "content": hit.get('url', 'No Content'),
-                    "url": f"https://news.ycombinator.com/item?id={doc_id}",
-                    "source": "hackernews",
-                    "timestamp": datetime.now(),
-                    "analysis": analysis,
-                    "author": hit.get('author', 'HN')
-                })
-    except Exception: pass
+        for page in range(MAX_PAGES if since else 1):
+            resp = http_get(f"{url}&page={page}", timeout=10)
+            if resp.status_code != 200:
+                complete = False
+                break
+            data = resp.json()
+            hits = data.get('hits', [])
+            newest = max([newest or 0] + [hit.get('created_at_i') or 0 for hit in hits])
+            candidates = hn_candidates(hits, datetime.now())
+
+            # [AI ANALYSIS]
+            if candidates: tickets.append(INGEST.submit(candidates, dry_run=dry_run))
+            if len(hits) < HITS_PER_PAGE or page + 1 >= data.get('nbPages', 0):
+                complete = True
+                break
+    except Exception:
+        complete = False
         
-    ops = [UpdateOne({"reddit_id": p["reddit_id"]}, {"$set": p}, upsert=True) for p in posts]
-    if ops:
-        if dry_run: return [op._doc["$set"] for op in ops]
-        try:
-            db['posts'].bulk_write(ops)
-            print(f"      ✅ Upserted {len(ops)} HN posts.")
-        except Exception: return 0
-    return [] if dry_run else len(ops)
+    posts, saved, ok = collect(tickets)
+    if dry_run: return posts
+    if saved: print(f"      ✅ Upserted {saved} HN posts.")
+    if newest and complete and ok: CURSORS.advance("hackernews", query, created_at_i=newest)
+    return saved
+
+def medium_candidates(content, fetched_at, stop=None):
+    """ (text, doc) pairs for the first 20 items of a Medium tag feed (up to the first one stop(item) is true for). """
+    candidates = []
+    for item in iter_rss_items(content, limit=20, stop=stop):
+        link = item['link']
+        title = item['title']
+        author = item.get(DC_CREATOR, "Medium Writer")
+        
+        post_id = hashlib.md5(link.encode()).hexdigest()
+        doc = {
+            "reddit_id": f"med_{post_id}",
+            "title": title,
+            "content": f"Medium Article: {title}",
+            "url": link,
+            "source": "medium",
+            "timestamp": fetched_at,
+            "author": author
+        }
+        candidates.append((title, doc))
+    return candidates
 
 def fetch_medium(dry_run=False):
     display_source_header("Medium (Blogs)")
     # Loop first 5 keywords as tags
-    posts = []
     tags = SEARCH_KEYWORDS[:5] if SEARCH_KEYWORDS else ["agriculture"]
     
-    for tag in tags:
+    def fetch_tag(tag):
         url = f"https://medium.com/feed/tag/{tag.replace(' ','-')}"
         try:
-            resp = requests.get(url, timeout=10)
-            if resp.status_code != 200: continue
-            
-            root = ET.fromstring(resp.content)
-            items = root.findall('./channel/item')[:20]
+            resp = http_get(url, timeout=10, cache_ttl=feed_ttl("medium"))
+            if resp.status_code != 200: return None, None
+            # [CACHE] Same feed body as a run that already analyzed and saved it
+            if resp.not_modified and not dry_run: return None, None
             
-            for item in items:
-                link = item.find('link').text
-                title = item.find('title').text
-                
-                # [AI ANALYSIS]
-                analysis = AI.analyze(title)
-                if not analysis or not analysis['is_relevant']:
-                    continue
-                    
-                creator = item.find('{http://purl.org/dc/elements/1.1/}creator')
-                author = creator.text if creator is not None else "Medium Writer"
-                
-                post_id = hashlib.md5(link.encode()).hexdigest()
-                doc = {
-                    "reddit_id": f"med_{post_id}",
-                    "title": title,
-                    "content": f"Medium Article: {title}",
-                    "url": link,
-                    "source": "medium",
-                    "timestamp": datetime.now(),
-                    "analysis": analysis,
-                    "author": author
-                }
-                posts.append(doc)
-        except: continue
-            
-    ops = [UpdateOne({"reddit_id": p["reddit_id"]}, {"$set": p}, upsert=True) for p in posts]
-    if ops:
-        if dry_run: return [op._doc["$set"] for op in ops]
-        try:
-            db['posts'].bulk_write(ops)
-            print(f"      ✅ Upserted {len(ops)} Medium posts.")
-        except Exception: return 0
-    return [] if dry_run else 0
+            # Tag feeds are newest-first: everything after the first already-seen post was handled by an earlier run
+            stop = None
+            if SEEN is not None and not dry_run:
+                stop = lambda item: f"med_{hashlib.md5(item['link'].encode()).hexdigest()}" in SEEN
+
+            # [AI ANALYSIS]
+            return INGEST.submit(medium_candidates(resp.content, datetime.now(), stop=stop), dry_run=dry_run), url
+        except: pass
+        return None, None
+
+    feeds = [(ticket, url) for ticket, url in run_concurrently(fetch_tag, tags) if ticket is not None]
+    posts, saved, _ = collect(ticket for ticket, _ in feeds)
+    if dry_run: return posts
+    if saved: print(f"      ✅ Upserted {saved} Medium posts.")
+    get_http_client().confirm(url for ticket, url in feeds if ticket.ok)
+    return saved
+
+def lemmy_candidate(post, fetched_at):
+    """ (text, doc) for a Lemmy post. """
+    doc_id = str(post.get('id'))
+    title = post.get('name', '')
+    body = post.get('body', '')
+    return title + " " + body, {
+        "reddit_id": f"lemmy_{doc_id}",
+        "title": title,
+        "content": body or title,
+        "url": post.get('ap_id') or post.get('url'),
+        "source": "lemmy",
+        "timestamp": fetched_at,
+        "author": f"Lemmy_User_{post.get('creator_id')}"
+    }
 
 def fetch_lemmy(dry_run=False):
     display_source_header("Lemmy (Fediverse)")
     communities = ["farming", "agriculture", "gardening"]
-    posts = []
     
     base_url = "https://lemmy.world/api/v3/post/list"
     
-    for comm in communities:
+    MAX_PAGES = 5 # only followed when a cursor exists (first run reads the latest page, as before)
+
+    def fetch_community(comm):
+        # [INCREMENTAL] Posts come newest-first: stop at the newest post id of the last run
+        last_id = None if dry_run else CURSORS.get("lemmy", comm).get("post_id")
+        candidates = []
+        newest = None
+        # Without a cursor the latest page is all we want; with one, only a walk that got back to it is complete
+        complete = not last_id
         try:
-            url = f"{base_url}?community_name={comm}&sort=New&limit=40"
-            resp = requests.get(url, timeout=10)
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                for post_view in data.get('posts', []):
+            for page in range(1, (MAX_PAGES if last_id else 1) + 1):
+                url = f"{base_url}?community_name={comm}&sort=New&limit=40&page={page}"
+                resp = http_get(url, timeout=10)
+                if resp.status_code != 200:
+                    complete = False
+                    break
+
+                post_views = resp.json().get('posts', [])
+                caught_up = False
+                for post_view in post_views:
                     post = post_view.get('post', {})
                     if not post: continue
-                    
-                    doc_id = str(post.get('id'))
-                    title = post.get('name', '')
-                    body = post.get('body', '')
-                    
-                    # [AI ANALYSIS]
-                    analysis = AI.analyze(title + " " + body)
-                    if not analysis or not analysis['is_relevant']:
-                        continue
-                    
-                    posts.append({
-                        "reddit_id": f"lemmy_{doc_id}",
-                        "title": title,
-                        "content": body or title,
-                        "url": post.get('ap_id') or post.get('url'),
-                        "source": "lemmy",
-                        "timestamp": datetime.now(),
-                        "analysis": analysis,
-                        "author": f"Lemmy_User_{post.get('creator_id')}"
-                    })
+
+                    # Pinned posts sit on top of every listing whatever their age
+                    pinned = post.get('featured_community') or post.get('featured_local')
+                    if last_id and not pinned and post.get('id', 0) <= last_id:
+                        caught_up = True
+                        break
+                    newest = max(newest or 0, post.get('id', 0))
+                    candidates.append(lemmy_candidate(post, datetime.now()))
+                if caught_up or len(post_views) < 40:
+                    complete = True
+                    break
+
+            # [AI ANALYSIS]
+            return INGEST.submit(candidates, dry_run=dry_run), (comm, newest, complete)
         except Exception:
-            continue
-            
-    ops = [UpdateOne({"reddit_id": p["reddit_id"]}, {"$set": p}, upsert=True) for p in posts]
-    if ops:
-        if dry_run: return [op._doc["$set"] for op in ops]
+            pass
+        return None, (comm, None, False)
+
+    results = run_concurrently(fetch_community, communities)
+    posts, saved, _ = collect(ticket for ticket, _ in results if ticket is not None)
+    if dry_run: return posts
+    if saved: print(f"      ✅ Upserted {saved} Lemmy posts.")
+    # Posts past MAX_PAGES were not read yet: those communities keep their cursor
+    for ticket, (comm, newest, complete) in results:
+        if newest and complete and ticket.ok: CURSORS.advance("lemmy", comm, post_id=newest)
+    return saved
+
+ALL_SOURCES = [
+    fetch_reddit, fetch_google_news, fetch_youtube_videos, fetch_mastodon, fetch_hacker_news,
+    fetch_medium, fetch_lemmy, fetch_social_proxy, fetch_web_scrape,
+]
+
+def run_sources(fetchers, dry_run=False):
+    """
+    Runs the given fetchers concurrently, one thread per source.
+    Returns their results in order; a source that crashes contributes nothing.
+    """
+    def run(fetch):
         try:
-            db['posts'].bulk_write(ops)
-            print(f"      ✅ Upserted {len(ops)} Lemmy posts.")
-        except Exception: return 0
-    return [] if dry_run else 0
+            return fetch(dry_run=dry_run)
+        except Exception as e:
+            print(f"      ⚠️ {fetch.__name__} failed: {e}")
+            return [] if dry_run else 0
+
+    return run_concurrently(run, fetchers, max_workers=len(fetchers))
+
+# Year-window miners that can be backfilled: source -> fetch(keyword, year) -> ([(url, ticket)], [failed windows])
+BACKFILL_SOURCES = {
+    "google_news": fetch_news_window,
+    "facebook": lambda kw, year: fetch_proxy_window(PROXY_PLATFORMS[0], kw, year),
+    "instagram": lambda kw, year: fetch_proxy_window(PROXY_PLATFORMS[1], kw, year),
+}
+
+def run_backfill(sources=None, start_year=None, end_year=2005, keywords=None, workers=None, reset=False):
+    """
+    Resumable historical backfill of the year-window miners.
+    Enumerates the (source, keyword, year) grid up front, registers it in BACKFILL and runs
+    the windows that are not done yet on a worker pool (AGRI_BACKFILL_WORKERS); requests
+    per host stay bounded by the shared HTTP client. Re-running after a crash resumes.
+    By default covers every keyword and the closed years (last year back to 2005).
+    """
+    sources = list(sources or BACKFILL_SOURCES)
+    start_year = start_year or datetime.now().year - 1
+    keywords = keywords or sorted(SEARCH_KEYWORDS)
+    workers = workers or int(os.getenv("AGRI_BACKFILL_WORKERS", "16"))
+
+    print(f"\n⏳ Starting Historical Backfill: {', '.join(sources)} ({start_year}-{end_year})...")
+    if reset:
+        print(f"   ♻️ Cleared {BACKFILL.reset(sources)} backfill windows.")
+    tasks = [
+        (source, kw, year)
+        for year in range(start_year, end_year - 1, -1)
+        for source in sources
+        for kw in keywords
+    ]
+    new_tasks = BACKFILL.plan(tasks)
+    todo = BACKFILL.remaining(tasks)
+    print(f"   🗂️ {len(tasks)} windows ({new_tasks} new), {len(todo)} left to run with {workers} workers.")
+    if todo:
+        start_inference()
+
+    def run_task(task):
+        source, kw, year = task
+        BACKFILL.start(task)
+        try:
+            feeds, failed = BACKFILL_SOURCES[source](kw, year)
+        except Exception as e:
+            BACKFILL.finish(task, ok=False, error=str(e))
+            return 0
+        _, saved, ok = collect(ticket for _, ticket in feeds)
+        get_http_client().confirm(url for url, ticket in feeds if ticket.ok)
+        # Failed windows leave the task failed (re-run next time); the windows that made it stay confirmed
+        error = None if ok else "analysis or save failed"
+        if failed:
+            error = "; ".join(failed + ([error] if error else []))
+        BACKFILL.finish(task, saved=saved, ok=ok and not failed, error=error)
+        return saved
+
+    total = sum(run_concurrently(run_task, todo, max_workers=workers)) if todo else 0
+    INGEST.close()
+    if SEEN is not None:
+        SEEN.save()
+    print(f"   📋 Windows: {BACKFILL.summary(tasks)}")
+    if WINDOWS.enabled:
+        print(f"   🪟 Window Splits: {WINDOWS.stats()}")
+    print(f"🏁 Backfill Finished. Saved {total} items.\n")
+    return total
+
+def isolate_run_state():
+    """ Freezes cursors and window splits and bypasses the seen-set: the run neither depends on nor changes cross-run state. """
+    global SEEN
+    CURSORS.freeze()
+    WINDOWS.freeze()
+    SEEN = None
+
+# ==========================================
+# ARCHIVE REPLAY
+# ==========================================
+
+def _search_window(query):
+    """ The DateWindow of a "... after:YYYY-MM-DD before:YYYY-MM-DD" feed search. """
+    match = re.search(r"after:(\d{4}-\d{2}-\d{2}) before:(\d{4}-\d{2}-\d{2})", query)
+    if not match:
+        raise ValueError(f"no date window in {query!r}")
+    start, end = (datetime.strptime(day, "%Y-%m-%d").date() for day in match.groups())
+    return DateWindow.from_range(start, end)
+
+def _replay_google_news(url, body, fetched_at):
+    # Google News serves both the news archive searches and the platform "site:" searches
+    query = parse_qs(urlsplit(url).query).get("q", [""])[0]
+    window = _search_window(query)
+    site = re.match(r"site:(\S+)", query)
+    if site:
+        plat = next((plat for plat in PROXY_PLATFORMS if plat['domain'] == site.group(1)), None)
+        return proxy_candidates(body, plat, window) if plat else []
+    return news_candidates(body, window)
+
+def _replay_youtube(url, body, fetched_at):
+    q = parse_qs(urlsplit(url).query).get("search_query", [""])[0]
+    return youtube_candidates(body.decode("utf-8", "replace"), q, fetched_at)
+
+# Archived source (host) and parser(url, body, fetched_at) -> [(text, doc)] per fetcher
+ARCHIVE_PARSERS = {
+    "reddit": ("www.reddit.com", lambda url, body, fetched_at: [
+        reddit_candidate(child['data']) for child in json.loads(body).get('data', {}).get('children', [])
+    ]),
+    "google_news": ("news.google.com", _replay_google_news),
+    "youtube": ("www.youtube.com", _replay_youtube),
+    "mastodon": ("mastodon.social", lambda url, body, fetched_at: mastodon_candidates(json.loads(body), fetched_at)),
+    "hackernews": ("hn.algolia.com", lambda url, body, fetched_at: hn_candidates(json.loads(body).get('hits', []), fetched_at)),
+    "medium": ("medium.com", lambda url, body, fetched_at: medium_candidates(body, fetched_at)),
+    "lemmy": ("lemmy.world", lambda url, body, fetched_at: [
+        lemmy_candidate(post_view['post'], fetched_at) for post_view in json.loads(body).get('posts', []) if post_view.get('post')
+    ]),
+    "web_scrape": ("modernfarmer.com", web_scrape_candidates),
+}
+
+def replay_archive(sources=None, since=None, until=None, dry_run=False):
+    """
+    Re-analyzes the raw response archive offline: every archived response of each source
+    (fetched between since and until, unix times) goes through that source's parser and
+    the ingest pipeline again, at disk speed and without any request. Newest fetches come
+    first, so an item archived several times is analyzed once, from its latest copy.
+    Cursors and window splits are neither read nor moved; the seen-set is bypassed.
+    Returns the per-source results in order, like run_sources().
+    """
+    isolate_run_state()
+    archive = get_http_client().archive or ResponseArchive()
+
+    def replay_source(name):
+        host, parse = ARCHIVE_PARSERS[name]
+        tickets, item_ids, responses = [], set(), 0
+        docs, saved = [], 0
+        for archived in archive.iter_responses(host, since, until, newest_first=True):
+            if archived.status != 200: continue
+            responses += 1
+            try:
+                candidates = parse(archived.url, archived.body, datetime.fromtimestamp(archived.fetched_at))
+            except Exception as e:
+                print(f"      ⚠️ [Replay] Could not parse {archived.url}: {e}")
+                continue
+            candidates = [(text, doc) for text, doc in candidates if doc['reddit_id'] not in item_ids]
+            item_ids.update(doc['reddit_id'] for _, doc in candidates)
+            if candidates:
+                tickets.append(INGEST.submit(candidates, dry_run=dry_run))
+            if len(tickets) >= 100:
+                batch_docs, batch_saved, _ = collect(tickets)
+                docs.extend(batch_docs); saved += batch_saved; tickets = []
+        batch_docs, batch_saved, _ = collect(tickets)
+        docs.extend(batch_docs); saved += batch_saved
+        print(f"      📼 {name}: {responses} archived responses, {len(item_ids)} items ({saved} saved).")
+        return docs if dry_run else saved
+
+    return run_concurrently(replay_source, sources or list(ARCHIVE_PARSERS))
 
-def run_social_pipeline(dry_run=False):
+def run_social_pipeline(dry_run=False, replay=False, replay_sources=None, replay_since=None, replay_until=None):
     """ 
-    Runs all social media fetchers.
+    Runs all social media fetchers (concurrently).
+    replay=True (or AGRI_HTTP_REPLAY=1) instead reprocesses the response archive offline
+    (see replay_archive(); replay_since/replay_until are unix times).
     """
     print("\n🚀 Starting Social Media Pipeline...")
+    replay = replay or os.getenv("AGRI_HTTP_REPLAY", "0") != "0"
+    if replay:
+        print("   📼 Replaying archived responses (no network).")
+    elif fixture_mode():
+        # Recorded and replayed runs must request the same URLs
+        isolate_run_state()
+        print(f"   🎞️ HTTP fixtures: {fixture_mode()} (seed {run_seed()}).")
+    start_inference()
     
     if dry_run:
         all_docs = []
-        all_docs.extend(fetch_reddit(dry_run=True))
-        all_docs.extend(fetch_google_news(dry_run=True))
-        all_docs.extend(fetch_youtube_videos(dry_run=True))
-        all_docs.extend(fetch_mastodon(dry_run=True))
-        all_docs.extend(fetch_hacker_news(dry_run=True))
-        all_docs.extend(fetch_medium(dry_run=True))
-        all_docs.extend(fetch_lemmy(dry_run=True))
-        all_docs.extend(fetch_social_proxy(dry_run=True))
-        all_docs.extend(fetch_web_scrape(dry_run=True))
+        results = (replay_archive(replay_sources, replay_since, replay_until, dry_run=True) if replay
+                   else run_sources(ALL_SOURCES, dry_run=True))
+        for docs in results:
+            all_docs.extend(docs)
+        INGEST.close()
         print(f"      📦 Buffered {len(all_docs)} items for processing.")
         return all_docs
     else:
-        total_posts = 0
-        # total_posts += fetch_reddit(dry_run=False)
-        # total_posts += fetch_google_news(dry_run=False)
-        # total_posts += fetch_youtube_videos(dry_run=False)
-        # total_posts += fetch_mastodon(dry_run=False)
-        # total_posts += fetch_hacker_news(dry_run=False)
-        # total_posts += fetch_medium(dry_run=False)
-        # total_posts += fetch_lemmy(dry_run=False)
-        total_posts += fetch_social_proxy(dry_run=False)
-        # total_posts += fetch_web_scrape(dry_run=False)
+        fetchers = [
+            # fetch_reddit,
+            # fetch_google_news,
+            # fetch_youtube_videos,
+            # fetch_mastodon,
+            # fetch_hacker_news,
+            # fetch_medium,
+            # fetch_lemmy,
+            fetch_social_proxy,
+            # fetch_web_scrape,
+        ]
+        if replay:
+            total_posts = sum(replay_archive(replay_sources, replay_since, replay_until))
+        else:
+            total_posts = sum(run_sources(fetchers))
+        INGEST.close()
+        print(f"   🧵 Ingest: {INGEST.stats()}")
+        writes = POSTS.stats()
+        flush = writes["stages"].get("flush", {})
+        print(f"   💾 Writes: {writes['counters']} | flush p50 {flush.get('p50_ms', 0)}ms | p95 {flush.get('p95_ms', 0)}ms ({flush.get('count', 0)}x)")
+        if AI.cache is not None:
+            print(f"   🗃️ Analysis Cache: {AI.cache.stats()}")
+        if AI.metrics is not None:
+            for stage, timing in AI.stats()["stages"].items():
+                print(f"   ⏱️ {stage}: p50 {timing['p50_ms']}ms | p95 {timing['p95_ms']}ms | p99 {timing['p99_ms']}ms ({timing['count']}x)")
+        http_stats = get_http_client().stats()
+        for host, rate in http_stats["rates"].items():
+            waits = http_stats["stages"].get(f"rate_wait:{host}", {})
+            throttled = http_stats["counters"].get(f"throttled:{host}", 0)
+            print(f"   🚦 {host}: {rate} req/s | waited {waits.get('total_ms', 0)}ms over {waits.get('count', 0)} requests | throttled {throttled}x")
+        if NEAR_DUPS is not None:
+            print(f"   👯 Near-Duplicates: {NEAR_DUPS.stats()}")
+        if WINDOWS.enabled:
+            print(f"   🪟 Window Splits: {WINDOWS.stats()}")
+        if SEEN is not None:
+            SEEN.save()
+            print(f"   👀 Seen-Set: {SEEN.stats()}")
+        feed_cache = {k: v for k, v in http_stats["counters"].items() if k.startswith("cache_")}
+        if feed_cache:
+            print(f"   📼 Feed Cache: {feed_cache}")
+        if fixture_mode():
+            print(f"   🎞️ Fixtures: {get_fixture_transport().stats()}")
+        if get_http_client().archive is not None:
+            print(f"   🗄️ Response Archive: {get_http_client().archive.stats()}")
         print(f"🏁 Social Pipeline Finished. Total Items: {total_posts}\n")
         return total_posts
 
@@ -1,6 +1,10 @@
 
 import os
+import re
+import copy
 import time
+import hashlib
+import threading
 from dotenv import load_dotenv
 
 # Force usage of PyTorch and disable TF/Keras 3 conflicts
@@ -8,7 +12,25 @@ os.environ["USE_TORCH"] = "True"
 os.environ["TF_ENABLE_ONEDNN_OPTS"] = "0"
 os.environ["TRANSFORMERS_NO_ADVISORY_WARNINGS"] = "true"
 
-import requests
+try:
+    from utils.analysis_cache import AnalysisCache, DEFAULT_CACHE_PATH
+    from utils.sentiment_backends import BACKENDS, ONNX_MODEL_DIR, MAX_BATCH_TOKENS, BucketedSentimentRunner, onnx_unavailable_reason
+    from utils.hf_inference import HFInferenceClient
+    from utils.metrics import StageMetrics
+    from utils.runtime_profile import get_runtime_profile
+except ImportError:
+    try:
+        from .analysis_cache import AnalysisCache, DEFAULT_CACHE_PATH
+        from .sentiment_backends import BACKENDS, ONNX_MODEL_DIR, MAX_BATCH_TOKENS, BucketedSentimentRunner, onnx_unavailable_reason
+        from .hf_inference import HFInferenceClient
+        from .metrics import StageMetrics
+        from .runtime_profile import get_runtime_profile
+    except ImportError:
+        from analysis_cache import AnalysisCache, DEFAULT_CACHE_PATH
+        from sentiment_backends import BACKENDS, ONNX_MODEL_DIR, MAX_BATCH_TOKENS, BucketedSentimentRunner, onnx_unavailable_reason
+        from hf_inference import HFInferenceClient
+        from metrics import StageMetrics
+        from runtime_profile import get_runtime_profile
 
 # Load Environment Variables
 # Resolve path relative to THIS script file
@@ -17,20 +39,248 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ENV_PATH = os.path.join(BASE_DIR, '../../.env.local')
 load_dotenv(ENV_PATH)
 
-class AgriAIClient:
+# Bump whenever the rule *logic* in analyze() changes (term list edits are fingerprinted automatically)
+# 2: decisive rules run before the model; results carry decision_path
+# 3: rule-decided results report confidence None instead of 1.0
+RULES_VERSION = "3"
+# Bump whenever model input handling changes (2: token-level truncation instead of text[:512])
+INFERENCE_VERSION = "2"
+
+HUB_MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+LOCAL_MODEL_PATH = os.path.join(BASE_DIR, '../../models/sentiment-model')
+
+# ==========================================
+# RULE TABLES (Hybrid Booster / Topic Rules)
+# ==========================================
+# Every term below is matched as a substring of the lower-cased text, exactly like
+# the old `any(w in text_lower ...)` scans, but through one compiled matcher.
+
+# Topic categories, checked in priority order (first hit wins)
+CATEGORY_RULES = [
+    ("Market Prices", ["price", "market", "msp", "rupee", "dollar", "rate", "cost", "trade"]),
+    ("Weather", ["rain", "monsoon", "drought", "flood", "weather", "forecast", "temp", "humid"]),
+    ("Pest & Disease", ["pest", "locust", "disease", "attack", "infest", "worm", "fungus"]),
+    ("Government Policy", ["govt", "government", "policy", "subsidy", "bill", "loan", "export ban", "ministry"]),
+    ("Farming Technology", ["drone", "ai", "tech", "sensor", "robot", "app", "digital", "startup"]),
+    ("Crop Updates", ["harvest", "sowing", "yield", "planting", "crop", "seed"]),
+]
+
+BLACKLIST_TERMS = ["stock", "shares", "nasdaq", "sensex", "nifty", "crypto", "bitcoin", "tech", "software", "movie", "game"]
+
+FACT_EVENT_TERMS = ["staple food", "conference", "visit the state", "scientific name", "oryza sativa", "gdp", "committee"]
+
+POS_BOOSTERS = ["subsidy", "bonus", "hike", "approve", "release", "relief", "bumper", "record", "profit", "boost", "surge", "rise in yield", "jump", "compensate", "safe", "save", "strong", "recede", "good", "happy", "effective", "control", "traction", "normal", "cover", "disburse"]
+NEG_BOOSTERS = ["drought", "flood", "pest", "attack", "damage", "loss", "crash", "suicide", "protest", "crisis", "distress", "ruins", "dump produce", "rot", "shortage", "scarcity", "ban", "restrict", "labor intensive", "fear", "heatwave", "stress", "shrivel", "cut", "slash", "reduce", "delayed", "frost", "bollworm", "infest", "low", "migration", "migrat"]
+
+INPUT_COST_TERMS = ["fuel", "diesel", "petrol", "fertilizer", "urea", "pesticide", "cost", "labor", "wage"]
+INCREASE_TERMS = ["increase", "rise", "rising", "hike", "jump"]
+CUT_TERMS = ["slash", "cut", "reduce"]
+# " ban " is padded so it only matches the whole word (not "urban", "bank")
+TRADE_RESTRICTION_TERMS = [" ban ", "restrict", "duty-free import", "block"]
+TECH_LAUNCH_TERMS = ["startup", "launch", "drone", "satellite", "hydroponics"]
+RECOVERY_TERMS = ["compensate", "recover", "make up"]
+# Single terms used by compound rules ("new" + "tech", "manual" + "labor", "but"/"despite" conflicts)
+MISC_RULE_TERMS = ["subsidy", "new", "tech", "manual", "labor", "but", "despite"]
+
+# Rules whose label always wins over the model's, in priority order: (name, label, score).
+# analyze() checks them before inference and skips the model when one fires.
+DECISIVE_RULES = [
+    ("fact_event", "Neutral", 0.0),
+    ("subsidy_cut", "Negative", -0.8),
+    ("input_cost_increase", "Negative", -0.8),
+    ("trade_restriction", "Negative", -0.7),
+    ("manual_labor", "Negative", -0.6),
+    ("tech_innovation", "Positive", 0.8),
+]
+
+# "Agriculture", "Farming", "Farm", "Crop" are Weak (too generic, could be gaming)
+TRULY_GENERIC_WORDS = ["agriculture", "farming", "farmers", "farm", "crop", "rural"]
+
+
+def _load_keyword_lists():
+    """ Imports the agri keyword lists once (package, relative, direct, then hardcoded fallback). """
+    try:
+        # Attempt 1: Full Package Import (when running from root)
+        from utils import agri_keywords
+    except ImportError:
+        try:
+            # Attempt 2: Relative Import (when running as package)
+            from . import agri_keywords
+        except ImportError:
+            try:
+                # Attempt 3: Direct Import (when running from same dir)
+                import agri_keywords
+            except ImportError:
+                agri_keywords = None
+
+    if agri_keywords is not None:
+        return {
+            "AGRI_POS_WORDS": agri_keywords.AGRI_POS_WORDS,
+            "AGRI_NEG_WORDS": agri_keywords.AGRI_NEG_WORDS,
+            "GENERIC_AGRI_WORDS": agri_keywords.GENERIC_AGRI_WORDS,
+            "CROP_KEYWORDS": agri_keywords.CROP_KEYWORDS,
+            "PEST_DISEASE_KEYWORDS": agri_keywords.PEST_DISEASE_KEYWORDS,
+            "INPUT_KEYWORDS": agri_keywords.INPUT_KEYWORDS,
+            "POLICY_KEYWORDS": agri_keywords.POLICY_KEYWORDS,
+            "TECH_KEYWORDS": agri_keywords.TECH_KEYWORDS,
+            "OPERATION_KEYWORDS": agri_keywords.OPERATION_KEYWORDS,
+            "MARKET_TERMS": agri_keywords.MARKET_KEYWORDS,
+            "WEATHER_TERMS": agri_keywords.WEATHER_KEYWORDS,
+        }
+
+    # Attempt 4: Fallback Hardcoded (Emergency)
+    print("⚠️ [Relevance] Failed to import agri_keywords. Using minimal fallback.")
+    return {
+        "GENERIC_AGRI_WORDS": ["farming", "agriculture"],
+        "AGRI_POS_WORDS": ["good", "great", "excellent", "profit", "record", "bumper", "high", "boost", "happy", "opportunity", "good rain", "subsidy", "subsidies"],
+        "AGRI_NEG_WORDS": ["bad", "poor", "loss", "drought", "flood", "crash", "damage", "destroy", "shortage", "anxiety", "protest", "threat", "drop", "pest", "attack", "low"],
+        "CROP_KEYWORDS": ["rice", "wheat", "corn", "soybean", "soybeans", "cotton", "coffee", "sugarcane", "tomato", "onion", "potato", "paddy"],
+        "PEST_DISEASE_KEYWORDS": ["locust", "locusts", "pest", "pests", "attack", "attacks", "disease", "infestation"],
+        "INPUT_KEYWORDS": ["fertilizer", "fertilizers", "urea", "pesticide", "pesticides", "seed", "seeds"],
+        "POLICY_KEYWORDS": ["subsidy", "subsidies", "loan", "govt", "bill"],
+        "TECH_KEYWORDS": ["drone", "drones", "ai", "tech", "technology"],
+        "OPERATION_KEYWORDS": ["yield", "yields", "sowing", "harvest", "harvests", "irrigation"],
+        "MARKET_TERMS": ["price", "prices", "market", "markets"],
+        "WEATHER_TERMS": ["rain", "rains", "flood", "floods"],
+    }
+
+
+def _trie_pattern(terms):
+    """
+    Builds a regex alternation shaped like a trie (shared prefixes factored out),
+    so matching at each position walks the trie instead of trying every term.
+    Longer continuations are tried first, so the match is the longest term.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # Term ends here but may continue: greedy optional keeps the longest match
+            return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+        return body
+
+    return emit(trie)
+
+
+class AgriRuleIndex:
+    """
+    Keyword / rule index built once per client and frozen.
+    Holds the concept sets used by the relevance gate plus one compiled matcher over
+    every category, booster, blacklist and rule term, so each text is scanned in a
+    single pass that returns all hits together.
+    """
+
     def __init__(self):
+        kw = _load_keyword_lists()
+
+        # Compile all keywords for later use (keyword extraction)
+        self.all_keywords = frozenset(kw["AGRI_POS_WORDS"] + kw["AGRI_NEG_WORDS"] + kw["GENERIC_AGRI_WORDS"])
+
+        # Split Generic into Strong and Weak
+        # "Harvest", "Sowing", "Yield", "Mandi", "MSP" are Strong
+        specific_generic = [w for w in kw["GENERIC_AGRI_WORDS"] if w.lower() not in TRULY_GENERIC_WORDS]
+
+        # Flatten Concept Lists (taking care to split phrases like "fertilizer shortage" into "fertilizer", "shortage")
+        raw_concept_list = (
+            kw["CROP_KEYWORDS"] + kw["MARKET_TERMS"] + kw["WEATHER_TERMS"] + 
+            kw["PEST_DISEASE_KEYWORDS"] + kw["INPUT_KEYWORDS"] + kw["POLICY_KEYWORDS"] + 
+            kw["TECH_KEYWORDS"] + kw["OPERATION_KEYWORDS"] + specific_generic + ["labor", "wage", "weeding", "worker"]
+        )
+        self.strong_concepts = frozenset(
+            word for phrase in raw_concept_list for word in phrase.lower().split()
+            if len(word) > 2 # Avoid tiny words like "in", "of"
+        )
+        self.weak_concepts = frozenset(w.lower() for w in TRULY_GENERIC_WORDS)
+        # Strickland Rule: generic market/price/tech terms don't count as agri-specific
+        self.truly_agri_strong = self.strong_concepts - {"price", "prices", "market", "markets", "tech", "technology"}
+
+        self.category_rules = tuple((label, frozenset(terms)) for label, terms in CATEGORY_RULES)
+        self.blacklist_terms = frozenset(BLACKLIST_TERMS)
+        self.fact_event_terms = frozenset(FACT_EVENT_TERMS)
+        self.pos_boosters = frozenset(POS_BOOSTERS)
+        self.neg_boosters = frozenset(NEG_BOOSTERS)
+        self.input_cost_terms = frozenset(INPUT_COST_TERMS)
+        self.increase_terms = frozenset(INCREASE_TERMS)
+        self.cut_terms = frozenset(CUT_TERMS)
+        self.trade_restriction_terms = frozenset(TRADE_RESTRICTION_TERMS)
+        self.tech_launch_terms = frozenset(TECH_LAUNCH_TERMS)
+        self.recovery_terms = frozenset(RECOVERY_TERMS)
+
+        terms = set(MISC_RULE_TERMS)
+        for _, group in self.category_rules:
+            terms |= group
+        for group in (self.blacklist_terms, self.fact_event_terms, self.pos_boosters, self.neg_boosters,
+                      self.input_cost_terms, self.increase_terms, self.cut_terms,
+                      self.trade_restriction_terms, self.tech_launch_terms, self.recovery_terms):
+            terms |= group
+        self.terms = frozenset(terms)
+
+        # Content fingerprint of every term/concept set (used in the analysis cache version)
+        digest = hashlib.sha1()
+        for group in (self.terms, self.all_keywords, self.strong_concepts, self.weak_concepts):
+            digest.update("\n".join(sorted(group)).encode("utf-8"))
+        digest.update(repr([(label, sorted(group)) for label, group in self.category_rules]).encode("utf-8"))
+        self.fingerprint = digest.hexdigest()[:12]
+
+        # Lookahead capture reports overlapping matches: the longest term at each position.
+        # Any shorter term starting at the same position is a prefix of it.
+        self._matcher = re.compile("(?=(" + _trie_pattern(self.terms) + "))")
+        self._prefix_hits = {
+            term: frozenset(t for t in self.terms if term.startswith(t)) for term in self.terms
+        }
+
+    def scan(self, text_lower):
+        """ Returns the frozenset of every rule term occurring in text_lower. """
+        hits = set()
+        for m in self._matcher.finditer(f" {text_lower} "):
+            hits |= self._prefix_hits[m.group(1)]
+        return frozenset(hits)
+
+
+class AgriAIClient:
+    def __init__(self, use_cache=True, backend=None, metrics=None):
         print("🤖 Initializing AI (Hybrid Implementation)...")
         
         self.api_token = os.getenv("HF_TOKEN")
         self.headers = {"Authorization": f"Bearer {self.api_token}"}
         
-        # Default Attributes
-        self.sentiment_pipe = None
-        self.feature_extractor = None
-        self.agri_anchor = None
+        # Models are loaded lazily on first use (see sentiment_pipe / feature_extractor)
+        self._sentiment_pipe = None
+        self._sentiment_runner = None
+        self._feature_extractor = None
+        self._agri_anchor = None
+        self._model = None
+        self._tokenizer = None
+        self._sentiment_load_attempted = False
+        self._feature_load_attempted = False
+        self._load_lock = threading.RLock()
+        # Fast tokenizers are not re-entrant: concurrent fetch threads take turns on the model
+        self._model_lock = threading.Lock()
+
+        # Device / threads / precision / warmup (AGRI_DEVICE, AGRI_TORCH_THREADS, AGRI_BF16, ...)
+        self.profile = get_runtime_profile()
+        # AgriInferencePool turns this off and warms up each worker instead
+        self.warmup_on_load = True
+
+        # Keyword / rule index (built once, shared by every analyze() call)
+        self.rules = AgriRuleIndex()
         
-        # Endpoints
-        self.classifier_url = "https://router.huggingface.co/hf-inference/models/facebook/bart-large-mnli"
+        # Endpoints (pooled keep-alive session; HF_INFERENCE_URL points it at another server)
+        self.hf = HFInferenceClient(
+            self.api_token,
+            max_concurrency=int(os.getenv("HF_INFERENCE_CONCURRENCY", "8"))
+        )
+        self.classifier_model = "facebook/bart-large-mnli"
+        self.classifier_url = self.hf.model_url(self.classifier_model)
 
         # Categories for Zero-Shot
         self.agri_labels = ["agriculture", "not_agriculture"]
@@ -38,242 +288,506 @@ class AgriAIClient:
             "Market Prices", "Weather", "Pests & Disease", "Farming Technology", "Government Policy"
         ]
 
-        # Initialize Local Sentiment Pipeline
-        try:
-            from transformers import pipeline
-            
-            # Local model path
-            local_model_path = os.path.join(BASE_DIR, '../../models/sentiment-model')
-            
-            if os.path.exists(local_model_path):
-                print(f"   📂 Loading local model from {local_model_path}...")
-                self.sentiment_pipe = pipeline("sentiment-analysis", model=local_model_path, device=0)
-                print("   ✅ Local model loaded successfully.")
+        # Local model path (falls back to the Hub checkpoint)
+        self.model_name_or_path = LOCAL_MODEL_PATH if os.path.exists(LOCAL_MODEL_PATH) else HUB_MODEL_NAME
+
+        # Sentiment inference backend: "torch" (default), "onnx" or "onnx-int8" (ONNX Runtime, CPU)
+        self.backend = (backend or os.getenv("AGRI_SENTIMENT_BACKEND", "torch")).lower()
+        if self.backend not in BACKENDS:
+            print(f"   ⚠️ Unknown sentiment backend '{self.backend}'. Using torch.")
+            self.backend = "torch"
+        if self.backend != "torch":
+            # Settle the torch fallback now: the backend is part of the analysis version (cache keys)
+            reason = onnx_unavailable_reason(os.getenv("AGRI_ONNX_MODEL_DIR", ONNX_MODEL_DIR), quantized=(self.backend == "onnx-int8"))
+            if reason:
+                print(f"   ⚠️ ONNX backend unavailable ({reason}). Falling back to torch.")
+                self.backend = "torch"
+
+        # Padded-token budget per forward pass for length-bucketed batching
+        self.max_batch_tokens = int(os.getenv("AGRI_MAX_BATCH_TOKENS", MAX_BATCH_TOKENS))
+
+        # Per-stage timers/counters (off unless metrics=True or AGRI_AI_METRICS=1; see stats())
+        if metrics is None:
+            metrics = os.getenv("AGRI_AI_METRICS", "0") == "1"
+        self.metrics = StageMetrics() if metrics else None
+
+        # Analysis Cache (content hash -> result): memory LRU + SQLite store shared across runs
+        # Disable with AGRI_ANALYSIS_CACHE=0, relocate with AGRI_ANALYSIS_CACHE_PATH.
+        # Rows of other versions expire after AGRI_ANALYSIS_CACHE_MAX_AGE_DAYS (0 keeps them).
+        self.cache = None
+        if use_cache and os.getenv("AGRI_ANALYSIS_CACHE", "1") != "0":
+            self.cache = AnalysisCache(
+                version=self.analysis_version(),
+                path=os.getenv("AGRI_ANALYSIS_CACHE_PATH", DEFAULT_CACHE_PATH),
+                max_age_days=float(os.getenv("AGRI_ANALYSIS_CACHE_MAX_AGE_DAYS", "30"))
+            )
+
+    # ==========================================
+    # LAZY MODEL LOADING
+    # ==========================================
+
+    def _load_weights(self):
+        """ Loads tokenizer + classifier weights once; both heads share them. """
+        if self._model is None:
+            from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+            if self.model_name_or_path == LOCAL_MODEL_PATH:
+                print(f"   📂 Loading local model from {LOCAL_MODEL_PATH}...")
             else:
                 print("   ⚠️ Local model not found. Attempting to load from Hugging Face Hub (slower)...")
-                self.sentiment_pipe = pipeline("sentiment-analysis", model="cardiffnlp/twitter-roberta-base-sentiment-latest", device=0)
-                print("   ✅ Model loaded from Hub.")
-                
-        except Exception as e:
-            print(f"   ⚠️ Could not load local model: {e}")
-            self.sentiment_pipe = None
-
-        # Initialize Feature Extraction for Content Understanding (Relevance)
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name_or_path)
+            self._model = self.profile.prepare_model(
+                AutoModelForSequenceClassification.from_pretrained(self.model_name_or_path)
+            )
+        return self._model, self._tokenizer
+
+    @property
+    def sentiment_pipe(self):
+        """ Sentiment pipeline, built on first access (None if the model can't be loaded). """
+        if self._sentiment_pipe is None and not self._sentiment_load_attempted:
+            with self._load_lock:
+                if not self._sentiment_load_attempted:
+                    if self.backend != "torch":
+                        self._sentiment_pipe = self._load_onnx_pipe()
+                        if self._sentiment_pipe is not None:
+                            self._sentiment_runner = self._sentiment_pipe.runner
+                    if self._sentiment_pipe is None:
+                        try:
+                            from transformers import pipeline
+                            model, tokenizer = self._load_weights()
+                            self._sentiment_pipe = pipeline(
+                                "sentiment-analysis", model=model, tokenizer=tokenizer, device=self.profile.pipeline_device
+                            )
+                            # Batched inference bypasses the pipeline (see _predict_sentiment)
+                            self._sentiment_runner = BucketedSentimentRunner.for_torch(
+                                self._sentiment_pipe.model, tokenizer, self.profile.inference_context
+                            )
+                            print(f"   ✅ Sentiment model loaded successfully ({self.profile.device_name}, {self.profile.precision}).")
+                        except Exception as e:
+                            print(f"   ⚠️ Could not load local model: {e}")
+                            self._sentiment_pipe = None
+                    self._sentiment_load_attempted = True
+                    if self._sentiment_pipe is not None and self.warmup_on_load:
+                        self.warmup()
+        return self._sentiment_pipe
+
+    def warmup(self):
+        """ Runs the profile's warmup batches through the sentiment model (no-op if it isn't loaded). """
+        if self._sentiment_runner is not None:
+            self.profile.warmup(self._sentiment_runner, "sentiment model")
+        elif self._sentiment_pipe is not None:
+            self.profile.warmup(lambda texts: self._sentiment_pipe(texts, truncation=True, top_k=1), "sentiment model")
+
+    def _load_onnx_pipe(self):
+        """ ONNX Runtime pipeline for the onnx / onnx-int8 backends. Falls back to torch if the export is missing. """
         try:
-            import torch
-            import torch.nn.functional as F
-            self.torch = torch
-            self.F = F
-            
-            print("   🧠 Loading Feature Extractor for Content Relevance...")
-            # Re-define path in this scope
-            local_model_path = os.path.join(BASE_DIR, '../../models/sentiment-model')
-            model_name_or_path = local_model_path if os.path.exists(local_model_path) else "cardiffnlp/twitter-roberta-base-sentiment-latest"
-            
-            self.feature_extractor = pipeline("feature-extraction", model=model_name_or_path, device=0)
-            
-            # Compute Anchor Vector for "Agriculture"
-            # This represents the "Concept" of Agriculture in the model's latent space
-            anchor_text = "agriculture farming crops harvest wheat rice market prices farmers soil weather monsoon fertilizer pesticide government policy rural"
-            anchor_feats = self.feature_extractor(anchor_text, return_tensors="pt")[0]
-            self.agri_anchor = torch.mean(anchor_feats, dim=0) # Mean pooling
-            
-            print("   ✅ Relevance Engine Initialized (Embedding-based).")
+            try:
+                from utils.sentiment_backends import OnnxSentimentPipeline
+            except ImportError:
+                try:
+                    from .sentiment_backends import OnnxSentimentPipeline
+                except ImportError:
+                    from sentiment_backends import OnnxSentimentPipeline
+
+            pipe = OnnxSentimentPipeline(
+                os.getenv("AGRI_ONNX_MODEL_DIR", ONNX_MODEL_DIR),
+                quantized=(self.backend == "onnx-int8"),
+                intra_op_threads=os.getenv("AGRI_ORT_THREADS") or self.profile.intra_op_threads
+            )
+            print(f"   ✅ Sentiment model loaded on ONNX Runtime ({os.path.basename(pipe.model_file)}).")
+            return pipe
         except Exception as e:
-            print(f"   ⚠️ Feature Extractor Error: {e}")
-            self.feature_extractor = None
+            print(f"   ⚠️ ONNX backend unavailable ({e}). Falling back to torch.")
+            self.backend = "torch"
+            if self.cache is not None:
+                # Keys in use were derived for ONNX results: store nothing for the rest of the run
+                print("   ⚠️ Analysis cache writes disabled (results no longer match its version).")
+                self.cache = None
+            return None
 
+    @sentiment_pipe.setter
+    def sentiment_pipe(self, pipe):
+        self._sentiment_pipe = pipe
+        self._sentiment_runner = getattr(pipe, "runner", None)
+        self._sentiment_load_attempted = True
+
+    @property
+    def feature_extractor(self):
+        """
+        Feature-extraction pipeline for embedding-based features, built on first access.
+        Runs on the classifier's encoder (model.base_model), so no second copy of the weights is loaded.
+        """
+        if self._feature_extractor is None and not self._feature_load_attempted:
+            with self._load_lock:
+                if not self._feature_load_attempted:
+                    try:
+                        from transformers import pipeline
+                        print("   🧠 Loading Feature Extractor for Content Relevance...")
+                        model, tokenizer = self._load_weights()
+                        self._feature_extractor = pipeline(
+                            "feature-extraction", model=model.base_model, tokenizer=tokenizer, device=self.profile.pipeline_device
+                        )
+                        print("   ✅ Relevance Engine Initialized (Embedding-based).")
+                    except Exception as e:
+                        print(f"   ⚠️ Feature Extractor Error: {e}")
+                        self._feature_extractor = None
+                    self._feature_load_attempted = True
+        return self._feature_extractor
+
+    def embed(self, texts):
+        """ Mean-pooled sentence embeddings (torch tensors), or None if the extractor is unavailable. """
+        if not self.feature_extractor:
+            return None
+        import torch
+        embeddings = []
+        for feats in self.feature_extractor([t[:512] for t in texts], truncation=True, return_tensors="pt"):
+            embeddings.append(torch.mean(feats[0], dim=0)) # Mean pooling
+        return embeddings
+
+    @property
+    def agri_anchor(self):
+        """ Anchor vector for the "Concept" of Agriculture in the model's latent space (computed on demand). """
+        if self._agri_anchor is None:
+            anchor_text = "agriculture farming crops harvest wheat rice market prices farmers soil weather monsoon fertilizer pesticide government policy rural"
+            embeddings = self.embed([anchor_text])
+            self._agri_anchor = embeddings[0] if embeddings else None
+        return self._agri_anchor
+
+    def analysis_version(self):
+        """ Identifies the rules + model combination that produced a result (cache key namespace). """
+        model_tag = self.model_name_or_path
+        if os.path.isdir(model_tag):
+            # Local weights: re-key the cache whenever the files are replaced
+            mtimes = [os.path.getmtime(os.path.join(model_tag, f)) for f in os.listdir(model_tag)]
+            model_tag = f"{os.path.basename(os.path.normpath(model_tag))}@{int(max(mtimes, default=0))}"
+        return (
+            f"rules-{RULES_VERSION}-{self.rules.fingerprint}|model-{model_tag}"
+            f"|backend-{self.backend}{'-bf16' if self.profile.bf16 else ''}|inference-{INFERENCE_VERSION}"
+        )
 
     def _query(self, url, payload, retries=3):
-        for i in range(retries):
-            try:
-                response = requests.post(url, headers=self.headers, json=payload, timeout=20)
-                if response.status_code == 503:
-                    time.sleep(5)
-                    continue 
-                if response.status_code != 200:
-                    return None
-                return response.json()
-            except Exception:
-                time.sleep(1)
-        return None
+        return self.hf.post(url, payload, retries=retries)
+
+    def zero_shot_batch(self, texts, labels=None, batch_size=8):
+        """ Remote zero-shot classification (bart-large-mnli) for many texts; labels default to topic_labels. """
+        return self.hf.zero_shot(self.classifier_model, list(texts), labels or self.topic_labels, batch_size=batch_size)
 
     def analyze(self, text):
         # print(f"DEBUG: Analyzing '{text[:20]}...'")
-        if not text or len(text) < 5: return None
-
-        try:
-            # 1. Relevance Check (Concept Matching Strategy)
-            # Replaces Embedding check (bias issue) and Simple Keyword check (too broad).
-            # Rule: Text must contain specific Agricultural Concepts (Crops, Markets) 
-            # OR multiple Generic Contexts to be considered relevant.
-            
-            # Import Lists
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts, batch_size=32):
+        """
+        Batched variant of analyze().
+        Runs the keyword relevance stage over the whole list first, then sends only
+        the relevant texts through the sentiment model in padded batches.
+        Returns one result per input, in input order (None for unusable texts).
+        """
+        return self.run_cached(texts, lambda misses: self._analyze_uncached(misses, batch_size))
+
+    def run_cached(self, texts, compute):
+        """
+        Cache wrapper around a compute step.
+        compute(list of texts) -> list of (result, cacheable) for texts not found in the cache;
+        AgriInferencePool passes a compute step that fans out to worker processes.
+        """
+        m = self.metrics
+        if m is not None:
+            t0 = time.perf_counter()
+
+        results = [None] * len(texts)
+        keys = {} # index -> cache key of texts that must be computed
+        duplicates = [] # (index, first index) for repeats inside this batch
+
+        # Stage 0: Cache lookup (repeated texts skip the rules and the model entirely)
+        first_seen = {}
+        for idx, text in enumerate(texts):
+            if not text or len(text) < 5: continue
+            if self.cache is None:
+                keys[idx] = None
+                continue
+
+            key = self.cache.key(text)
+            if key in first_seen:
+                duplicates.append((idx, first_seen[key]))
+                continue
+            first_seen[key] = idx
+
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[idx] = cached
+            else:
+                keys[idx] = key
+
+        if m is not None:
+            m.observe("cache_lookup", time.perf_counter() - t0)
+            m.count("calls")
+            m.count("texts", len(texts))
+            m.count("cache_hits", sum(1 for r in results if r is not None))
+            m.count("batch_duplicates", len(duplicates))
+
+        computed = compute([texts[idx] for idx in keys]) if keys else []
+
+        to_store = []
+        for (idx, key), (result, cacheable) in zip(keys.items(), computed):
+            results[idx] = result
+            if cacheable and key is not None:
+                to_store.append((key, result))
+        if self.cache is not None and to_store:
+            self.cache.put_many(to_store)
+
+        for idx, first in duplicates:
+            if results[first] is not None:
+                results[idx] = copy.deepcopy(results[first])
+
+        return results
+
+    def _analyze_uncached(self, texts, batch_size=32):
+        """ Stages 1-3 for texts that missed the cache. Returns (result, cacheable) per text. """
+        m = self.metrics
+        results = [None] * len(texts)
+        pending = [] # (index, relevance context) of relevant texts that need the model
+        decided = [] # (index, relevance context) of relevant texts settled by a decisive rule
+
+        # Stage 1: Relevance (rules only, no model)
+        for idx, text in enumerate(texts):
+            if m is not None:
+                t0 = time.perf_counter()
             try:
-                # Attempt 1: Full Package Import (when running from root)
-                from utils.agri_keywords import (
-                    AGRI_POS_WORDS, AGRI_NEG_WORDS, GENERIC_AGRI_WORDS,
-                    CROP_KEYWORDS, PEST_DISEASE_KEYWORDS, INPUT_KEYWORDS,
-                    POLICY_KEYWORDS, TECH_KEYWORDS, OPERATION_KEYWORDS,
-                    MARKET_KEYWORDS, WEATHER_KEYWORDS
-                )
-                MARKET_TERMS = MARKET_KEYWORDS
-                WEATHER_TERMS = WEATHER_KEYWORDS
-            except ImportError:
-                try:
-                    # Attempt 2: Relative Import (when running as package)
-                    from .agri_keywords import (
-                        AGRI_POS_WORDS, AGRI_NEG_WORDS, GENERIC_AGRI_WORDS,
-                        CROP_KEYWORDS, PEST_DISEASE_KEYWORDS, INPUT_KEYWORDS,
-                        POLICY_KEYWORDS, TECH_KEYWORDS, OPERATION_KEYWORDS,
-                        MARKET_KEYWORDS, WEATHER_KEYWORDS
-                    )
-                    MARKET_TERMS = MARKET_KEYWORDS
-                    WEATHER_TERMS = WEATHER_KEYWORDS
-                except ImportError:
-                    try:
-                        # Attempt 3: Direct Import (when running from same dir)
-                        import agri_keywords
-                        AGRI_POS_WORDS = agri_keywords.AGRI_POS_WORDS
-                        AGRI_NEG_WORDS = agri_keywords.AGRI_NEG_WORDS
-                        GENERIC_AGRI_WORDS = agri_keywords.GENERIC_AGRI_WORDS
-                        CROP_KEYWORDS = agri_keywords.CROP_KEYWORDS
-                        PEST_DISEASE_KEYWORDS = agri_keywords.PEST_DISEASE_KEYWORDS
-                        INPUT_KEYWORDS = agri_keywords.INPUT_KEYWORDS
-                        POLICY_KEYWORDS = agri_keywords.POLICY_KEYWORDS
-                        TECH_KEYWORDS = agri_keywords.TECH_KEYWORDS
-                        OPERATION_KEYWORDS = agri_keywords.OPERATION_KEYWORDS
-                        MARKET_TERMS = agri_keywords.MARKET_KEYWORDS
-                        WEATHER_TERMS = agri_keywords.WEATHER_KEYWORDS
-                    except ImportError:
-                        # Attempt 4: Fallback Hardcoded (Emergency)
-                        print("⚠️ [Relevance] Failed to import agri_keywords. Using minimal fallback.")
-                        GENERIC_AGRI_WORDS = ["farming", "agriculture"]
-                        AGRI_POS_WORDS = ["good", "great", "excellent", "profit", "record", "bumper", "high", "boost", "happy", "opportunity", "good rain", "subsidy", "subsidies"]
-                        AGRI_NEG_WORDS = ["bad", "poor", "loss", "drought", "flood", "crash", "damage", "destroy", "shortage", "anxiety", "protest", "threat", "drop", "pest", "attack", "low"]
-                        CROP_KEYWORDS = ["rice", "wheat", "corn", "soybean", "soybeans", "cotton", "coffee", "sugarcane", "tomato", "onion", "potato", "paddy"]
-                        PEST_DISEASE_KEYWORDS = ["locust", "locusts", "pest", "pests", "attack", "attacks", "disease", "infestation"]
-                        INPUT_KEYWORDS = ["fertilizer", "fertilizers", "urea", "pesticide", "pesticides", "seed", "seeds"]
-                        POLICY_KEYWORDS = ["subsidy", "subsidies", "loan", "govt", "bill"]
-                        TECH_KEYWORDS = ["drone", "drones", "ai", "tech", "technology"]
-                        OPERATION_KEYWORDS = ["yield", "yields", "sowing", "harvest", "harvests", "irrigation"]
-                        MARKET_TERMS = ["price", "prices", "market", "markets"]
-                        WEATHER_TERMS = ["rain", "rains", "flood", "floods"]
-
-            # Compile all keywords for later use
-            all_keywords = AGRI_POS_WORDS + AGRI_NEG_WORDS + GENERIC_AGRI_WORDS
-
-            # Split Generic into Strong and Weak
-            # "Agriculture", "Farming", "Farm", "Crop" are Weak (too generic, could be gaming)
-            # "Harvest", "Sowing", "Yield", "Mandi", "MSP" are Strong
-            truly_generic = ["agriculture", "farming", "farmers", "farm", "crop", "rural"]
-            specific_generic = [w for w in GENERIC_AGRI_WORDS if w.lower() not in truly_generic]
-
-            # Flatten Concept Lists (taking care to split phrases like "fertilizer shortage" into "fertilizer", "shortage")
-            raw_concept_list = (
-                CROP_KEYWORDS + MARKET_TERMS + WEATHER_TERMS + 
-                PEST_DISEASE_KEYWORDS + INPUT_KEYWORDS + POLICY_KEYWORDS + 
-                TECH_KEYWORDS + OPERATION_KEYWORDS + specific_generic + ["labor", "wage", "weeding", "worker"]
-            )
-            
-            strong_concepts = set()
-            # Add explicit strong words that might be in phrases (e.g. "drought" from "drought conditions")
-            # We iterate properly:
-            for phrase in raw_concept_list:
-                for word in phrase.lower().split():
-                    if len(word) > 2: # Avoid tiny words like "in", "of"
-                        strong_concepts.add(word)
-
-            weak_concepts = set([w.lower() for w in truly_generic])
-            
-            text_lower = text.lower()
-            tokens = text_lower.replace('.', ' ').replace(',', ' ').split()
-            
-            strong_count = sum(1 for t in tokens if t in strong_concepts)
-            weak_count = sum(1 for t in tokens if t in weak_concepts)
-            
-            # --- IMPROVEMENT: Financial / Irrelevant Blacklist ---
-            # If these terms exist, we require at least one STRONG agri-specific term (e.g. "wheat", "rice", "fertilizer")
-            # to avoid false positives like "stock market", "tech sector".
-            blacklist_terms = ["stock", "shares", "nasdaq", "sensex", "nifty", "crypto", "bitcoin", "tech", "software", "movie", "game"]
-            has_blacklist_term = any(b in text_lower for b in blacklist_terms)
+                context = self._relevance_stage(text)
+            except Exception as e:
+                self._log_parse_error(e)
+                continue
+            if m is not None:
+                m.observe("relevance", time.perf_counter() - t0)
+
+            if not context["is_relevant"]:
+                results[idx] = {
+                    "is_relevant": False,
+                    "reason": context["reason"]
+                }
+                continue
+
+            # Deterministic override? Then the model's answer would be discarded: don't ask for it
+            context["rule"] = self._decisive_rule(context["hits"])
+            if context["rule"] is not None:
+                decided.append((idx, context))
+            else:
+                pending.append((idx, context))
+
+        if m is not None:
+            m.count("relevant", len(pending) + len(decided))
+            m.count("rejected", len(texts) - len(pending) - len(decided))
+            m.count("rule_short_circuits", len(decided))
+
+        # Stage 2: Sentiment Model (relevant texts only, batched)
+        if m is not None and pending:
+            t0 = time.perf_counter()
+        predictions = self._predict_sentiment([texts[idx] for idx, _ in pending], batch_size)
+        if m is not None and pending:
+            m.observe("model_batch", time.perf_counter() - t0)
+
+        # Stage 3: Topic, Hybrid Rules & Keywords
+        failed_inference = set()
+        for idx, context in decided:
+            try:
+                results[idx] = self._finalize(texts[idx], context, None, None)
+            except Exception as e:
+                self._log_parse_error(e)
+
+        for (idx, context), prediction in zip(pending, predictions):
+            if prediction is None:
+                failed_inference.add(idx)
+                prediction = ("Neutral", 0.0)
+            try:
+                results[idx] = self._finalize(texts[idx], context, *prediction)
+            except Exception as e:
+                self._log_parse_error(e)
+
+        # Rejections never touch the model; relevant results are only cached if the model actually ran
+        model_ok = not pending or self._sentiment_pipe is not None
+        return [
+            (result, result is not None and idx not in failed_inference and (model_ok or not result["is_relevant"]))
+            for idx, result in enumerate(results)
+        ]
 
-            is_relevant = False
-            
-            if has_blacklist_term:
-                # Strickland Rule: Must have STRONG agri concept (Crop, Pest, Input) excluding generic 'market'/'price'
-                # Filter strong_concepts to remove generic market terms for this check
-                truly_agri_strong = strong_concepts - set(["price", "prices", "market", "markets", "tech", "technology"])
-                agri_strong_count = sum(1 for t in tokens if t in truly_agri_strong)
-                
-                if agri_strong_count >= 1:
-                    is_relevant = True
-                    reason = "Relevant despite blacklist (Strong Agri Term found)"
-                else:
-                    is_relevant = False
-                    reason = "Blacklisted term + No specific Agri context"
+    def stats(self):
+        """ Stage latencies (p50/p95/p99) and counters, plus cache stats when caching is on. """
+        stats = self.metrics.stats() if self.metrics is not None else {"enabled": False}
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+    def flush_stats(self, logger, name="ai_client"):
+        """ Writes stats() into the current PipelineLogger run (metrics.<name>) and starts a new window. """
+        logger.record_metrics(name, self.stats())
+        if self.metrics is not None:
+            self.metrics.reset()
+
+    def _log_parse_error(self, e):
+        print(f"      ⚠️ Parsing Error: {e}")
+        import traceback
+        traceback.print_exc()
+
+    def _relevance_stage(self, text):
+        # 1. Relevance Check (Concept Matching Strategy)
+        # Replaces Embedding check (bias issue) and Simple Keyword check (too broad).
+        # Rule: Text must contain specific Agricultural Concepts (Crops, Markets) 
+        # OR multiple Generic Contexts to be considered relevant.
+        rules = self.rules
+        
+        text_lower = text.lower()
+        tokens = text_lower.replace('.', ' ').replace(',', ' ').split()
+        
+        # Single pass over the text: every category / booster / blacklist / rule term hit
+        hits = rules.scan(text_lower)
+
+        strong_count = sum(1 for t in tokens if t in rules.strong_concepts)
+        weak_count = sum(1 for t in tokens if t in rules.weak_concepts)
+        
+        # --- IMPROVEMENT: Financial / Irrelevant Blacklist ---
+        # If these terms exist, we require at least one STRONG agri-specific term (e.g. "wheat", "rice", "fertilizer")
+        # to avoid false positives like "stock market", "tech sector".
+        has_blacklist_term = not hits.isdisjoint(rules.blacklist_terms)
+
+        is_relevant = False
+        
+        if has_blacklist_term:
+            # Strickland Rule: Must have STRONG agri concept (Crop, Pest, Input) excluding generic 'market'/'price'
+            agri_strong_count = sum(1 for t in tokens if t in rules.truly_agri_strong)
             
-            elif strong_count >= 1:
+            if agri_strong_count >= 1:
                 is_relevant = True
-                reason = "Strong Context Match (Crop/Market/Weather)"
-            elif weak_count >= 2:
-                is_relevant = True
-                reason = "Multiple Generic Contexts"
+                reason = "Relevant despite blacklist (Strong Agri Term found)"
             else:
-                 is_relevant = False
-                 reason = "Insufficient Agricultural Context"
+                is_relevant = False
+                reason = "Blacklisted term + No specific Agri context"
+        
+        elif strong_count >= 1:
+            is_relevant = True
+            reason = "Strong Context Match (Crop/Market/Weather)"
+        elif weak_count >= 2:
+            is_relevant = True
+            reason = "Multiple Generic Contexts"
+        else:
+             is_relevant = False
+             reason = "Insufficient Agricultural Context"
+
+        return {
+            "is_relevant": is_relevant,
+            "reason": reason,
+            "text_lower": text_lower,
+            "hits": hits
+        }
+
+    def _decisive_rule(self, hits):
+        """ First DECISIVE_RULES entry that fires for these term hits, or None. """
+        rules = self.rules
+
+        # Fact Check & Sci-Names
+        if not hits.isdisjoint(rules.fact_event_terms):
+            return DECISIVE_RULES[0]
+        # Subsidies Slashed? -> Bad
+        if "subsidy" in hits and not hits.isdisjoint(rules.cut_terms):
+            return DECISIVE_RULES[1]
+        # "Price Hike" is good for crops, bad for inputs/fuel
+        if (not hits.isdisjoint(rules.input_cost_terms) and
+                not hits.isdisjoint(rules.increase_terms) and
+                "subsidy" not in hits):
+            return DECISIVE_RULES[2]
+        # "Export Ban" -> Negative for farmers (usually)
+        # FIX: " ban " is matched as a whole word to avoid "urban", "bank" etc.
+        if not hits.isdisjoint(rules.trade_restriction_terms):
+            return DECISIVE_RULES[3]
+        # Manual Weeding -> Negative problem
+        if "manual" in hits and "labor" in hits:
+            return DECISIVE_RULES[4]
+        # Tech/Startup -> Positive
+        if not hits.isdisjoint(rules.tech_launch_terms) or ("new" in hits and "tech" in hits):
+            return DECISIVE_RULES[5]
+        return None
 
-            if not is_relevant:
-                 return {
-                     "is_relevant": False,
-                     "reason": reason
-                 }
+    def _predict_sentiment(self, texts, batch_size=32):
+        """
+        Runs the sentiment model over texts in length-bucketed batches.
+        Returns (label, score) pairs, or None where inference failed.
+        """
+        if not texts or not self.sentiment_pipe:
+            return [("Neutral", 0.0)] * len(texts)
 
+        if self.metrics is not None:
+            self.metrics.count("model_invocations")
+            self.metrics.count("model_items", len(texts))
 
-            # 2. Topic Categorization (Expanded)
-            category = "General Agriculture"
-            
-            # Expanded keyword-based topic deduction
-            if any(w in text_lower for w in ["price", "market", "msp", "rupee", "dollar", "rate", "cost", "trade"]):
-                category = "Market Prices"
-            elif any(w in text_lower for w in ["rain", "monsoon", "drought", "flood", "weather", "forecast", "temp", "humid"]):
-                category = "Weather"
-            elif any(w in text_lower for w in ["pest", "locust", "disease", "attack", "infest", "worm", "fungus"]):
-                category = "Pest & Disease"
-            elif any(w in text_lower for w in ["govt", "government", "policy", "subsidy", "bill", "loan", "export ban", "ministry"]):
-                category = "Government Policy"
-            elif any(w in text_lower for w in ["drone", "ai", "tech", "sensor", "robot", "app", "digital", "startup"]):
-                category = "Farming Technology"
-            elif any(w in text_lower for w in ["harvest", "sowing", "yield", "planting", "crop", "seed"]):
-                category = "Crop Updates"
-
-
-            # 3. Sentiment Analysis (Model-First Approach)
-            
-            sent_label = "Neutral"
-            sent_score = 0.0
-
-            # B. Model Inference
-            if self.sentiment_pipe:
-                 try:
-                     result = self.sentiment_pipe(text[:512], truncation=True, top_k=1)
-                     if result:
-                         top = result[0]
-                         raw_label = top['label'].lower()
-                         
-                         if raw_label in ['positive', 'label_2']:
-                             sent_label = "POSITIVE"
-                             sent_score = top['score']
-                         elif raw_label in ['negative', 'label_0']:
-                             sent_label = "NEGATIVE"
-                             sent_score = top['score']
-                         else: # neutral, label_1
-                             sent_label = "NEUTRAL"
-                             sent_score = top['score']
-                 except Exception as e:
-                     print(f"Error in sentiment inference: {e}")
-                     pass
+        inputs = list(texts)
+        with self._model_lock:
+            try:
+                if self._sentiment_runner is not None:
+                    outputs = self._sentiment_runner(inputs, batch_size=batch_size, max_batch_tokens=self.max_batch_tokens)
+                else:
+                    # Externally supplied pipeline: let it batch on its own
+                    outputs = self.sentiment_pipe(inputs, batch_size=batch_size, truncation=True, top_k=1)
+            except Exception as e:
+                print(f"Error in batched sentiment inference: {e}")
+                if self.metrics is not None:
+                    self.metrics.count("model_fallbacks")
+                # Retry one-by-one so a single bad input does not neutralize the whole batch
+                outputs = []
+                for t in inputs:
+                    try:
+                        outputs.append(self.sentiment_pipe(t, truncation=True, top_k=1))
+                    except Exception as e:
+                        print(f"Error in sentiment inference: {e}")
+                        outputs.append(None)
+
+        return [self._parse_sentiment(result) for result in outputs]
 
+    def _parse_sentiment(self, result):
+        if result is None:
+            return None
+        if not result:
+            return ("Neutral", 0.0)
+
+        # Single-text calls return [{...}], batched calls return [[{...}], ...]
+        top = result[0] if isinstance(result, list) else result
+        raw_label = top['label'].lower()
+
+        if raw_label in ['positive', 'label_2']:
+            return ("POSITIVE", top['score'])
+        elif raw_label in ['negative', 'label_0']:
+            return ("NEGATIVE", top['score'])
+        else: # neutral, label_1
+            return ("NEUTRAL", top['score'])
+
+    def _finalize(self, text, context, sent_label, sent_score):
+        """ Topic categorization, hybrid rule boosters and keyword extraction for a relevant text. """
+        m = self.metrics
+        if m is not None:
+            t0 = time.perf_counter()
+
+        rules = self.rules
+        hits = context["hits"]
+        reason = context["reason"]
+
+        # 2. Topic Categorization (Expanded)
+        # Expanded keyword-based topic deduction (first matching category wins)
+        category = "General Agriculture"
+        for label, terms in rules.category_rules:
+            if not hits.isdisjoint(terms):
+                category = label
+                break
+
+        # 3. Sentiment Analysis
+        rule = context["rule"] if "rule" in context else self._decisive_rule(hits)
+        if rule is not None:
+            # Decisive rule (fact/event, subsidy cut, input cost, ban, manual labor, tech): model was skipped
+            name, final_label, final_score = rule
+            model_label = None
+            # No model score to report: the rule is deterministic (confidence stays None)
+            sent_score = None
+            decision_path = f"rule:{name}"
+        else:
+            # Model-First Approach, prediction from _predict_sentiment
             # Normalize Label
             if sent_label == "POSITIVE":
                 final_label = "Positive"
@@ -290,82 +804,27 @@ class AgriAIClient:
             if final_label != "Neutral" and abs(final_score) < SENTIMENT_THRESHOLD:
                  final_label = "Neutral"
                  final_score = 0.0
+            model_label = final_label
 
             # --- IMPROVEMENT: Hybrid Rule-Based Booster ---
-            # 1. Fact Check & Sci-Names
-            if "staple food" in text_lower or "conference" in text_lower or "visit the state" in text_lower or "scientific name" in text_lower or "oryza sativa" in text_lower or "gdp" in text_lower or "committee" in text_lower:
-                final_label = "Neutral"
-                final_score = 0.0
-                reason += " + [Fact/Event Neutrality]"
-
-            # 2. Strong Boosters
-            pos_boosters = ["subsidy", "bonus", "hike", "approve", "release", "relief", "bumper", "record", "profit", "boost", "surge", "rise in yield", "jump", "compensate", "safe", "save", "strong", "recede", "good", "happy", "effective", "control", "traction", "normal", "cover", "disburse"]
-            neg_boosters = ["drought", "flood", "pest", "attack", "damage", "loss", "crash", "suicide", "protest", "crisis", "distress", "ruins", "dump produce", "rot", "shortage", "scarcity", "ban", "restrict", "labor intensive", "fear", "heatwave", "stress", "shrivel", "cut", "slash", "reduce", "delayed", "frost", "bollworm", "infest", "low", "migration", "migrat"]
-            
-            # Phrase checks for accuracy
-            # "Price Hike" is good for crops, bad for inputs/fuel
-            input_cost_terms = ["fuel", "diesel", "petrol", "fertilizer", "urea", "pesticide", "cost", "labor", "wage"]
-            is_input_cost_increase = (
-                any(t in text_lower for t in input_cost_terms) and 
-                ("increase" in text_lower or "rise" in text_lower or "rising" in text_lower or "hike" in text_lower or "jump" in text_lower) and
-                "subsidy" not in text_lower
-            )
-            
-            # Subsidies Slashed? -> Bad
-            is_subsidy_cut = "subsidy" in text_lower and ("slash" in text_lower or "cut" in text_lower or "reduce" in text_lower)
-
-            # "Export Ban" -> Negative for farmers (usually)
-            # FIX: Check for "ban" as a whole word to avoid "urban", "bank" etc.
-            is_ban = " ban " in f" {text_lower} " or "restrict" in text_lower or "duty-free import" in text_lower or "block" in text_lower
-            
-            # Tech/Startup -> Positive
-            is_tech_positive = "startup" in text_lower or "launch" in text_lower or ("new" in text_lower and "tech" in text_lower) or "drone" in text_lower or "satellite" in text_lower or "hydroponics" in text_lower
-
-            # Manual Weeding -> Negative problem
-            is_manual_labor = "manual" in text_lower and "labor" in text_lower
-
-            has_pos = any(w in text_lower for w in pos_boosters)
-            has_neg = any(w in text_lower for w in neg_boosters)
+            # Strong Boosters (POS_BOOSTERS / NEG_BOOSTERS)
+            has_pos = not hits.isdisjoint(rules.pos_boosters)
+            has_neg = not hits.isdisjoint(rules.neg_boosters)
             
             # --- MODEL-FIRST HYBRID LOGIC ---
             model_is_confident = abs(final_score) > 0.85
             
-            # 1. Fact Check / Neutrality (HIGHEST PRIORITY - Overrides everything)
-            if "staple food" in text_lower or "conference" in text_lower or "visit the state" in text_lower or "scientific name" in text_lower or "oryza sativa" in text_lower or "gdp" in text_lower or "committee" in text_lower:
-                final_label = "Neutral"
-                final_score = 0.0
-                reason += " + [Fact/Event Neutrality]"
-            elif is_subsidy_cut:
-                 final_label = "Negative"
-                 final_score = -0.8
-                 reason += " + [Subsidy Cut Rule]"
-            elif is_input_cost_increase:
-                # "Rising fuel prices" -> Negative for farmers
-                final_label = "Negative"
-                final_score = -0.8
-                reason += " + [Input Cost Increase Rule]"
-            elif is_ban:
-                final_label = "Negative"
-                final_score = -0.7
-                reason += " + [Trade Restriction Rule]"
-            elif is_manual_labor:
-                final_label = "Negative"
-                final_score = -0.6
-                reason += " + [Manual Labor Issue]"
-            elif is_tech_positive:
-                final_label = "Positive"
-                final_score = 0.8
-                reason += " + [Tech Innovation]"
-            elif has_pos and has_neg:
+            if has_pos and has_neg:
                 # Conflict Resolution
-                if "but" in text_lower:
-                    parts = text_lower.split("but")
+                if "but" in hits:
+                    parts = context["text_lower"].split("but")
                     second_part = parts[1]
                     # Check boosters in second part specificially
-                    sec_neg = any(w in second_part for w in neg_boosters)
-                    sec_pos = any(w in second_part for w in pos_boosters)
+                    sec_hits = rules.scan(second_part)
+                    sec_neg = not sec_hits.isdisjoint(rules.neg_boosters)
+                    sec_pos = not sec_hits.isdisjoint(rules.pos_boosters)
                     
-                    if sec_pos and ("compensate" in second_part or "recover" in second_part or "make up" in second_part):
+                    if sec_pos and not sec_hits.isdisjoint(rules.recovery_terms):
                          final_label = "Positive"
                          final_score = 0.6
                          reason += " + [Compensate->Positive]"
@@ -380,7 +839,7 @@ class AgriAIClient:
                     else:
                         # Fallback logic if no boosters found in 2nd part
                         final_label = "Positive" if has_pos else "Negative"
-                elif "despite" in text_lower:
+                elif "despite" in hits:
                     final_label = "Positive" 
                     final_score = 0.7
                     reason += " + [Despite->Positive]"
@@ -405,34 +864,107 @@ class AgriAIClient:
                 final_score = -0.8
                 reason += " + [Neg Booster]"
 
-            # 4. Keyword Extraction (Simple Fallback)
-            detected_keywords = []
-            words = text.split()
-            for w in words:
-                clean = w.lower().strip(".,!?")
-                if clean in all_keywords and len(clean) > 3:
-                    detected_keywords.append(clean.capitalize())
-            
-            if not detected_keywords:
-                detected_keywords = [category]
-            else:
-                detected_keywords = list(set(detected_keywords))[:5]
+            decision_path = "model" if reason == context["reason"] else "booster"
+
+        if m is not None:
+            t1 = time.perf_counter()
+            m.observe("rules", t1 - t0)
+            if model_label is not None and final_label != model_label:
+                m.count("rule_overrides")
+
+        # 4. Keyword Extraction (Simple Fallback)
+        detected_keywords = []
+        words = text.split()
+        for w in words:
+            clean = w.lower().strip(".,!?")
+            if clean in rules.all_keywords and len(clean) > 3:
+                detected_keywords.append(clean.capitalize())
+        
+        if not detected_keywords:
+            detected_keywords = [category]
+        else:
+            detected_keywords = list(set(detected_keywords))[:5]
+
+        if m is not None:
+            m.observe("keywords", time.perf_counter() - t1)
+
+        return {
+            "is_relevant": True,
+            "category": category,
+            "sentiment_class": final_label,
+            "sentiment_score": round(final_score, 4),
+            "confidence": round(sent_score, 4) if sent_score is not None else None,
+            "detected_keywords": detected_keywords,
+            "decision_path": decision_path
+        }
+
+
+# create_ai_client() results per allow_daemon: one client (and worker pool) per process
+_SHARED_CLIENTS = {}
+_SHARED_CLIENTS_LOCK = threading.Lock()
+
+def create_ai_client(allow_daemon=True):
+    """
+    Analysis client for pipelines, chosen by environment:
+    a running inference daemon (AGRI_INFERENCE_SOCKET or the default socket) -> AgriAIDaemonClient,
+    AGRI_INFERENCE_WORKERS=N (or "auto" for one per core) -> AgriInferencePool with N forked workers,
+    otherwise a plain in-process AgriAIClient.
+    Memoized: every caller in the process gets the same client, so modules that each ask
+    for one (agri_pipeline + social_media_pipeline) share a single model and worker pool.
+    """
+    with _SHARED_CLIENTS_LOCK:
+        client = _SHARED_CLIENTS.get(allow_daemon)
+        if client is None:
+            client = _SHARED_CLIENTS[allow_daemon] = _build_ai_client(allow_daemon)
+        return client
+
+def _inference_workers():
+    """ AGRI_INFERENCE_WORKERS as a worker count (None = one per core); 0 means in-process. """
+    workers = os.getenv("AGRI_INFERENCE_WORKERS", "").strip().lower()
+    if workers in ("", "0", "1"):
+        return 0
+    if workers == "auto":
+        return None
+    try:
+        count = int(workers)
+    except ValueError:
+        count = -1
+    if count < 0:
+        print(f"   ⚠️ Invalid AGRI_INFERENCE_WORKERS '{workers}' (expected a number or 'auto'). Running in-process.")
+        return 0
+    return count if count > 1 else 0
+
+def _build_ai_client(allow_daemon):
+    if allow_daemon:
+        try:
+            from utils.inference_daemon import connect_daemon
+        except ImportError:
+            try:
+                from .inference_daemon import connect_daemon
+            except ImportError:
+                from inference_daemon import connect_daemon
 
+        remote = connect_daemon()
+        if remote is not None:
+            return remote
 
-            return {
-                "is_relevant": True,
-                "category": category,
-                "sentiment_class": final_label,
-                "sentiment_score": round(final_score, 4),
-                "confidence": round(sent_score, 4) if 'sent_score' in locals() else 0.0,
-                "detected_keywords": detected_keywords
-            }
+    workers = _inference_workers()
+    if workers == 0:
+        return AgriAIClient()
 
-        except Exception as e:
-            print(f"      ⚠️ Parsing Error: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+    try:
+        from utils.inference_pool import AgriInferencePool
+    except ImportError:
+        try:
+            from .inference_pool import AgriInferencePool
+        except ImportError:
+            from inference_pool import AgriInferencePool
+
+    # Workers start when a pipeline is about to analyze (pool.start()), not on import
+    return AgriInferencePool(
+        workers=workers,
+        threads_per_worker=int(os.getenv("AGRI_INFERENCE_THREADS", "1"))
+    )
 
 if __name__ == "__main__":
     ai = AgriAIClient()
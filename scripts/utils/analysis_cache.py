@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Default on-disk location: <project root>/.cache/analysis_cache.sqlite3
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.path.join(BASE_DIR, '../../.cache/analysis_cache.sqlite3')
+
+
+# Bump whenever the key derivation changes (2: exact text; the rules match whitespace as written)
+KEY_SCHEME = "2"
+
+
+class AnalysisCache:
+    """
+    Content-hash cache for AgriAIClient results.
+    Tier 1: in-memory LRU (bounded, counts evictions).
+    Tier 2: SQLite file that survives between pipeline runs.
+    Keys are sha1(version + exact text), so bumping the model/rules version
+    invalidates every stale entry without touching the file. Several versions
+    (e.g. torch and ONNX runs) share the file; rows of other versions are only
+    pruned once they are older than max_age_days.
+    """
+
+    def __init__(self, version, path=DEFAULT_CACHE_PATH, max_memory_items=50000, persistent=True, max_age_days=30):
+        self.version = version
+        self.max_age_days = max_age_days
+        self.path = os.path.abspath(path) if persistent else None
+        self.max_memory_items = max_memory_items
+
+        self._memory = OrderedDict() # key -> json string
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+        self.counters = {
+            "hits_memory": 0,
+            "hits_disk": 0,
+            "misses": 0,
+            "evictions": 0,
+            "writes": 0,
+        }
+
+        if self.path:
+            try:
+                self._connect()
+                self._prune()
+            except sqlite3.Error as e:
+                print(f"   ⚠️ [Cache] Disk tier disabled ({e}). Using memory only.")
+                self.path = None
+                self._conn = None
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+            " key TEXT PRIMARY KEY, version TEXT NOT NULL, result TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS analysis_cache_created ON analysis_cache (created_at)")
+        self._pid = os.getpid()
+
+    def _prune(self):
+        # Rows of other versions can't be hit by this run, but another config may still use them:
+        # only drop the ones nobody has written for max_age_days
+        if not self.max_age_days:
+            return
+        cutoff = time.time() - self.max_age_days * 86400
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM analysis_cache WHERE version != ? AND created_at < ?", (self.version, cutoff)
+            )
+
+    def _db(self):
+        # SQLite connections must not be shared across fork(): reopen in child processes
+        if self.path and self._pid != os.getpid():
+            self._connect()
+        return self._conn
+
+    def key(self, text):
+        payload = f"{KEY_SCHEME}\0{self.version}\0{text}"
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """ Returns a fresh copy of the cached result, or None. """
+        with self._lock:
+            raw = self._memory.get(key)
+            if raw is not None:
+                self._memory.move_to_end(key)
+                self.counters["hits_memory"] += 1
+                return json.loads(raw)
+
+            conn = self._db()
+            if conn is not None:
+                row = conn.execute("SELECT result FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+                if row:
+                    self.counters["hits_disk"] += 1
+                    self._remember(key, row[0])
+                    return json.loads(row[0])
+
+            self.counters["misses"] += 1
+            return None
+
+    def put_many(self, items):
+        """ Stores (key, result) pairs in both tiers, one disk transaction per call. """
+        rows = []
+        now = time.time()
+        with self._lock:
+            for key, result in items:
+                raw = json.dumps(result)
+                self._remember(key, raw)
+                rows.append((key, self.version, raw, now))
+
+            conn = self._db()
+            if conn is not None and rows:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO analysis_cache (key, version, result, created_at) VALUES (?, ?, ?, ?)",
+                        rows
+                    )
+            self.counters["writes"] += len(rows)
+
+    def _remember(self, key, raw):
+        self._memory[key] = raw
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["memory_items"] = len(self._memory)
+        lookups = stats["hits_memory"] + stats["hits_disk"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits_memory"] + stats["hits_disk"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,76 @@
+import datetime
+
+from pymongo import UpdateOne
+
+
+def task_id(task):
+    source, keyword, year = task
+    return f"{source}:{year}:{keyword}"
+
+
+class BackfillStore:
+    """
+    Completion state of a historical backfill: one Mongo document per
+    (source, keyword, year) window, status "pending" -> "running" -> "done" / "failed".
+    Windows are marked done only after everything parsed from them was saved, so a
+    killed or crashed backfill resumes with the windows it had not finished.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def plan(self, tasks):
+        """ Registers the task grid (existing windows keep their state); returns how many are new. """
+        now = datetime.datetime.now()
+        ops = [
+            UpdateOne(
+                {"_id": task_id(task)},
+                {"$setOnInsert": {
+                    "source": task[0], "keyword": task[1], "year": task[2],
+                    "status": "pending", "attempts": 0, "saved": 0, "created_at": now,
+                }},
+                upsert=True,
+            )
+            for task in tasks
+        ]
+        if not ops:
+            return 0
+        result = self.collection.bulk_write(ops, ordered=False)
+        return result.upserted_count
+
+    def remaining(self, tasks):
+        """ The tasks of the grid that are not done yet, in the given order. """
+        done = {
+            doc["_id"] for doc in self.collection.find(
+                {"_id": {"$in": [task_id(t) for t in tasks]}, "status": "done"}, {"_id": 1}
+            )
+        }
+        return [t for t in tasks if task_id(t) not in done]
+
+    def start(self, task):
+        self._update(task, {"$set": {"status": "running", "started_at": datetime.datetime.now()},
+                            "$inc": {"attempts": 1}})
+
+    def finish(self, task, saved=0, ok=True, error=None):
+        update = {"status": "done" if ok else "failed", "saved": saved, "finished_at": datetime.datetime.now()}
+        if error:
+            update["error"] = error[:500]
+        self._update(task, {"$set": update})
+
+    def reset(self, sources=None):
+        """ Forgets completion state (all sources, or the given ones) so the next backfill starts over. """
+        query = {"source": {"$in": list(sources)}} if sources else {}
+        return self.collection.delete_many(query).deleted_count
+
+    def summary(self, tasks):
+        """ Task counts per status for the given grid. """
+        counts = {}
+        for doc in self.collection.find({"_id": {"$in": [task_id(t) for t in tasks]}}, {"status": 1}):
+            counts[doc["status"]] = counts.get(doc["status"], 0) + 1
+        return counts
+
+    def _update(self, task, update):
+        try:
+            self.collection.update_one({"_id": task_id(task)}, update)
+        except Exception as e:
+            print(f"   ⚠️ [Backfill] Could not update {task_id(task)}: {e}")
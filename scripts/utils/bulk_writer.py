@@ -0,0 +1,268 @@
+import os
+import json
+import time
+import random
+import datetime
+import threading
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, ExecutionTimeout, PyMongoError, WTimeoutError
+from pymongo.write_concern import WriteConcern
+
+try:
+    from utils.metrics import StageMetrics
+except ImportError:
+    try:
+        from .metrics import StageMetrics
+    except ImportError:
+        from metrics import StageMetrics
+
+# Default dead-letter file for writes that failed for good: <project root>/.cache/failed_writes.jsonl
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DEAD_LETTER_PATH = os.path.join(BASE_DIR, '../../.cache/failed_writes.jsonl')
+
+# Per-document write error codes worth retrying: duplicate key from racing upserts,
+# primary step-downs / shutdowns, network and time-limit errors
+RETRYABLE_CODES = {11000, 6, 7, 89, 91, 189, 262, 9001, 10107, 11600, 11602, 13435, 13436, 50}
+
+
+def _parse_write_concern(value):
+    if not value:
+        return None
+    return value if not value.lstrip("-").isdigit() else int(value)
+
+
+def is_transient(error):
+    """ Errors where retrying the same (idempotent) writes can succeed. """
+    if isinstance(error, (ConnectionFailure, ExecutionTimeout, WTimeoutError)):
+        return True
+    return isinstance(error, PyMongoError) and error.has_error_label("RetryableWriteError")
+
+
+class BulkWriter:
+    """
+    Shared write stage for a collection: callers hand over upserts (coalesced per key, later
+    fields win) or raw write ops, and one background thread flushes them as unordered
+    bulk_write calls once batch_size are pending or interval seconds after the first one.
+    Transient failures are retried with exponential backoff, per document where Mongo reports
+    which ones failed. Writes still failing after `retries` are appended to a dead-letter file
+    and reported through on_done(ok=False) and the "failed" counter; nothing is dropped quietly.
+    Callers block while max_pending writes are buffered (backpressure).
+    Settings: AGRI_WRITE_BATCH, AGRI_WRITE_INTERVAL, AGRI_WRITE_CONCERN ("majority", "1", ...),
+    AGRI_WRITE_TIMEOUT_MS, AGRI_WRITE_RETRIES, AGRI_WRITE_BACKOFF, AGRI_WRITE_PENDING.
+    """
+
+    def __init__(self, collection, name="posts", batch_size=None, interval=None, write_concern=None,
+                 retries=None, backoff=None, max_pending=None, dead_letter_path=DEFAULT_DEAD_LETTER_PATH):
+        self.name = name
+        self.batch_size = batch_size or int(os.getenv("AGRI_WRITE_BATCH", "500"))
+        self.interval = interval or float(os.getenv("AGRI_WRITE_INTERVAL", "2.0"))
+        self.retries = retries if retries is not None else int(os.getenv("AGRI_WRITE_RETRIES", "5"))
+        self.backoff = backoff or float(os.getenv("AGRI_WRITE_BACKOFF", "0.5"))
+        self.max_pending = max(self.batch_size, max_pending or int(os.getenv("AGRI_WRITE_PENDING", str(4 * self.batch_size))))
+        self.dead_letter_path = dead_letter_path
+
+        write_concern = write_concern or _parse_write_concern(os.getenv("AGRI_WRITE_CONCERN"))
+        timeout_ms = os.getenv("AGRI_WRITE_TIMEOUT_MS")
+        if write_concern is not None or timeout_ms:
+            collection = collection.with_options(write_concern=WriteConcern(
+                w=write_concern, wtimeout=int(timeout_ms) if timeout_ms else None
+            ))
+        self.collection = collection
+
+        self.metrics = StageMetrics()
+        self._cond = threading.Condition()
+        self._pending = {} # ("upsert", key, value) -> [doc, callbacks] | ("op", seq) -> [op, callbacks]
+        self._seq = 0
+        self._deadline = None
+        self._flush_requested = False
+        self._in_flight = False
+        self._closing = False
+        self._thread = None
+
+    def _start(self):
+        if self._thread is None:
+            self._closing = False
+            self._thread = threading.Thread(target=self._run, name=f"bulk-writer-{self.name}", daemon=True)
+            self._thread.start()
+
+    def _enqueue(self, slot, payload, on_done, merge):
+        with self._cond:
+            self._start()
+            while len(self._pending) >= self.max_pending and slot not in self._pending:
+                self._cond.wait()
+            entry = self._pending.get(slot)
+            if entry is not None and merge:
+                entry[0].update(payload)
+            else:
+                entry = self._pending[slot] = [payload, []]
+            if on_done is not None:
+                entry[1].append(on_done)
+            if self._deadline is None:
+                # First write of a batch: wake the flush thread so it waits on the new deadline
+                self._deadline = time.monotonic() + self.interval
+                self._cond.notify_all()
+            elif len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+
+    def upsert(self, doc, key="reddit_id", on_done=None):
+        """ Queues an upsert of `doc` by doc[key]; on_done(ok) runs after it was written (or failed for good). """
+        self._enqueue(("upsert", key, doc[key]), dict(doc), on_done, merge=True)
+
+    def add(self, op, on_done=None):
+        """ Queues any pymongo write op (UpdateOne, DeleteOne, ...) as is. """
+        with self._cond:
+            self._seq += 1
+            slot = ("op", self._seq)
+        self._enqueue(slot, op, on_done, merge=False)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not (self._closing or self._flush_requested or len(self._pending) >= self.batch_size
+                           or (self._deadline is not None and time.monotonic() >= self._deadline)):
+                    self._cond.wait(None if self._deadline is None else max(0.0, self._deadline - time.monotonic()))
+                if not self._pending:
+                    self._flush_requested = False
+                    self._cond.notify_all()
+                    if self._closing:
+                        return
+                    continue
+                batch, self._pending, self._deadline = self._pending, {}, None
+                self._in_flight = True
+                self._cond.notify_all() # room for blocked producers
+            try:
+                self._write(list(batch.items()))
+            finally:
+                with self._cond:
+                    self._in_flight = False
+                    self._cond.notify_all()
+
+    def _write(self, entries):
+        for start in range(0, len(entries), self.batch_size):
+            chunk = entries[start:start + self.batch_size]
+            ops = [
+                UpdateOne({slot[1]: slot[2]}, {"$set": payload}, upsert=True) if slot[0] == "upsert" else payload
+                for slot, (payload, _) in chunk
+            ]
+            failed = self._write_with_retry(ops)
+            if failed:
+                self._dead_letter([(chunk[i], error) for i, error in failed.items()])
+            for i, (slot, (payload, callbacks)) in enumerate(chunk):
+                for on_done in callbacks:
+                    try:
+                        on_done(i not in failed)
+                    except Exception as e:
+                        print(f"      ⚠️ [Writer] on_done callback failed: {e}")
+
+    def _write_with_retry(self, ops):
+        """ Writes ops unordered; returns {index: error} for the ones that failed for good. """
+        remaining = list(range(len(ops)))
+        failed = {}
+        attempt = 0
+        while remaining:
+            retry, error = [], None
+            started = time.perf_counter()
+            try:
+                result = self.collection.bulk_write([ops[i] for i in remaining], ordered=False)
+                self.metrics.observe("flush", time.perf_counter() - started)
+                self.metrics.count("written", len(remaining))
+                if getattr(result, "acknowledged", False):
+                    self.metrics.count("upserted", result.upserted_count)
+                    self.metrics.count("modified", result.modified_count)
+                    self.metrics.count("deleted", result.deleted_count)
+                break
+            except BulkWriteError as e:
+                self.metrics.observe("flush", time.perf_counter() - started)
+                details = e.details or {}
+                errored = set()
+                for write_error in details.get("writeErrors", []):
+                    index = remaining[write_error["index"]]
+                    errored.add(index)
+                    if write_error.get("code") in RETRYABLE_CODES:
+                        retry.append(index)
+                    else:
+                        failed[index] = write_error.get("errmsg", "write error")
+                # A write concern error leaves the applied writes unconfirmed: redo them (upserts are idempotent)
+                confirmed = [i for i in remaining if i not in errored]
+                if details.get("writeConcernErrors"):
+                    retry.extend(confirmed)
+                else:
+                    self.metrics.count("written", len(confirmed))
+                error = e
+            except PyMongoError as e:
+                self.metrics.observe("flush", time.perf_counter() - started)
+                if not is_transient(e):
+                    failed.update((i, str(e)) for i in remaining)
+                    break
+                retry, error = remaining, e
+            except Exception as e:
+                # Anything unexpected fails the writes (reported), never the flush thread
+                self.metrics.observe("flush", time.perf_counter() - started)
+                failed.update((i, f"{type(e).__name__}: {e}") for i in remaining)
+                break
+
+            attempt += 1
+            if retry and attempt > self.retries:
+                failed.update((i, str(error)) for i in retry)
+                break
+            if retry:
+                self.metrics.count("retries")
+                delay = self.backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                print(f"      🔁 [Writer] {len(retry)} writes to {self.name} hit {type(error).__name__}; retry {attempt}/{self.retries} in {delay:.1f}s.")
+                time.sleep(delay)
+            remaining = sorted(retry)
+
+        if failed:
+            self.metrics.count("failed", len(failed))
+        written = len(ops) - len(failed)
+        if written:
+            print(f"          💾 Saved {written} {self.name} ({len(ops)} queued, {attempt} retries).")
+        return failed
+
+    def _dead_letter(self, failures):
+        print(f"      ❌ [Writer] {len(failures)} writes to {self.name} failed after retries"
+              f"{f' (kept in {self.dead_letter_path})' if self.dead_letter_path else ''}.")
+        if not self.dead_letter_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.dead_letter_path)), exist_ok=True)
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                for (slot, (payload, _)), error in failures:
+                    record = {"collection": self.name, "failed_at": datetime.datetime.now(), "error": error}
+                    if slot[0] == "upsert":
+                        record.update(key=slot[1], value=slot[2], doc=payload)
+                    else:
+                        record["op"] = repr(payload)
+                    f.write(json.dumps(record, default=str) + "\n")
+        except OSError as e:
+            print(f"      ❌ [Writer] Could not write dead-letter file: {e}")
+
+    def flush(self):
+        """ Blocks until everything queued so far was written (or failed for good). """
+        with self._cond:
+            if self._thread is None:
+                return
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                self._cond.wait()
+
+    def close(self):
+        """ Flushes and stops the flush thread (the next write starts it again). """
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        thread.join()
+        with self._cond:
+            self._thread = None
+            self._closing = False
+
+    def stats(self):
+        stats = self.metrics.stats()
+        with self._cond:
+            stats["pending"] = len(self._pending)
+        return stats
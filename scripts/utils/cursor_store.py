@@ -0,0 +1,54 @@
+import os
+import datetime
+
+
+class CursorStore:
+    """
+    Newest ingested position per (source, query), e.g. a Reddit id or a Mastodon since_id,
+    kept in Mongo so the next run only pages back until it meets content it already has.
+    Cursors are advanced by the fetchers only after the items behind them were saved.
+    AGRI_INCREMENTAL=0 ignores stored cursors (full re-crawl) but still records new ones.
+    A frozen store neither reads nor records cursors (replays of archived responses).
+    """
+
+    def __init__(self, collection, enabled=None):
+        self.collection = collection
+        self.enabled = os.getenv("AGRI_INCREMENTAL", "1") != "0" if enabled is None else enabled
+        self.frozen = False
+        self._indexed = False
+
+    def _ensure_index(self):
+        if not self._indexed:
+            try:
+                self.collection.create_index([("source", 1), ("query", 1)], unique=True)
+            except Exception as e:
+                print(f"   ⚠️ [Cursors] Could not create index: {e}")
+            self._indexed = True
+
+    def get(self, source, query):
+        """ Stored position fields for (source, query), or {} on first run / when disabled. """
+        if not self.enabled or self.frozen:
+            return {}
+        try:
+            doc = self.collection.find_one({"source": source, "query": query}, {"_id": 0})
+        except Exception as e:
+            print(f"   ⚠️ [Cursors] Lookup failed for {source}/{query}: {e}")
+            return {}
+        return doc or {}
+
+    def advance(self, source, query, **position):
+        """ Saves the newest position reached for (source, query). """
+        if self.frozen:
+            return
+        self._ensure_index()
+        try:
+            self.collection.update_one(
+                {"source": source, "query": query},
+                {"$set": dict(position, updated_at=datetime.datetime.now())},
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"   ⚠️ [Cursors] Could not save {source}/{query}: {e}")
+
+    def freeze(self):
+        self.frozen = True
@@ -0,0 +1,139 @@
+import os
+import calendar
+import datetime
+import threading
+
+# Granularity ladder for search windows; each level splits into the next
+LEVELS = ("year", "half", "quarter", "month")
+MONTHS_PER_LEVEL = {"year": 12, "half": 6, "quarter": 3, "month": 1}
+
+
+class DateWindow:
+    """ A calendar-aligned [start, end] search window (both dates inclusive). """
+
+    __slots__ = ("start", "end", "level")
+
+    def __init__(self, start, end, level):
+        self.start = start
+        self.end = end
+        self.level = level
+
+    @classmethod
+    def year(cls, year):
+        return cls(datetime.date(year, 1, 1), datetime.date(year, 12, 31), "year")
+
+    @classmethod
+    def months(cls, year, first_month, count, level):
+        last_month = first_month + count - 1
+        return cls(
+            datetime.date(year, first_month, 1),
+            datetime.date(year, last_month, calendar.monthrange(year, last_month)[1]),
+            level,
+        )
+
+    @classmethod
+    def from_range(cls, start, end):
+        """ The window spanning [start, end] (as produced by children()), e.g. parsed back from a search URL. """
+        months = (end.year - start.year) * 12 + end.month - start.month + 1
+        level = next((level for level, count in MONTHS_PER_LEVEL.items() if count == months), None)
+        if level is None:
+            raise ValueError(f"{start}..{end} is not a search window")
+        return cls(start, end, level)
+
+    @property
+    def key(self):
+        return f"{self.start:%Y-%m-%d}_{self.end:%Y-%m-%d}"
+
+    @property
+    def midpoint(self):
+        start = datetime.datetime.combine(self.start, datetime.time())
+        return start + (datetime.datetime.combine(self.end, datetime.time()) - start) / 2
+
+    def children(self):
+        """ The next-finer windows covering this one ([] for a month). """
+        index = LEVELS.index(self.level)
+        if index + 1 == len(LEVELS):
+            return []
+        level = LEVELS[index + 1]
+        step = MONTHS_PER_LEVEL[level]
+        return [
+            DateWindow.months(self.start.year, month, step, level)
+            for month in range(self.start.month, self.end.month + 1, step)
+        ]
+
+    def __repr__(self):
+        return f"DateWindow({self.key}, {self.level})"
+
+
+class WindowTree:
+    """
+    Which search windows are known to hit a feed's item cap, per (source, query), kept in Mongo.
+    A window is split into its children when a response comes back at the cap; later runs
+    read the split set and go straight to the finer windows instead of re-asking the capped one.
+    Splits are never undone (a window's result count only grows).
+    A frozen tree neither reads nor records stored splits: windows still split within the
+    run, so a recorded and a replayed run ask for the same URLs.
+    """
+
+    def __init__(self, collection, enabled=None):
+        self.collection = collection
+        self.enabled = os.getenv("AGRI_WINDOW_SPLIT", "1") != "0" if enabled is None else enabled
+        self.frozen = False
+        self._splits = {} # (source, query) -> set of split window keys
+        self._indexed = False
+        self._lock = threading.Lock()
+
+    def _ensure_index(self):
+        if not self._indexed:
+            try:
+                self.collection.create_index([("source", 1), ("query", 1)], unique=True)
+            except Exception as e:
+                print(f"   ⚠️ [Windows] Could not create index: {e}")
+            self._indexed = True
+
+    def _load(self, source, query):
+        with self._lock:
+            splits = self._splits.get((source, query))
+        if splits is not None:
+            return splits
+        if self.frozen:
+            with self._lock:
+                return self._splits.setdefault((source, query), set())
+        try:
+            doc = self.collection.find_one({"source": source, "query": query}, {"split": 1})
+        except Exception as e:
+            print(f"   ⚠️ [Windows] Lookup failed for {source}/{query}: {e}")
+            doc = None
+        with self._lock:
+            return self._splits.setdefault((source, query), set((doc or {}).get("split", [])))
+
+    def is_split(self, source, query, window):
+        return self.enabled and window.key in self._load(source, query)
+
+    def mark_split(self, source, query, window, count):
+        """ Records that `window` returned `count` items (at the cap) and must be split. """
+        self._load(source, query)
+        with self._lock:
+            self._splits[(source, query)].add(window.key)
+        if self.frozen:
+            return
+        self._ensure_index()
+        try:
+            self.collection.update_one(
+                {"source": source, "query": query},
+                {"$addToSet": {"split": window.key},
+                 "$set": {f"counts.{window.key}": count, "updated_at": datetime.datetime.now()}},
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"   ⚠️ [Windows] Could not save split of {source}/{query} {window.key}: {e}")
+
+    def freeze(self):
+        """ Forgets the splits loaded so far and stops reading/writing them in Mongo. """
+        with self._lock:
+            self.frozen = True
+            self._splits = {}
+
+    def stats(self):
+        with self._lock:
+            return {"queries": len(self._splits), "split_windows": sum(len(s) for s in self._splits.values())}
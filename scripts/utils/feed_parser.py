@@ -0,0 +1,35 @@
+import io
+import re
+import xml.etree.ElementTree as ET
+
+# Same pattern the fetchers used inline, compiled once
+HTML_TAG_RE = re.compile('<[^<]+?>')
+
+DC_CREATOR = '{http://purl.org/dc/elements/1.1/}creator'
+
+
+def strip_html(text):
+    """ Removes HTML tags (descriptions, Mastodon statuses); None becomes "". """
+    return HTML_TAG_RE.sub('', text) if text else ""
+
+
+def iter_rss_items(content, limit=None, stop=None):
+    """
+    Streams <item> elements out of an RSS document with iterparse.
+    Yields {child tag: text} per item (namespaced tags in Clark notation, e.g. DC_CREATOR)
+    and frees each item's children as it goes, so memory stays low on large archive feeds.
+    Parsing stops after `limit` items, or at the first item for which stop(item) is true.
+    """
+    count = 0
+    for _, elem in ET.iterparse(io.BytesIO(content)):
+        if elem.tag != "item":
+            continue
+
+        item = {child.tag: child.text for child in elem}
+        elem.clear() # children and text go now; only an empty <item> stays attached
+        if stop is not None and stop(item):
+            return
+        yield item
+        count += 1
+        if limit is not None and count >= limit:
+            return
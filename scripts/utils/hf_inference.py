@@ -0,0 +1,153 @@
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Base URL of the hosted inference API (point at a local stand-in server for testing)
+DEFAULT_HF_INFERENCE_URL = "https://router.huggingface.co/hf-inference/models"
+
+# Statuses worth retrying: rate limited, model loading / overloaded, transient gateway errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def retry_after_seconds(response):
+    """ Seconds the server asked us to wait (Retry-After header or HF's estimated_time), or None. """
+    header = response.headers.get("Retry-After")
+    if header:
+        header = header.strip()
+        if header.isdigit():
+            return float(header)
+        try:
+            return max(0.0, parsedate_to_datetime(header).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+
+    # Model still loading: {"error": "... is currently loading", "estimated_time": 20.0}
+    if response.status_code == 503:
+        try:
+            estimated = response.json().get("estimated_time")
+            if estimated is not None:
+                return float(estimated)
+        except (ValueError, AttributeError):
+            pass
+    return None
+
+
+class HFInferenceClient:
+    """
+    Pooled client for the Hugging Face Inference API.
+    One keep-alive requests.Session shared by all threads, at most max_concurrency
+    requests in flight, exponential backoff with full jitter (Retry-After wins when sent).
+    """
+
+    def __init__(self, api_token=None, base_url=None, max_concurrency=8, max_retries=5,
+                 backoff_base=1.0, backoff_max=60.0, timeout=20):
+        self.base_url = (base_url or os.getenv("HF_INFERENCE_URL", DEFAULT_HF_INFERENCE_URL)).rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if api_token:
+            self.session.headers["Authorization"] = f"Bearer {api_token}"
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0}
+
+    def model_url(self, model_id):
+        return f"{self.base_url}/{model_id}"
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            # Server knows best; add a little jitter so waiting clients don't return in lockstep
+            return min(self.backoff_max, retry_after) + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def post(self, url, payload, retries=None):
+        """ POSTs JSON and returns the decoded response, or None after a non-retryable error / retries exhausted. """
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries):
+            retry_after = None
+            try:
+                with self._slots:
+                    self._count("requests")
+                    response = self.session.post(url, json=payload, timeout=self.timeout)
+
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code not in RETRY_STATUSES:
+                    print(f"   ⚠️ [HF] {url} -> HTTP {response.status_code}")
+                    break
+                if response.status_code == 429:
+                    self._count("throttled")
+                retry_after = retry_after_seconds(response)
+            except (requests.RequestException, ValueError) as e:
+                print(f"   ⚠️ [HF] Request failed ({e})")
+
+            if attempt < retries - 1:
+                self._count("retries")
+                time.sleep(self._backoff(attempt, retry_after))
+
+        self._count("failures")
+        return None
+
+    def zero_shot(self, model_id, texts, labels, multi_label=False, batch_size=8):
+        """
+        Zero-shot classification for many texts.
+        Texts are packed batch_size per request and requests run concurrently; if the
+        endpoint rejects a packed request, that chunk is retried one text per request.
+        Returns one {"labels": [...], "scores": [...]} per text (None where it failed), in order.
+        """
+        url = self.model_url(model_id)
+        parameters = {"candidate_labels": list(labels), "multi_label": multi_label}
+        chunks = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+        def run_chunk(chunk):
+            if len(chunk) > 1:
+                result = self.post(url, {"inputs": chunk, "parameters": parameters})
+                packed = isinstance(result, list) and len(result) == len(chunk)
+                # A single {"label", "score"} ranking means the inputs were not treated as a batch
+                if packed and not (isinstance(result[0], dict) and "label" in result[0]):
+                    return [_normalize_zero_shot(r) for r in result]
+            return [
+                _normalize_zero_shot(self.post(url, {"inputs": text, "parameters": parameters}))
+                for text in chunk
+            ]
+
+        results = []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks) or 1)) as executor:
+            for part in executor.map(run_chunk, chunks):
+                results.extend(part)
+        return results
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def close(self):
+        self.session.close()
+
+
+def _normalize_zero_shot(result):
+    """ The API answers either {"labels", "scores"} or a list of {"label", "score"}. """
+    if isinstance(result, dict) and "labels" in result:
+        return {"labels": result["labels"], "scores": result["scores"]}
+    if isinstance(result, list) and result and isinstance(result[0], dict) and "label" in result[0]:
+        ranked = sorted(result, key=lambda r: r["score"], reverse=True)
+        return {"labels": [r["label"] for r in ranked], "scores": [r["score"] for r in ranked]}
+    return None
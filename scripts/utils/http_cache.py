@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+# Default on-disk location: <project root>/.cache/http_cache.sqlite3
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HTTP_CACHE_PATH = os.path.join(BASE_DIR, '../../.cache/http_cache.sqlite3')
+
+# Response headers worth keeping with a cached body
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class HttpCacheEntry:
+    __slots__ = ("url", "etag", "last_modified", "body_hash", "headers", "fetched_at", "confirmed")
+
+    def __init__(self, url, etag, last_modified, body_hash, headers, fetched_at, confirmed):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body_hash = body_hash
+        self.headers = headers
+        self.fetched_at = fetched_at
+        self.confirmed = confirmed
+
+    def is_fresh(self, ttl, now=None):
+        return ttl is not None and (now or time.time()) - self.fetched_at < ttl
+
+
+class HttpCache:
+    """
+    SQLite store of feed responses for conditional GETs: the body (zlib-compressed)
+    plus ETag / Last-Modified, keyed by URL.
+    An entry starts unconfirmed and is confirmed by the fetcher once everything
+    parsed from it was saved; only confirmed entries let a fetch be skipped, so a
+    run that crashes between download and save re-processes the feed next time.
+    """
+
+    def __init__(self, path=DEFAULT_HTTP_CACHE_PATH):
+        self.path = os.path.abspath(path)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._connect()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body_hash TEXT NOT NULL,"
+            " body BLOB NOT NULL, headers TEXT NOT NULL, fetched_at REAL NOT NULL, confirmed INTEGER NOT NULL)"
+        )
+        self._pid = os.getpid()
+
+    def _db(self):
+        # SQLite connections must not be shared across fork(): reopen in child processes
+        if self._pid != os.getpid():
+            self._connect()
+        return self._conn
+
+    def get(self, url):
+        with self._lock:
+            row = self._db().execute(
+                "SELECT etag, last_modified, body_hash, headers, fetched_at, confirmed FROM http_cache WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if not row:
+            return None
+        etag, last_modified, body_hash, headers, fetched_at, confirmed = row
+        return HttpCacheEntry(url, etag, last_modified, body_hash, json.loads(headers), fetched_at, bool(confirmed))
+
+    def body(self, url):
+        with self._lock:
+            row = self._db().execute("SELECT body FROM http_cache WHERE url = ?", (url,)).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    def put(self, url, response, confirmed=False):
+        """ Stores a 200 response; returns its body hash. """
+        body = response.content
+        body_hash = hashlib.sha1(body).hexdigest()
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO http_cache"
+                    " (url, etag, last_modified, body_hash, body, headers, fetched_at, confirmed)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (url, headers.get("ETag"), headers.get("Last-Modified"), body_hash,
+                     sqlite3.Binary(zlib.compress(body, 6)), json.dumps(headers), time.time(), int(confirmed))
+                )
+        return body_hash
+
+    def touch(self, url):
+        """ Marks a cached body as revalidated now (after a 304 / unchanged body). """
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute("UPDATE http_cache SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+    def confirm(self, urls):
+        urls = [(url,) for url in urls]
+        if not urls:
+            return
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.executemany("UPDATE http_cache SET confirmed = 1 WHERE url = ?", urls)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,333 @@
+import os
+import time
+import hashlib
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    from utils.metrics import StageMetrics
+    from utils.hf_inference import retry_after_seconds
+    from utils.http_cache import HttpCache
+    from utils.response_archive import ResponseArchive
+    from utils.http_fixtures import mount_fixtures, fixture_mode, canonical_url
+except ImportError:
+    try:
+        from .metrics import StageMetrics
+        from .hf_inference import retry_after_seconds
+        from .http_cache import HttpCache
+        from .response_archive import ResponseArchive
+        from .http_fixtures import mount_fixtures, fixture_mode, canonical_url
+    except ImportError:
+        from metrics import StageMetrics
+        from hf_inference import retry_after_seconds
+        from http_cache import HttpCache
+        from response_archive import ResponseArchive
+        from http_fixtures import mount_fixtures, fixture_mode, canonical_url
+
+# Max concurrent requests per host (AGRI_HOST_CONCURRENCY), with per-host overrides
+# from AGRI_HOST_LIMITS, e.g. "www.reddit.com=1,news.google.com=6"
+DEFAULT_HOST_CONCURRENCY = 4
+HOST_CONCURRENCY = {
+    "www.reddit.com": 1, # unauthenticated search API blocks parallel clients quickly
+}
+
+# Starting request rate per host as (requests/second, burst): AGRI_HOST_RATE / AGRI_HOST_BURST,
+# with per-host overrides from AGRI_HOST_RATES, e.g. "www.reddit.com=0.5:1,news.google.com=2:4".
+# Rates adapt at runtime between rate / RATE_FLOOR_DIVISOR and rate * AGRI_HOST_RATE_CEILING;
+# a host with its own entry here (or in AGRI_HOST_RATES) never goes above the rate it was given.
+DEFAULT_HOST_RATE = (1.0, 2)
+HOST_RATES = {
+    "www.reddit.com": (0.5, 1), # the old fixed 2s pause between pages
+    "news.google.com": (2.0, 4),
+    "hn.algolia.com": (5.0, 5),
+    "api.worldbank.org": (5.0, 5),
+}
+DEFAULT_RATE_CEILING = 4.0
+RATE_FLOOR_DIVISOR = 16.0
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = {429, 403}
+
+
+def _parse_host_limits(value):
+    limits = {}
+    for part in (value or "").split(","):
+        host, sep, limit = part.strip().partition("=")
+        if sep and limit.strip().isdigit():
+            limits[host.strip().lower()] = int(limit)
+    return limits
+
+
+def _parse_host_rates(value):
+    rates = {}
+    for part in (value or "").split(","):
+        host, sep, spec = part.strip().partition("=")
+        if not sep:
+            continue
+        rate, _, burst = spec.partition(":")
+        try:
+            rates[host.strip().lower()] = (float(rate), int(burst) if burst else None)
+        except ValueError:
+            continue
+    return rates
+
+
+class TokenBucket:
+    """
+    Token bucket with AIMD rate adaptation: the rate halves on a throttle response
+    (and the bucket pauses for Retry-After when the server sends one), and creeps
+    back up by a twentieth of the base rate per successful response.
+    """
+
+    def __init__(self, rate, burst=1, min_rate=None, max_rate=None):
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.min_rate = min_rate or self.base_rate / RATE_FLOOR_DIVISOR
+        self.max_rate = max_rate or self.base_rate * DEFAULT_RATE_CEILING
+        self.tokens = float(self.burst)
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        """ Takes a token and returns how long the caller must wait before sending. """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1 # may go negative: later callers queue up behind this one
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.base_rate / 20.0)
+
+    def on_throttle(self, retry_after=None):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2.0)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+
+class HttpClient:
+    """
+    Shared HTTP layer for the fetchers.
+    One keep-alive session for all threads. Each host gets a semaphore, so concurrent
+    fetch tasks never have more than N requests in flight against it, and a token
+    bucket that paces requests and backs off when the host pushes back.
+    Waits and throttle events are recorded in self.metrics (stage "rate_wait:<host>").
+
+    Feeds can opt into the on-disk conditional-GET cache with get(url, cache_ttl=...):
+    within the TTL the cached body is served without a request, after it the request
+    carries If-None-Match / If-Modified-Since. Responses get two extra attributes:
+    from_cache (body came from disk) and not_modified (the fetcher already processed
+    this exact body and called confirm(), so parsing/analysis can be skipped).
+    AGRI_HTTP_CACHE=0 turns the cache off.
+
+    Every 200 response body is also appended to the raw response archive, keyed by its
+    canonical URL without credential parameters (AGRI_HTTP_ARCHIVE=0 turns that off);
+    replays read it back through social_media_pipeline.replay_archive().
+    With AGRI_HTTP_FIXTURES=record|replay the session goes through the fixture transport
+    (utils/http_fixtures.py) for deterministic offline runs; the response cache is off
+    then, so every request reaches (and is recorded by) the fixture transport.
+    """
+
+    def __init__(self, default_concurrency=None, host_concurrency=None, pool_size=64,
+                 default_rate=None, host_rates=None):
+        self.default_concurrency = default_concurrency or int(
+            os.getenv("AGRI_HOST_CONCURRENCY", DEFAULT_HOST_CONCURRENCY)
+        )
+        self.host_concurrency = dict(HOST_CONCURRENCY)
+        self.host_concurrency.update(host_concurrency or _parse_host_limits(os.getenv("AGRI_HOST_LIMITS")))
+
+        self.default_rate = default_rate or (
+            float(os.getenv("AGRI_HOST_RATE", DEFAULT_HOST_RATE[0])),
+            int(os.getenv("AGRI_HOST_BURST", DEFAULT_HOST_RATE[1])),
+        )
+        self.rate_ceiling = float(os.getenv("AGRI_HOST_RATE_CEILING", DEFAULT_RATE_CEILING))
+        self.host_rates = dict(HOST_RATES)
+        self.host_rates.update(host_rates or _parse_host_rates(os.getenv("AGRI_HOST_RATES")))
+
+        self.session = requests.Session()
+        # Plain pooled adapter, or the record/replay fixture transport (AGRI_HTTP_FIXTURES)
+        mount_fixtures(self.session, pool_connections=32, pool_maxsize=pool_size)
+
+        self.metrics = StageMetrics()
+        self._cache = None
+        # Fixture runs must see every request: a fresh cache hit would never be recorded (and so 404 on replay).
+        # Fixture replays are not worth archiving either.
+        self.cache_enabled = os.getenv("AGRI_HTTP_CACHE", "1") != "0" and fixture_mode() is None
+        self._archive = None
+        self.archive_enabled = os.getenv("AGRI_HTTP_ARCHIVE", "1") != "0" and fixture_mode() != "replay"
+        self._slots = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _host_slots(self, host):
+        with self._lock:
+            slots = self._slots.get(host)
+            if slots is None:
+                limit = self.host_concurrency.get(host, self.default_concurrency)
+                slots = self._slots[host] = threading.BoundedSemaphore(max(1, limit))
+            return slots
+
+    def bucket(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_rates.get(host, self.default_rate)
+                rate = rate or self.default_rate[0]
+                # Explicit per-host rates are polite limits: AIMD may back off below them, never climb past
+                ceiling = 1.0 if host in self.host_rates else self.rate_ceiling
+                bucket = self._buckets[host] = TokenBucket(
+                    rate, burst or self.default_rate[1], max_rate=rate * ceiling
+                )
+            return bucket
+
+    @property
+    def cache(self):
+        if self._cache is None and self.cache_enabled:
+            with self._lock:
+                if self._cache is None:
+                    try:
+                        self._cache = HttpCache()
+                    except Exception as e:
+                        print(f"   ⚠️ [HTTP] Response cache disabled ({e}).")
+                        self.cache_enabled = False
+        return self._cache
+
+    @property
+    def archive(self):
+        if self._archive is None and self.archive_enabled:
+            with self._lock:
+                if self._archive is None:
+                    try:
+                        self._archive = ResponseArchive()
+                    except Exception as e:
+                        print(f"   ⚠️ [HTTP] Response archive disabled ({e}).")
+                        self.archive_enabled = False
+        return self._archive
+
+    def get(self, url, cache_ttl=None, **kwargs):
+        """
+        requests.get() with connection reuse, the per-host in-flight bound and rate limiting.
+        cache_ttl (seconds, float("inf") = never refetch) routes the request through the response cache.
+        """
+        if cache_ttl is None or self.cache is None:
+            return self._send(url, **kwargs)
+
+        entry = self.cache.get(url)
+        if entry is not None and entry.confirmed and entry.is_fresh(cache_ttl):
+            self.metrics.count("cache_fresh")
+            return self._cached_response(url, entry)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None and entry.confirmed:
+            if entry.etag: headers["If-None-Match"] = entry.etag
+            if entry.last_modified: headers["If-Modified-Since"] = entry.last_modified
+        response = self._send(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(url)
+            self.metrics.count("cache_not_modified")
+            return self._cached_response(url, entry)
+
+        if response.status_code == 200:
+            if entry is not None and entry.confirmed and hashlib.sha1(response.content).hexdigest() == entry.body_hash:
+                # No validators, but the feed came back byte-identical
+                self.cache.touch(url)
+                self.metrics.count("cache_unchanged")
+                response.not_modified = True
+            else:
+                self.cache.put(url, response)
+                self.metrics.count("cache_stored")
+        return response
+
+    def confirm(self, urls):
+        """ Marks cached feed bodies as fully processed (call after their items were saved). """
+        if self.cache is not None:
+            self.cache.confirm(urls)
+
+    def _cached_response(self, url, entry):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = self.cache.body(url)
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        response.not_modified = entry.confirmed
+        return response
+
+    def _send(self, url, **kwargs):
+        host = urlsplit(url).netloc.lower()
+        bucket = self.bucket(host)
+        # Wait for the token before taking a slot: sleeping on the bucket must not hold a connection slot
+        self.metrics.observe(f"rate_wait:{host}", bucket.acquire())
+        with self._host_slots(host):
+            response = self.session.get(url, **kwargs)
+        response.from_cache = False
+        response.not_modified = False
+
+        if response.status_code in THROTTLE_STATUSES:
+            bucket.on_throttle(retry_after_seconds(response))
+            self.metrics.count(f"throttled:{host}")
+            print(f"      🐢 [HTTP] {host} answered {response.status_code}, slowing to {bucket.rate:.2f} req/s.")
+        elif response.status_code < 400:
+            bucket.on_success()
+        if response.status_code == 200 and self.archive_enabled and self.archive is not None:
+            # Archived under the canonical URL: credentials (e.g. WeatherAPI's ?key=) never reach the index
+            archived_url = canonical_url(url)
+            try:
+                self.archive.append(archived_url, response)
+            except Exception as e:
+                print(f"      ⚠️ [HTTP] Could not archive {archived_url}: {e}")
+        return response
+
+    def stats(self):
+        """ Rate-limit waits/throttles plus the current rate per host. """
+        stats = self.metrics.stats()
+        with self._lock:
+            stats["rates"] = {host: round(bucket.rate, 3) for host, bucket in self._buckets.items()}
+        return stats
+
+    def flush_stats(self, logger, name="http"):
+        """ Saves stats() on the run log (PipelineLogger.record_metrics), then resets the counters. """
+        logger.record_metrics(name, self.stats())
+        self.metrics.reset()
+
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+def get_http_client():
+    """ Process-wide HttpClient (created on first use). """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = HttpClient()
+        return _CLIENT
+
+
+def http_get(url, **kwargs):
+    return get_http_client().get(url, **kwargs)
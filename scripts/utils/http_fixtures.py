@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import base64
+import random
+import hashlib
+import threading
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Default on-disk location: <project root>/.cache/fixtures/<host>/<sha1>.json
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURE_DIR = os.path.join(BASE_DIR, '../../.cache/fixtures')
+
+# Query parameters that carry credentials: left out of fixture keys and never written to disk
+SECRET_PARAMS = {"key", "api_key", "apikey", "token", "access_token", "client_secret"}
+
+# Response headers worth keeping with a fixture
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def fixture_mode():
+    """ "record", "replay" or None, from AGRI_HTTP_FIXTURES. """
+    mode = os.getenv("AGRI_HTTP_FIXTURES", "").strip().lower()
+    return mode if mode in ("record", "replay") else None
+
+
+def run_seed():
+    """
+    Seed for the pipelines' random sampling (AGRI_RANDOM_SEED), so a replay asks for
+    the same URLs the recording did. Defaults to 0 while fixtures are on, else None.
+    """
+    seed = os.getenv("AGRI_RANDOM_SEED")
+    if seed is not None:
+        return seed
+    return "0" if fixture_mode() else None
+
+
+def _parse_latency(value):
+    """ "50" -> (50, 50); "20-80" -> (20, 80), in milliseconds. """
+    low, _, high = (value or "0").partition("-")
+    low = float(low or 0)
+    return low, float(high) if high else low
+
+
+def canonical_url(url):
+    """ URL without credential parameters and with sorted query, used as the fixture key. """
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS)
+    return parts._replace(query=urlencode(query), fragment="").geturl()
+
+
+class FixtureStore:
+    """ One JSON file per canonical URL (or named call) under the fixture directory. """
+
+    def __init__(self, path=None):
+        self.path = os.path.abspath(path or os.getenv("AGRI_FIXTURE_DIR") or DEFAULT_FIXTURE_DIR)
+
+    def _file(self, key):
+        host = urlsplit(key).netloc or key.split(":", 1)[0]
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, host.replace(":", "_") or "_", f"{digest}.json")
+
+    def load(self, key):
+        try:
+            with open(self._file(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, key, fixture):
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(fixture, key=key), f)
+        os.replace(tmp_path, path)
+
+
+class FixtureTransport:
+    """
+    Record/replay layer for HTTP (and other remote) calls, selected by AGRI_HTTP_FIXTURES:
+    "record" passes calls through and saves every response as a fixture; "replay" answers
+    from the fixtures only (a URL that was never recorded gets a 404), so the pipelines
+    run on an offline box with repeatable inputs.
+    Replay can simulate the network: AGRI_FIXTURE_LATENCY_MS ("50" or a "20-80" range) per
+    response and AGRI_FIXTURE_ERROR_RATE of responses failing with AGRI_FIXTURE_ERROR_STATUS
+    (default 503; 0 raises a connection error instead), drawn from a generator seeded by run_seed().
+    """
+
+    def __init__(self, mode=None, store=None):
+        self.mode = mode or fixture_mode()
+        self.store = store or FixtureStore()
+        self.latency_ms = _parse_latency(os.getenv("AGRI_FIXTURE_LATENCY_MS"))
+        self.error_rate = float(os.getenv("AGRI_FIXTURE_ERROR_RATE", "0"))
+        self.error_status = int(os.getenv("AGRI_FIXTURE_ERROR_STATUS", "503"))
+        self.counters = {"recorded": 0, "served": 0, "missing": 0, "injected_errors": 0}
+        self._random = random.Random(run_seed())
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _simulate(self):
+        """ Sleeps the injected latency; returns True when this response should fail. """
+        with self._lock:
+            low, high = self.latency_ms
+            delay = self._random.uniform(low, high) / 1000.0
+            fail = self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            self._count("injected_errors")
+        return fail
+
+    def record_response(self, url, response):
+        body = response.content or b""
+        self.store.save(canonical_url(url), {
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            "body": base64.b64encode(body).decode("ascii"),
+        })
+        self._count("recorded")
+
+    def replay_response(self, request):
+        """ A requests.Response for a prepared request, built from its fixture. """
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        if self._simulate():
+            if self.error_status == 0:
+                raise requests.ConnectionError(f"injected connection error for {request.url}", request=request)
+            response.status_code = self.error_status
+            response._content = b""
+            return response
+
+        fixture = self.store.load(canonical_url(request.url))
+        if fixture is None:
+            self._count("missing")
+            response.status_code = 404
+            response._content = b""
+            response.headers = CaseInsensitiveDict({"X-Fixture": "missing"})
+            return response
+        self._count("served")
+        response.status_code = fixture["status"]
+        response._content = base64.b64decode(fixture["body"])
+        response.headers = CaseInsensitiveDict(fixture["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        return response
+
+    def call(self, name, key, fetch, dumps, loads):
+        """
+        Recorded non-HTTP call (client libraries with their own HTTP stack, e.g. yfinance):
+        fetch() live, dumps(result) -> str for the fixture, loads(str) -> result on replay.
+        """
+        key = f"{name}:{key}"
+        if self.mode == "replay":
+            if self._simulate():
+                raise RuntimeError(f"injected error for {key}")
+            fixture = self.store.load(key)
+            if fixture is None:
+                self._count("missing")
+                raise LookupError(f"no fixture recorded for {key}")
+            self._count("served")
+            return loads(fixture["body"])
+        result = fetch()
+        if self.mode == "record":
+            self.store.save(key, {"body": dumps(result)})
+            self._count("recorded")
+        return result
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, mode=self.mode)
+
+
+class FixtureAdapter(HTTPAdapter):
+    """ requests transport adapter that records or replays through a FixtureTransport. """
+
+    def __init__(self, transport, **kwargs):
+        self.transport = transport
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.transport.mode == "replay":
+            return self.transport.replay_response(request)
+        response = super().send(request, **kwargs)
+        if self.transport.mode == "record" and response.status_code == 200:
+            self.transport.record_response(request.url, response)
+        return response
+
+
+_TRANSPORT = None
+_TRANSPORT_LOCK = threading.Lock()
+
+def get_fixture_transport():
+    """ Process-wide FixtureTransport (mode from AGRI_HTTP_FIXTURES, possibly None = pass-through). """
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        if _TRANSPORT is None:
+            _TRANSPORT = FixtureTransport()
+        return _TRANSPORT
+
+
+def mount_fixtures(session, **adapter_kwargs):
+    """ Routes a session through the fixture transport when AGRI_HTTP_FIXTURES is set; returns the adapter mounted. """
+    transport = get_fixture_transport()
+    adapter = FixtureAdapter(transport, **adapter_kwargs) if transport.mode else HTTPAdapter(**adapter_kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return adapter
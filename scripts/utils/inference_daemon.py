@@ -0,0 +1,342 @@
+import os
+import sys
+import json
+import time
+import queue
+import signal
+import socket
+import argparse
+import itertools
+import threading
+import socketserver
+
+# Default endpoint: <project root>/.cache/agri_inference.sock (override with AGRI_INFERENCE_SOCKET)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOCKET_PATH = os.path.join(BASE_DIR, '../../.cache/agri_inference.sock')
+
+
+def parse_address(address):
+    """ "host:port" -> TCP (localhost HTTP-style setups, Windows), anything else -> Unix socket path. """
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    return socket.AF_UNIX, os.path.abspath(address)
+
+
+class MicroBatcher:
+    """
+    Merges requests from concurrent clients into one model call.
+    The worker thread takes the first waiting request, then keeps collecting for up to
+    max_wait seconds (or until max_batch items) before calling fn(items) once.
+    """
+
+    def __init__(self, fn, max_batch=256, max_wait=0.005):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.calls = 0
+        self.items = 0
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, items):
+        """ Blocks until fn() has processed items; returns their results in order. """
+        if not items:
+            return []
+        job = {"items": items, "done": threading.Event(), "results": None, "error": None}
+        self.requests.put(job)
+        job["done"].wait()
+        if job["error"] is not None:
+            raise job["error"]
+        return job["results"]
+
+    def _loop(self):
+        while True:
+            jobs = [self.requests.get()]
+            size = len(jobs[0]["items"])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                size += len(job["items"])
+
+            merged = [item for job in jobs for item in job["items"]]
+            try:
+                results = self.fn(merged)
+                self.calls += 1
+                self.items += len(merged)
+                offset = 0
+                for job in jobs:
+                    job["results"] = results[offset:offset + len(job["items"])]
+                    offset += len(job["items"])
+            except Exception as e:
+                for job in jobs:
+                    job["error"] = e
+            for job in jobs:
+                job["done"].set()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """ Newline-delimited JSON: {"id", "method", "params"} in, {"id", "result"} or {"id", "error"} out. """
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get("id")
+                result = self.server.inference_daemon.dispatch(request["method"], request.get("params") or {})
+                response = {"id": request_id, "result": result}
+            except Exception as e:
+                response = {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class InferenceDaemon:
+    """
+    Long-lived local inference server. Keeps the sentiment model (and, on first use,
+    the DistilBART-MNLI relevance gate) warm and serves analyze / analyze_batch /
+    relevance_scores to any number of local clients, batching across them, plus the
+    analysis version of its rules + model (so clients can key cached results on it).
+    """
+
+    def __init__(self, address=DEFAULT_SOCKET_PATH, client=None, max_batch=256, max_wait_ms=5):
+        if client is None:
+            try:
+                from utils.ai_client import create_ai_client
+            except ImportError:
+                try:
+                    from .ai_client import create_ai_client
+                except ImportError:
+                    from ai_client import create_ai_client
+            # AGRI_INFERENCE_WORKERS still applies: the daemon can front a worker pool
+            client = create_ai_client(allow_daemon=False)
+
+        self.address = address
+        self.client = client
+        self.started_at = time.time()
+        self._gate = None
+        self._gate_lock = threading.Lock()
+
+        self.analyzer = MicroBatcher(self.client.analyze_batch, max_batch, max_wait_ms / 1000.0)
+        self.scorer = MicroBatcher(lambda texts: self.gate.get_semantic_scores(texts), max_batch, max_wait_ms / 1000.0)
+        self.server = None
+
+    @property
+    def gate(self):
+        with self._gate_lock:
+            if self._gate is None:
+                try:
+                    from advanced_analytics.relevance_gate import RelevanceGate
+                except ImportError:
+                    sys.path.append(os.path.join(BASE_DIR, '..'))
+                    from advanced_analytics.relevance_gate import RelevanceGate
+                self._gate = RelevanceGate()
+            return self._gate
+
+    def dispatch(self, method, params):
+        if method == "ping":
+            return {"pid": os.getpid(), "uptime": round(time.time() - self.started_at, 1)}
+        if method == "analyze":
+            return self.analyzer.submit([params["text"]])[0]
+        if method == "analyze_batch":
+            return self.analyzer.submit(list(params["texts"]))
+        if method == "relevance_scores":
+            return self.scorer.submit(list(params["texts"]))
+        if method == "version":
+            return self.client.analysis_version()
+        if method == "stats":
+            stats = self.client.stats()
+            stats["daemon"] = {
+                "analyze_calls": self.analyzer.calls,
+                "analyze_items": self.analyzer.items,
+                "relevance_calls": self.scorer.calls,
+                "relevance_items": self.scorer.items,
+            }
+            return stats
+        raise ValueError(f"Unknown method '{method}'")
+
+    def serve_forever(self):
+        family, addr = parse_address(self.address)
+        if family == socket.AF_UNIX:
+            os.makedirs(os.path.dirname(addr), exist_ok=True)
+            if os.path.exists(addr):
+                os.remove(addr) # stale socket from a previous run
+            self.server = _UnixServer(addr, _RequestHandler)
+        else:
+            self.server = _TCPServer(addr, _RequestHandler)
+        self.server.inference_daemon = self
+
+        def stop(signum, frame):
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        print(f"🛰️ [Daemon] Serving AgriAI inference on {self.address} (pid {os.getpid()})")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if family == socket.AF_UNIX and os.path.exists(addr):
+                os.remove(addr)
+            if hasattr(self.client, "close"):
+                self.client.close()
+            print("🛑 [Daemon] Stopped.")
+
+
+class AgriAIDaemonClient:
+    """
+    Thin client standing in for AgriAIClient: same analyze / analyze_batch interface,
+    but the models live in the daemon. One connection per thread; reconnects once if
+    the daemon was restarted.
+    """
+
+    cache = None # caching and stage metrics live inside the daemon (see stats())
+    metrics = None
+
+    def __init__(self, address=DEFAULT_SOCKET_PATH, timeout=300):
+        self.address = address
+        self.timeout = timeout
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+
+    def _connect(self):
+        family, addr = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(addr)
+        self._local.sock = sock
+        self._local.reader = sock.makefile("rb")
+        return sock
+
+    def _call(self, method, **params):
+        payload = (json.dumps({"id": next(self._ids), "method": method, "params": params}) + "\n").encode("utf-8")
+
+        for attempt in range(2):
+            try:
+                sock = getattr(self._local, "sock", None) or self._connect()
+                sock.sendall(payload)
+                line = self._local.reader.readline()
+                if not line:
+                    raise ConnectionError("Inference daemon closed the connection")
+                break
+            except socket.timeout:
+                # The request may still be running in the daemon: never resend it
+                self.close()
+                raise
+            except OSError:
+                self.close()
+                if attempt:
+                    raise
+
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(f"Inference daemon error: {response['error']}")
+        return response["result"]
+
+    def ping(self):
+        return self._call("ping")
+
+    def analyze(self, text):
+        return self._call("analyze", text=text)
+
+    def analyze_batch(self, texts, batch_size=32):
+        return self._call("analyze_batch", texts=list(texts))
+
+    def analysis_version(self):
+        """ The daemon's AgriAIClient.analysis_version(): rules + model that produce its results. """
+        return self._call("version")
+
+    def relevance_scores(self, texts):
+        """ DistilBART-MNLI agriculture scores (RelevanceGate.get_semantic_score semantics). """
+        return self._call("relevance_scores", texts=list(texts))
+
+    def stats(self):
+        """ The daemon's AgriAIClient stats (shared by every client) plus its batching counters. """
+        return self._call("stats")
+
+    def flush_stats(self, logger, name="ai_client"):
+        logger.record_metrics(name, self.stats())
+
+    def close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                self._local.reader.close()
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+        self._local.reader = None
+
+
+def connect_daemon(address=None):
+    """
+    Returns an AgriAIDaemonClient if a daemon answers on AGRI_INFERENCE_SOCKET
+    (or the default socket), otherwise None.
+    """
+    address = address or os.getenv("AGRI_INFERENCE_SOCKET")
+    if not address:
+        if not os.path.exists(DEFAULT_SOCKET_PATH):
+            return None
+        address = DEFAULT_SOCKET_PATH
+
+    client = AgriAIDaemonClient(address)
+    try:
+        info = client.ping()
+    except Exception as e:
+        print(f"   ⚠️ [Daemon] No inference daemon on {address} ({e}). Loading models in-process.")
+        return None
+    print(f"   🛰️ [Daemon] Using inference daemon on {address} (pid {info['pid']}).")
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local AgriAI inference daemon")
+    subparsers = parser.add_subparsers(dest='command')
+
+    serve = subparsers.add_parser('serve', help='Load the models and serve requests')
+    serve.add_argument('--socket', default=os.getenv("AGRI_INFERENCE_SOCKET", DEFAULT_SOCKET_PATH),
+                       help='Unix socket path or host:port')
+    serve.add_argument('--max-batch', type=int, default=256, help='Max texts merged into one model call')
+    serve.add_argument('--max-wait-ms', type=float, default=5, help='How long to wait for other clients')
+
+    ping = subparsers.add_parser('ping', help='Check that a daemon is running')
+    ping.add_argument('--socket', default=os.getenv("AGRI_INFERENCE_SOCKET", DEFAULT_SOCKET_PATH))
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        InferenceDaemon(args.socket, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms).serve_forever()
+    elif args.command == 'ping':
+        try:
+            client = AgriAIDaemonClient(args.socket, timeout=5)
+            print(f"✅ Daemon alive: {client.ping()} | {client.stats()}")
+        except Exception as e:
+            print(f"❌ No daemon on {args.socket} ({e})")
+            sys.exit(1)
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import os
+import math
+import signal
+import atexit
+import threading
+import multiprocessing
+
+try:
+    from utils.ai_client import AgriAIClient
+    from utils.runtime_profile import get_runtime_profile
+except ImportError:
+    try:
+        from .ai_client import AgriAIClient
+        from .runtime_profile import get_runtime_profile
+    except ImportError:
+        from ai_client import AgriAIClient
+        from runtime_profile import get_runtime_profile
+
+# The worker process's own client (built by _init_worker)
+_WORKER_CLIENT = None
+
+
+def _init_worker(threads, backend, metrics):
+    global _WORKER_CLIENT
+    # One BLAS/OpenMP thread per worker by default: the pool itself provides the parallelism
+    try:
+        get_runtime_profile().apply_threads(threads)
+    except ImportError:
+        pass
+    # Ctrl-C is handled by the parent, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Cache lookups stay in the parent; the worker only runs rules + model on misses
+    _WORKER_CLIENT = AgriAIClient(use_cache=False, backend=backend, metrics=metrics)
+    # Load (and warm up) the model now rather than inside the first chunk
+    _WORKER_CLIENT.sentiment_pipe
+
+
+def _analyze_chunk(args):
+    texts, batch_size = args
+    computed = _WORKER_CLIENT._analyze_uncached(texts, batch_size)
+    # Stage timings happen here, in the worker: ship them back with the results
+    metrics = _WORKER_CLIENT.metrics.drain() if _WORKER_CLIENT.metrics is not None else None
+    return computed, metrics, _WORKER_CLIENT.backend
+
+
+class AgriInferencePool:
+    """
+    Multi-process stand-in for AgriAIClient (same analyze / analyze_batch interface).
+    Cache lookups stay in the parent's client; only cache misses are split into chunks and
+    sent to N worker processes, each with its own copy of the model.
+    Workers come from a fork server (spawn where there is none), never from a fork of the
+    parent, which already runs MongoClient monitor and fetch threads whose locks a fork
+    would copy mid-use. The fork server is a fresh single-threaded process that imported
+    this module; workers, and replacements the pool starts later, are forked from it.
+    Like any spawn/forkserver pool, workers re-import the entry script (whose work stays
+    under `if __name__ == "__main__"`).
+    Pipelines start() the workers before creating their thread pools (nothing is loaded
+    or started on import); otherwise they start on first use. Results always come back
+    in input order.
+    """
+
+    def __init__(self, workers=None, client=None, threads_per_worker=1, chunk_size=64):
+        self.client = client or AgriAIClient()
+        self.workers = workers or os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker
+        self.chunk_size = chunk_size
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # rules, cache, backend, embed(), ... come from the wrapped client
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def start(self):
+        """ Starts the worker processes; each loads the model with the parent client's backend. """
+        with self._lock:
+            if self._pool is not None or self.workers == 0:
+                return self._pool
+
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                ctx = multiprocessing.get_context("forkserver")
+                ctx.set_forkserver_preload([__name__])
+            else:
+                ctx = multiprocessing.get_context("spawn")
+            try:
+                self._pool = ctx.Pool(self.workers, initializer=_init_worker, initargs=(
+                    self.threads_per_worker, self.client.backend, self.client.metrics is not None
+                ))
+            except (OSError, ValueError) as e:
+                print(f"   ⚠️ [Pool] Could not start inference workers ({e}). Running in-process.")
+                self.workers = 0
+                return None
+            atexit.register(self.close)
+            print(f"   🧵 [Pool] Started {self.workers} inference workers ({ctx.get_start_method()}, pid {os.getpid()}).")
+            return self._pool
+
+    def analyze(self, text):
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts, batch_size=32):
+        return self.client.run_cached(texts, lambda misses: self._compute(misses, batch_size))
+
+    def _compute(self, texts, batch_size):
+        pool = self._pool or self.start()
+        if pool is None:
+            return self.client._analyze_uncached(texts, batch_size)
+
+        # Enough chunks to keep every worker busy, none larger than chunk_size
+        size = max(1, min(self.chunk_size, math.ceil(len(texts) / self.workers)))
+        chunks = [(texts[i:i + size], batch_size) for i in range(0, len(texts), size)]
+
+        computed = []
+        for part, metrics, backend in pool.imap(_analyze_chunk, chunks):
+            if backend != self.client.backend:
+                # The worker fell back to another backend: its results don't belong under this cache version
+                part = [(result, False) for result, _ in part]
+            computed.extend(part)
+            if metrics is not None:
+                self.client.metrics.merge(metrics)
+        return computed
+
+    def close(self):
+        """ Lets in-flight chunks finish, then stops the workers. """
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+
+    def terminate(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool.join()
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
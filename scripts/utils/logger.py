@@ -23,6 +23,7 @@ class PipelineLogger:
         self.steps = []
         self.start_time = None
         self.job_name = "Unknown"
+        self.extra_metrics = {}
 
     def start_run(self, job_name):
         self.job_name = job_name
@@ -56,6 +57,14 @@ class PipelineLogger:
         )
         print(f"   👉 [{status}] {step_name}")
 
+    def record_metrics(self, name, data):
+        """ Attaches a metrics section (e.g. AgriAIClient.stats()) to this run as metrics.<name>. """
+        self.extra_metrics[name] = data
+        self.collection.update_one(
+            {"run_id": self.run_id},
+            {"$set": {f"metrics.{name}": data, "last_updated": datetime.datetime.now()}}
+        )
+
     def finish_run(self, status="SUCCESS", metrics=None):
         end_time = datetime.datetime.now()
         duration = (end_time - self.start_time).total_seconds()
@@ -65,8 +74,9 @@ class PipelineLogger:
             "end_time": end_time,
             "duration_seconds": duration,
         }
-        if metrics:
-            update_doc["metrics"] = metrics
+        if metrics or self.extra_metrics:
+            # Keep sections written by record_metrics()
+            update_doc["metrics"] = {**self.extra_metrics, **(metrics or {})}
 
         self.collection.update_one(
             {"run_id": self.run_id},
@@ -0,0 +1,87 @@
+import math
+import threading
+from collections import deque
+
+
+def percentile(sorted_values, q):
+    """ Nearest-rank percentile of an already sorted list (q in 0-100). """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class StageMetrics:
+    """
+    Per-stage latency samples and counters (e.g. for AgriAIClient).
+    Keeps the last max_samples timings per stage for p50/p95/p99 plus exact totals.
+    Callers hold `metrics = None` when instrumentation is off, so the disabled path is one `is None` check.
+    """
+
+    def __init__(self, max_samples=10000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.samples = {} # stage -> deque of seconds
+            self.totals = {} # stage -> [count, seconds]
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            samples = self.samples.get(stage)
+            if samples is None:
+                samples = self.samples[stage] = deque(maxlen=self.max_samples)
+                self.totals[stage] = [0, 0.0]
+            samples.append(seconds)
+            totals = self.totals[stage]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def drain(self):
+        """ Returns the raw state and resets it (used to ship worker-process metrics to the parent). """
+        with self._lock:
+            raw = {
+                "counters": self.counters,
+                "samples": {stage: list(values) for stage, values in self.samples.items()},
+                "totals": self.totals,
+            }
+            self.counters, self.samples, self.totals = {}, {}, {}
+        return raw
+
+    def merge(self, raw):
+        """ Adds a drain() result from another process. """
+        with self._lock:
+            for name, n in raw["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + n
+            for stage, values in raw["samples"].items():
+                if stage not in self.samples:
+                    self.samples[stage] = deque(maxlen=self.max_samples)
+                    self.totals[stage] = [0, 0.0]
+                self.samples[stage].extend(values)
+                count, seconds = raw["totals"][stage]
+                self.totals[stage][0] += count
+                self.totals[stage][1] += seconds
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            stages = {}
+            for stage, values in self.samples.items():
+                ordered = sorted(values)
+                count, seconds = self.totals[stage]
+                stages[stage] = {
+                    "count": count,
+                    "total_ms": round(seconds * 1000, 3),
+                    "mean_ms": round(seconds * 1000 / count, 4) if count else 0.0,
+                    "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+                    "p95_ms": round(percentile(ordered, 95) * 1000, 4),
+                    "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+                }
+        return {"counters": counters, "stages": stages}
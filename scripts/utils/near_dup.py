@@ -0,0 +1,99 @@
+import os
+import re
+import hashlib
+import threading
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# "Headline - Publisher" / "Headline | Publisher": syndicated copies differ only in this tail
+PUBLISHER_SUFFIX_RE = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,60}$")
+
+FINGERPRINT_BITS = 64
+
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def tokenize(text):
+    """ Lowercased word tokens of `text`, without a trailing publisher name. """
+    text = PUBLISHER_SUFFIX_RE.sub("", (text or "").strip())
+    return WORD_RE.findall(text.lower())
+
+
+def simhash(tokens):
+    """ 64-bit SimHash over word unigrams and bigrams (bigrams count double). """
+    weights = [0] * FINGERPRINT_BITS
+    features = [(t, 1) for t in tokens] + [(f"{a} {b}", 2) for a, b in zip(tokens, tokens[1:])]
+    for feature, weight in features:
+        h = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += weight if h >> bit & 1 else -weight
+    fingerprint = 0
+    for bit, w in enumerate(weights):
+        if w > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class NearDupIndex:
+    """
+    In-run near-duplicate detector for fetched texts (64-bit SimHash).
+    Fingerprints within max_distance bits of each other are one cluster. The index
+    splits each fingerprint into max_distance + 1 bands; two fingerprints that close
+    must agree exactly on at least one band, so only band-mates are compared.
+    The first text of a cluster is its representative; its analysis is kept here so
+    later copies can reuse it instead of going through the model.
+    Texts shorter than min_tokens words are never clustered.
+    """
+
+    def __init__(self, max_distance=None, min_tokens=None):
+        self.max_distance = max_distance if max_distance is not None else int(os.getenv("AGRI_NEAR_DUP_DISTANCE", "3"))
+        self.min_tokens = min_tokens or int(os.getenv("AGRI_NEAR_DUP_MIN_TOKENS", "5"))
+        self.num_bands = self.max_distance + 1
+        self.band_bits = -(-FINGERPRINT_BITS // self.num_bands)
+        self.bands = [{} for _ in range(self.num_bands)] # band value -> [(fingerprint, cluster id)]
+        self.analyses = {} # cluster id -> representative's analysis
+        self.counters = {"checks": 0, "clusters": 0, "duplicates": 0}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (i * self.band_bits)) & mask for i in range(self.num_bands)]
+
+    def assign(self, key, text):
+        """
+        Returns the cluster id for `text`: the key of an earlier near-duplicate's
+        representative, or `key` itself when the text starts a new cluster (or is too short).
+        """
+        tokens = tokenize(text)
+        if len(tokens) < self.min_tokens:
+            return key
+        fingerprint = simhash(tokens)
+        band_keys = self._band_keys(fingerprint)
+        with self._lock:
+            self.counters["checks"] += 1
+            for band, value in zip(self.bands, band_keys):
+                for other, cluster_id in band.get(value, ()):
+                    if bin(fingerprint ^ other).count("1") <= self.max_distance:
+                        self.counters["duplicates"] += 1
+                        return cluster_id
+            for band, value in zip(self.bands, band_keys):
+                band.setdefault(value, []).append((fingerprint, key))
+            self.counters["clusters"] += 1
+            return key
+
+    def set_analysis(self, cluster_id, analysis):
+        with self._lock:
+            self.analyses[cluster_id] = analysis
+
+    def analysis(self, cluster_id):
+        """ The representative's analysis, or None while it is pending (or failed). """
+        with self._lock:
+            return self.analyses.get(cluster_id)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats["dup_rate"] = round(stats["duplicates"] / stats["checks"], 4) if stats["checks"] else 0.0
+        return stats
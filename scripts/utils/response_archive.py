@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from urllib.parse import urlsplit
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Default on-disk location: <project root>/.cache/archive/
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ARCHIVE_DIR = os.path.join(BASE_DIR, '../../.cache/archive')
+
+# Response headers worth keeping with an archived body
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class ArchivedResponse:
+    __slots__ = ("url", "status", "headers", "fetched_at", "body")
+
+    def __init__(self, url, status, headers, fetched_at, body):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.fetched_at = fetched_at
+        self.body = body
+
+
+class ResponseArchive:
+    """
+    Append-only archive of raw fetched response bodies, so analysis changes can be
+    re-run over past fetches without re-crawling.
+    Bodies are compressed one by one (zstd when `zstandard` is installed, zlib otherwise)
+    and appended to segment files that roll over at segment_mb; a SQLite index maps
+    source (host) / URL / fetch time to (segment, offset, length).
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_DIR, segment_mb=None, level=None):
+        self.path = os.path.abspath(path)
+        self.segment_bytes = int(float(segment_mb or os.getenv("AGRI_ARCHIVE_SEGMENT_MB", "64")) * 1024 * 1024)
+        self.codec = "zstd" if zstandard is not None else "zlib"
+        self.level = level or (3 if self.codec == "zstd" else 6)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._segment = None
+        self._segment_file = None
+        self._connect()
+
+    def _connect(self):
+        os.makedirs(os.path.join(self.path, "segments"), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(self.path, "index.sqlite3"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " id INTEGER PRIMARY KEY, source TEXT NOT NULL, url TEXT NOT NULL, fetched_at REAL NOT NULL,"
+            " status INTEGER NOT NULL, headers TEXT NOT NULL, codec TEXT NOT NULL,"
+            " segment INTEGER NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_url ON responses (url, fetched_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_source ON responses (source, fetched_at)")
+        self._pid = os.getpid()
+        self._segment_file = None
+
+    def _db(self):
+        # SQLite connections and open segments must not be shared across fork(): reopen in child processes
+        if self._pid != os.getpid():
+            self._connect()
+        return self._conn
+
+    def _segment_path(self, segment):
+        return os.path.join(self.path, "segments", f"{segment:06d}.seg")
+
+    def _open_segment(self, incoming):
+        """ The segment to append to; rolls over when the current one would pass segment_bytes. """
+        if self._segment is None:
+            row = self._db().execute("SELECT MAX(segment) FROM responses").fetchone()
+            self._segment = row[0] or 1
+        if self._segment_file is None:
+            self._segment_file = open(self._segment_path(self._segment), "ab")
+        if self._segment_file.tell() and self._segment_file.tell() + incoming > self.segment_bytes:
+            self._segment_file.close()
+            self._segment += 1
+            self._segment_file = open(self._segment_path(self._segment), "ab")
+        return self._segment_file
+
+    def _compress(self, body):
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=self.level).compress(body)
+        return zlib.compress(body, self.level)
+
+    @staticmethod
+    def _decompress(codec, data):
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("archive entry is zstd-compressed but zstandard is not installed")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def append(self, url, response):
+        """ Archives a fetched response body. """
+        body = response.content or b""
+        data = self._compress(body)
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        with self._lock:
+            conn = self._db()
+            f = self._open_segment(len(data))
+            offset = f.tell()
+            f.write(data)
+            f.flush()
+            with conn:
+                conn.execute(
+                    "INSERT INTO responses (source, url, fetched_at, status, headers, codec, segment, offset, length, size)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (urlsplit(url).netloc.lower(), url, time.time(), response.status_code, json.dumps(headers),
+                     self.codec, self._segment, offset, len(data), len(body))
+                )
+
+    def iter_responses(self, source=None, since=None, until=None, newest_first=False):
+        """ Archived responses in fetch order (or newest first), optionally for one source (host) and time range. """
+        query = "SELECT url, status, headers, fetched_at, codec, segment, offset, length FROM responses WHERE fetched_at >= ? AND fetched_at <= ?"
+        params = [since or 0, until if until is not None else float("inf")]
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        with self._lock:
+            rows = self._db().execute(query + (" ORDER BY fetched_at DESC" if newest_first else " ORDER BY fetched_at"), params).fetchall()
+        for url, status, headers, fetched_at, codec, segment, offset, length in rows:
+            yield ArchivedResponse(url, status, json.loads(headers), fetched_at, self._read(codec, segment, offset, length))
+
+    def _read(self, codec, segment, offset, length):
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(offset)
+            return self._decompress(codec, f.read(length))
+
+    def stats(self):
+        with self._lock:
+            count, size, stored = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(length), 0) FROM responses"
+            ).fetchone()
+        return {
+            "responses": count, "raw_bytes": size, "stored_bytes": stored, "codec": self.codec,
+            "ratio": round(size / stored, 2) if stored else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._segment_file is not None:
+                self._segment_file.close()
+                self._segment_file = None
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
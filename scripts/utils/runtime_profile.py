@@ -0,0 +1,157 @@
+import os
+import time
+
+# Texts of a few different lengths, so warmup touches several padded shapes
+WARMUP_TEXTS = [
+    "Wheat prices rise.",
+    "Monsoon rains arrive early in Kerala, farmers begin sowing paddy across the state.",
+    " ".join(["Farmers in Punjab report a bumper wheat harvest while fertilizer costs keep rising."] * 8),
+]
+
+
+class RuntimeProfile:
+    """
+    One place for per-process inference settings, read from the environment:
+
+    AGRI_DEVICE                 auto (default) | cpu | cuda | cuda:N
+    AGRI_TORCH_THREADS          intra-op threads for this process (default: torch's choice)
+    AGRI_TORCH_INTEROP_THREADS  inter-op threads (default: torch's choice)
+    AGRI_INFERENCE_MODE         1 (default) runs forward passes under torch.inference_mode(), 0 uses no_grad()
+    AGRI_BF16                   0 (default) | 1 | auto (only on CPUs with native bf16 support)
+    AGRI_WARMUP_BATCHES         warmup passes run right after a model loads (default 1, 0 disables)
+
+    Torch is only imported when a model is actually being loaded.
+    """
+
+    def __init__(self, env=None):
+        env = os.environ if env is None else env
+        self.device_setting = env.get("AGRI_DEVICE", "auto").strip().lower()
+        self.intra_op_threads = _int_or_none(env.get("AGRI_TORCH_THREADS"))
+        self.inter_op_threads = _int_or_none(env.get("AGRI_TORCH_INTEROP_THREADS"))
+        self.use_inference_mode = env.get("AGRI_INFERENCE_MODE", "1") != "0"
+        self.bf16_setting = env.get("AGRI_BF16", "0").strip().lower()
+        self.warmup_batches = int(env.get("AGRI_WARMUP_BATCHES", "1"))
+        self._device = None
+        self._bf16 = None
+        self._threads_applied = False
+
+    @property
+    def device(self):
+        """ Resolved torch device string ("cpu", "cuda:0", ...). """
+        if self._device is None:
+            if self.device_setting == "auto":
+                try:
+                    import torch
+                    self._device = "cuda:0" if torch.cuda.is_available() else "cpu"
+                except ImportError:
+                    self._device = "cpu"
+            elif self.device_setting == "cuda":
+                self._device = "cuda:0"
+            else:
+                self._device = self.device_setting
+        return self._device
+
+    @property
+    def pipeline_device(self):
+        """ Device argument for transformers.pipeline(): -1 for CPU, the GPU index otherwise. """
+        if self.device.startswith("cuda"):
+            return int(self.device.split(":")[1]) if ":" in self.device else 0
+        return -1
+
+    @property
+    def device_name(self):
+        return "GPU (CUDA)" if self.device.startswith("cuda") else "CPU"
+
+    @property
+    def bf16(self):
+        """ Whether CPU models run in bfloat16 (never on GPU, where fp32 is kept as before). """
+        if self._bf16 is None:
+            if self.bf16_setting in ("0", "", "false") or self.device != "cpu":
+                self._bf16 = False
+            elif self.bf16_setting == "auto":
+                self._bf16 = cpu_supports_bf16()
+            else:
+                self._bf16 = True
+        return self._bf16
+
+    @property
+    def precision(self):
+        return "bf16" if self.bf16 else "fp32"
+
+    def apply_threads(self, intra_op_threads=None):
+        """ Sets torch intra/inter-op thread counts for this process (inter-op can only be set once). """
+        import torch
+
+        intra = intra_op_threads or self.intra_op_threads
+        if intra:
+            torch.set_num_threads(intra)
+        if self.inter_op_threads and not self._threads_applied:
+            try:
+                torch.set_num_interop_threads(self.inter_op_threads)
+            except RuntimeError:
+                pass # already set, or parallel work has started
+        self._threads_applied = True
+
+    def prepare_model(self, model):
+        """ Moves a freshly loaded model to the profile's device / precision, in eval mode. """
+        import torch
+
+        self.apply_threads()
+        model = model.to(self.device)
+        if self.bf16:
+            model = model.to(torch.bfloat16)
+        model.eval()
+        return model
+
+    def inference_context(self):
+        """ Context manager for forward passes. """
+        import torch
+
+        return torch.inference_mode() if self.use_inference_mode else torch.no_grad()
+
+    def warmup(self, run, label="model"):
+        """ Calls run(WARMUP_TEXTS) warmup_batches times, so the first real batch doesn't pay for allocator/kernel setup. """
+        if self.warmup_batches <= 0:
+            return
+        t0 = time.perf_counter()
+        try:
+            with self.inference_context():
+                for _ in range(self.warmup_batches):
+                    run(list(WARMUP_TEXTS))
+        except Exception as e:
+            print(f"   ⚠️ [Runtime] Warmup of {label} failed ({e}).")
+            return
+        print(f"   🔥 [Runtime] Warmed up {label} in {round((time.perf_counter() - t0) * 1000)} ms ({self.device_name}, {self.precision}).")
+
+
+def cpu_supports_bf16():
+    """ True if the CPU has native bf16 instructions (AVX512-BF16 / AMX), else whatever oneDNN reports. """
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+        return "avx512_bf16" in flags or "amx_bf16" in flags
+    except OSError:
+        pass
+    try:
+        import torch
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:
+        return False
+
+
+def _int_or_none(value):
+    try:
+        return int(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+
+_PROFILE = None
+
+def get_runtime_profile():
+    """ Process-wide profile (built from the environment on first use). """
+    global _PROFILE
+    if _PROFILE is None:
+        _PROFILE = RuntimeProfile()
+    return _PROFILE
+
@@ -0,0 +1,171 @@
+import os
+import math
+import json
+import tempfile
+import struct
+import hashlib
+import threading
+
+# Default on-disk location: <project root>/.cache/seen_items.bloom
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SEEN_PATH = os.path.join(BASE_DIR, '../../.cache/seen_items.bloom')
+
+FILE_MAGIC = b"AGRIBLOOM1\n"
+
+
+class BloomFilter:
+    """ Fixed-size Bloom filter sized for `capacity` items at false-positive rate `error_rate`. """
+
+    def __init__(self, capacity, error_rate, bits=None, count=0):
+        self.capacity = int(capacity)
+        self.error_rate = float(error_rate)
+        self.num_bits = max(8, int(math.ceil(-self.capacity * math.log(self.error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, digest):
+        # Double hashing (Kirsch-Mitzenmacher): k positions from two 64-bit halves of one digest
+        h1, h2 = struct.unpack("<QQ", digest)
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def contains(self, digest):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+    def add(self, digest):
+        bits = self.bits
+        for p in self._positions(digest):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+
+class SeenSet:
+    """
+    Persistent "already processed" set for fetched items (accepted or rejected), so a
+    re-run skips downloading-then-analyzing the same posts again.
+    A scalable Bloom filter: when a stage fills up, a new one twice as large with a
+    tighter error rate is added, keeping the total false-positive rate under error_rate.
+    A false positive only means one new item is skipped; there are never false negatives.
+    Saved to .cache/seen_items.bloom; a different analysis version starts a fresh set.
+    """
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, path=DEFAULT_SEEN_PATH, error_rate=None, capacity=None, version=None):
+        self.path = os.path.abspath(path) if path else None
+        self.error_rate = error_rate or float(os.getenv("AGRI_SEEN_FP_RATE", "0.001"))
+        self.initial_capacity = capacity or int(os.getenv("AGRI_SEEN_CAPACITY", "100000"))
+        self.version = version
+        self.filters = []
+        self.counters = {"checks": 0, "hits": 0, "adds": 0}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if self.path:
+            self._load()
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+    def _new_stage(self):
+        n = len(self.filters)
+        stage = BloomFilter(
+            self.initial_capacity * (self.GROWTH ** n),
+            self.error_rate * (1 - self.TIGHTENING) * (self.TIGHTENING ** n),
+        )
+        self.filters.append(stage)
+        return stage
+
+    def __contains__(self, key):
+        digest = self._digest(key)
+        with self._lock:
+            self.counters["checks"] += 1
+            hit = any(stage.contains(digest) for stage in self.filters)
+            if hit:
+                self.counters["hits"] += 1
+            return hit
+
+    def add_many(self, keys):
+        with self._lock:
+            for key in keys:
+                digest = self._digest(key)
+                if any(stage.contains(digest) for stage in self.filters):
+                    continue
+                stage = self.filters[-1] if self.filters and not self.filters[-1].full else self._new_stage()
+                stage.add(digest)
+                self.counters["adds"] += 1
+                self._dirty = True
+
+    def add(self, key):
+        self.add_many([key])
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                if f.readline() != FILE_MAGIC:
+                    raise ValueError("not a seen-set file")
+                header = json.loads(f.readline())
+                if self.version is not None and header.get("version") != self.version:
+                    print("   ♻️ [Seen] Analysis version changed. Starting a fresh seen-set.")
+                    return
+                filters = []
+                for spec in header["stages"]:
+                    stage = BloomFilter(spec["capacity"], spec["error_rate"], count=spec["count"])
+                    data = f.read(len(stage.bits))
+                    if len(data) != len(stage.bits):
+                        raise ValueError(f"truncated file ({len(data)} of {len(stage.bits)} filter bytes)")
+                    stage.bits = bytearray(data)
+                    filters.append(stage)
+            self.filters = filters
+            self.error_rate = header.get("error_rate", self.error_rate)
+            self.initial_capacity = header.get("initial_capacity", self.initial_capacity)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"   ⚠️ [Seen] Could not load {self.path} ({e}). Starting empty.")
+            self.filters = []
+
+    def save(self):
+        """ Writes the filter to disk (atomically) if anything was added. """
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            header = {
+                "version": self.version,
+                "error_rate": self.error_rate,
+                "initial_capacity": self.initial_capacity,
+                "stages": [{"capacity": s.capacity, "error_rate": s.error_rate, "count": s.count} for s in self.filters],
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Unique temp file in the same directory, flushed to disk before it replaces the old one:
+            # a crash (or a concurrent save) never leaves a half-written seen-set behind
+            fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", dir=os.path.dirname(self.path))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(FILE_MAGIC)
+                    f.write(json.dumps(header).encode("utf-8") + b"\n")
+                    for stage in self.filters:
+                        f.write(stage.bits)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._dirty = False
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["items"] = sum(s.count for s in self.filters)
+            stats["stages"] = len(self.filters)
+            stats["size_bytes"] = sum(len(s.bits) for s in self.filters)
+        stats["hit_rate"] = round(stats["hits"] / stats["checks"], 4) if stats["checks"] else 0.0
+        return stats
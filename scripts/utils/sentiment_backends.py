@@ -0,0 +1,259 @@
+import os
+import sys
+import argparse
+import importlib.util
+
+# Default locations (relative to project root, same layout as models/sentiment-model)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ONNX_MODEL_DIR = os.path.join(BASE_DIR, '../../models/sentiment-model-onnx')
+ONNX_FP32_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Sequence length cap (RoBERTa position limit) and default padded-token budget per forward pass
+MAX_SEQ_TOKENS = 512
+MAX_BATCH_TOKENS = 8192
+# Texts are cut to this many characters per allowed token before tokenizing (guards against huge posts)
+MAX_CHARS_PER_TOKEN = 16
+
+
+def export_onnx(model_dir, output_dir=ONNX_MODEL_DIR, quantize=True, opset=17):
+    """
+    Exports a local Hugging Face sequence-classification checkpoint to ONNX.
+    Writes model.onnx (fp32) and, if quantize=True, a dynamic int8 model.int8.onnx.
+    Tokenizer + config are copied next to them so the directory is self-contained.
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"   📦 Exporting {model_dir} -> {output_dir} (ONNX opset {opset})...")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    model.eval()
+    model.config.return_dict = False
+
+    sample = tokenizer(["Wheat prices are rising", "Monsoon delay"], padding=True, return_tensors="pt")
+    fp32_path = os.path.join(output_dir, ONNX_FP32_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=opset,
+            dynamo=False,
+        )
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+    print(f"   ✅ Saved {fp32_path}")
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        int8_path = os.path.join(output_dir, ONNX_INT8_FILE)
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        print(f"   ✅ Saved {int8_path} (dynamic int8)")
+
+    return output_dir
+
+
+def onnx_unavailable_reason(model_dir=ONNX_MODEL_DIR, quantized=False):
+    """ Why the ONNX backend can't run here (missing runtime or export), or None if it can; loads nothing. """
+    if importlib.util.find_spec("onnxruntime") is None:
+        return "onnxruntime is not installed"
+    model_file = os.path.join(model_dir, ONNX_INT8_FILE if quantized else ONNX_FP32_FILE)
+    if not os.path.exists(model_file):
+        return f"{model_file} not found. Run: python scripts/utils/sentiment_backends.py export"
+    return None
+
+
+def token_limit(tokenizer, cap=MAX_SEQ_TOKENS):
+    """ Model token limit; tokenizers without a configured limit report a huge sentinel value. """
+    limit = getattr(tokenizer, "model_max_length", None) or cap
+    return min(int(limit), cap)
+
+
+def length_buckets(lengths, batch_size=32, max_batch_tokens=MAX_BATCH_TOKENS):
+    """
+    Groups indices by token length: sorted shortest first, then cut into batches of at most
+    batch_size rows whose padded size (rows x longest row) stays within max_batch_tokens.
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    batches, current, current_max = [], [], 0
+    for idx in order:
+        width = max(current_max, lengths[idx])
+        if current and (len(current) >= batch_size or width * (len(current) + 1) > max_batch_tokens):
+            batches.append(current)
+            current, width = [], lengths[idx]
+        current.append(idx)
+        current_max = width
+    if current:
+        batches.append(current)
+    return batches
+
+
+class BucketedSentimentRunner:
+    """
+    Length-bucketed dynamic batching over a sequence classifier.
+    Texts are tokenized once (truncated at the model's token limit), sorted into length buckets,
+    each bucket is padded only to its own longest sequence, and results are scattered back
+    into input order. Output format matches the transformers pipeline with top_k=1.
+
+    forward(input_ids, attention_mask) takes int64 numpy arrays and returns class probabilities.
+    """
+
+    def __init__(self, tokenizer, forward, id2label, max_length=None):
+        import numpy as np
+
+        self.np = np
+        self.tokenizer = tokenizer
+        self.forward = forward
+        self.id2label = id2label
+        self.max_length = max_length or token_limit(tokenizer)
+        self.pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else 0
+        self.pad_left = getattr(tokenizer, "padding_side", "right") == "left"
+
+    @classmethod
+    def for_torch(cls, model, tokenizer, inference_context=None):
+        import torch
+
+        inference_context = inference_context or torch.no_grad
+
+        def forward(input_ids, attention_mask):
+            with inference_context():
+                logits = model(
+                    input_ids=torch.from_numpy(input_ids).to(model.device),
+                    attention_mask=torch.from_numpy(attention_mask).to(model.device)
+                ).logits
+                return logits.float().softmax(dim=-1).cpu().numpy()
+
+        return cls(tokenizer, forward, model.config.id2label)
+
+    def tokenize(self, texts):
+        """ Token ids per text (no padding), truncated at the token limit. """
+        max_chars = self.max_length * MAX_CHARS_PER_TOKEN
+        enc = self.tokenizer([t[:max_chars] for t in texts], truncation=True, max_length=self.max_length)
+        return enc["input_ids"]
+
+    def pad(self, sequences):
+        """ Pads a bucket to its longest member. Returns (input_ids, attention_mask) int64 arrays. """
+        width = max(len(seq) for seq in sequences)
+        input_ids = self.np.full((len(sequences), width), self.pad_id, dtype=self.np.int64)
+        attention_mask = self.np.zeros((len(sequences), width), dtype=self.np.int64)
+        for row, seq in enumerate(sequences):
+            if self.pad_left:
+                input_ids[row, width - len(seq):] = seq
+                attention_mask[row, width - len(seq):] = 1
+            else:
+                input_ids[row, :len(seq)] = seq
+                attention_mask[row, :len(seq)] = 1
+        return input_ids, attention_mask
+
+    def __call__(self, texts, batch_size=32, max_batch_tokens=MAX_BATCH_TOKENS):
+        if not texts:
+            return []
+        token_ids = self.tokenize(texts)
+        # A single sequence may exceed the budget on its own; it still gets a batch of one
+        budget = max(max_batch_tokens, self.max_length)
+
+        outputs = [None] * len(texts)
+        for bucket in length_buckets([len(ids) for ids in token_ids], batch_size, budget):
+            probs = self.forward(*self.pad([token_ids[i] for i in bucket]))
+            for idx, row in zip(bucket, probs):
+                best = int(row.argmax())
+                outputs[idx] = [{"label": self.id2label[best], "score": float(row[best])}]
+        return outputs
+
+
+class OnnxSentimentPipeline:
+    """
+    ONNX Runtime stand-in for the transformers "sentiment-analysis" pipeline.
+    Same call convention: a string returns [{'label', 'score'}], a list returns one such list per text.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, quantized=False, intra_op_threads=None):
+        import numpy as np
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+
+        self.np = np
+        model_file = os.path.join(model_dir, ONNX_INT8_FILE if quantized else ONNX_FP32_FILE)
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(
+                f"{model_file} not found. Run: python scripts/utils/sentiment_backends.py export"
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = int(intra_op_threads)
+        options.inter_op_num_threads = 1
+
+        self.session = ort.InferenceSession(model_file, sess_options=options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.id2label = AutoConfig.from_pretrained(model_dir).id2label
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.model_file = model_file
+        self.runner = BucketedSentimentRunner(self.tokenizer, self.forward, self.id2label)
+
+    def forward(self, input_ids, attention_mask):
+        """ Class probabilities for one padded batch. """
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = self.np.zeros_like(input_ids)
+        logits = self.session.run(None, {name: feeds[name] for name in self.input_names})[0]
+        # Softmax (stable)
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        probs = self.np.exp(logits)
+        return probs / probs.sum(axis=-1, keepdims=True)
+
+    def _run(self, texts, truncation=True):
+        enc = self.tokenizer(texts, padding=True, truncation=truncation, return_tensors="np")
+        return self.forward(enc["input_ids"].astype(self.np.int64), enc["attention_mask"].astype(self.np.int64))
+
+    def __call__(self, inputs, batch_size=32, truncation=True, top_k=1, **kwargs):
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+
+        if top_k == 1 and truncation:
+            outputs = self.runner(texts, batch_size=batch_size)
+            return outputs[0] if single else outputs
+
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            probs = self._run(texts[start:start + batch_size], truncation=truncation)
+            for row in probs:
+                order = row.argsort()[::-1][:top_k]
+                outputs.append([{"label": self.id2label[int(i)], "score": float(row[i])} for i in order])
+
+        return outputs[0] if single else outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment model inference backends")
+    subparsers = parser.add_subparsers(dest='command')
+
+    export = subparsers.add_parser('export', help='Export models/sentiment-model to ONNX (+ int8)')
+    export.add_argument('--model-dir', default=os.path.join(BASE_DIR, '../../models/sentiment-model'))
+    export.add_argument('--output-dir', default=ONNX_MODEL_DIR)
+    export.add_argument('--no-quantize', action='store_true', help='Skip the dynamic int8 variant')
+
+    args = parser.parse_args()
+    if args.command == 'export':
+        export_onnx(args.model_dir, args.output_dir, quantize=not args.no_quantize)
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
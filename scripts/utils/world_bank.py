@@ -1,4 +1,10 @@
-import requests
+try:
+    from utils.http_client import http_get
+except ImportError:
+    try:
+        from .http_client import http_get
+    except ImportError:
+        from http_client import http_get
 
 class WorldBankClient:
     BASE_URL = "https://api.worldbank.org/v2" # Force HTTPS
@@ -36,7 +42,7 @@ class WorldBankClient:
                 # Or just fetch a range "2020:2023" and take first non-null
                 
                 params = {'format': 'json', 'date': '2020:2023', 'per_page': 100} 
-                resp = requests.get(url, params=params, timeout=10) # Increased timeout
+                resp = http_get(url, params=params, timeout=10) # Increased timeout
                 
                 if resp.status_code == 200:
                     data = resp.json()